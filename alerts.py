@@ -1,10 +1,10 @@
 from __future__ import annotations
 
+import atexit
 import importlib.util
 import json
 import os
 import time
-from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
@@ -18,6 +18,13 @@ else:  # pragma: no cover - fallback when zoneinfo is unavailable
 import pandas as pd
 import yaml
 
+from tools.alert_engine import AlertEngine, alert_key, is_on_cooldown
+from tools.event_sink import EventSink, sink_from_config
+from tools.file_watch import FileWatcher, build_file_watcher
+from tools.kill_switch import monitor_from_config
+from tools.quote_writer import current_quotes_path
+from tools.quotes_tail import QuotesSnapshot, QuotesTailReader
+from tools.state_persist import DebouncedJsonFile, atomic_write_json
 
 ROOT = Path(__file__).resolve().parent
 CONFIG_PATH = ROOT / "config.yaml"
@@ -67,11 +74,7 @@ def load_alert_state(path: Path) -> Dict[str, Any]:
 
 
 def save_alert_state(path: Path, state: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
-    tmp.replace(path)
+    atomic_write_json(path, state, indent=2)
 
 
 def append_line(path: Path, line: str) -> None:
@@ -122,12 +125,21 @@ def emit_event(
     alerts_log: Path,
     events_log_dir: Path,
     learning_card: Optional[Dict[str, str]] = None,
+    sink: Optional[EventSink] = None,
 ) -> None:
     try:
         print(message)
     except Exception:
         pass
 
+    if sink is not None:
+        # 批量写入：后台线程 + 组提交 fsync，见 config.yaml event_sink
+        sink.write_line(alerts_log, message)
+        sink.write_json(_events_path_for_ts(events_log_dir, event_ts), event)
+        if learning_card is not None:
+            sink.write_text(learning_card["path"], _learning_card_text(**_learning_card_fields(learning_card)))
+        return
+
     try:
         append_line(alerts_log, message)
     except Exception as e:
@@ -152,15 +164,7 @@ def emit_event(
 
     if learning_card is not None:
         try:
-            append_learning_card(
-                learning_card["path"],
-                alert_type=learning_card["alert_type"],
-                symbol=learning_card["symbol"],
-                facts=learning_card["facts"],
-                hypotheses=learning_card["hypotheses"],
-                checks=learning_card["checks"],
-                concepts=learning_card["concepts"],
-            )
+            append_learning_card(learning_card["path"], **_learning_card_fields(learning_card))
         except Exception as e:
             try:
                 print(f"[WARN] failed to append learning card: {e}")
@@ -168,25 +172,41 @@ def emit_event(
                 pass
 
 
-def alert_key(alert_type: str, symbol: str) -> str:
-    sym = symbol.strip().upper() if symbol else "__GLOBAL__"
-    if sym == "-":
-        sym = "__GLOBAL__"
-    return f"{alert_type}|{sym}"
+def record_emit(
+    key: str, state: Dict[str, Any], state_file: DebouncedJsonFile, *, now_epoch: Optional[float] = None
+) -> None:
+    now_epoch = now_epoch if now_epoch is not None else time.time()
+    state[key] = {"last_emit_epoch": float(now_epoch)}
+    state_file.mark_dirty()
 
 
-def is_on_cooldown(
-    key: str, cooldown_seconds: int, state: Dict[str, Any], *, now_epoch: Optional[float] = None
-) -> bool:
-    now_epoch = now_epoch if now_epoch is not None else time.time()
-    last = state.get(key, {}).get("last_emit_epoch")
-    return bool(last) and (now_epoch - float(last) < cooldown_seconds)
+def _learning_card_fields(card: Dict[str, str]) -> Dict[str, str]:
+    return {k: card[k] for k in ("alert_type", "symbol", "facts", "hypotheses", "checks", "concepts")}
 
 
-def record_emit(key: str, state: Dict[str, Any], path: Path, *, now_epoch: Optional[float] = None) -> None:
-    now_epoch = now_epoch if now_epoch is not None else time.time()
-    state[key] = {"last_emit_epoch": float(now_epoch)}
-    save_alert_state(path, state)
+def _learning_card_text(
+    alert_type: str,
+    symbol: str,
+    facts: str,
+    hypotheses: str,
+    checks: str,
+    concepts: str,
+) -> str:
+    utc_s, local_s, tzname = now_stamps()
+    return (
+        "\n---\n"
+        f"## [{alert_type}] {symbol}\n\n"
+        f"- time_utc: `{utc_s}`\n"
+        f"- time_local({tzname}): `{local_s}`\n\n"
+        "**Facts**\n"
+        f"{facts.strip()}\n\n"
+        "**Hypotheses**\n"
+        f"{hypotheses.strip()}\n\n"
+        "**Checks**\n"
+        f"{checks.strip()}\n\n"
+        "**Concepts**\n"
+        f"{concepts.strip()}\n"
+    )
 
 
 def append_learning_card(
@@ -199,24 +219,12 @@ def append_learning_card(
     concepts: str,
 ) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    utc_s, local_s, tzname = now_stamps()
+    text = _learning_card_text(alert_type, symbol, facts, hypotheses, checks, concepts)
     with path.open("a", encoding="utf-8") as f:
-        f.write("\n---\n")
-        f.write(f"## [{alert_type}] {symbol}\n\n")
-        f.write(f"- time_utc: `{utc_s}`\n")
-        f.write(f"- time_local({tzname}): `{local_s}`\n\n")
-        f.write("**Facts**\n")
-        f.write(f"{facts.strip()}\n\n")
-        f.write("**Hypotheses**\n")
-        f.write(f"{hypotheses.strip()}\n\n")
-        f.write("**Checks**\n")
-        f.write(f"{checks.strip()}\n\n")
-        f.write("**Concepts**\n")
-        f.write(f"{concepts.strip()}\n")
-
-
-def write_status(
-    path: Path,
+        f.write(text)
+
+
+def build_status_payload(
     *,
     ts_utc: datetime,
     ts_local: str,
@@ -228,28 +236,27 @@ def write_status(
     last_start_utc: str,
     config_snapshot: Dict[str, Any],
     last_move: Optional[Dict[str, Any]],
-) -> None:
+) -> Dict[str, Any]:
+    return {
+        "schema_version": STATUS_SCHEMA_VERSION,
+        "ts_utc": ts_utc.isoformat(timespec="seconds"),
+        "ts_local": ts_local,
+        "last_start_utc": last_start_utc,
+        "last_event_utc": last_alert_ts,
+        "config": config_snapshot,
+        "quotes": {
+            "path": str(quotes_path),
+            "file_age_s": quotes_file_age_s,
+            "last_rows": last_rows,
+            "last_prices": last_prices,
+        },
+        "last_move": last_move,
+    }
+
+
+def write_status(path: Path, **fields: Any) -> None:
     try:
-        payload = {
-            "schema_version": STATUS_SCHEMA_VERSION,
-            "ts_utc": ts_utc.isoformat(timespec="seconds"),
-            "ts_local": ts_local,
-            "last_start_utc": last_start_utc,
-            "last_event_utc": last_alert_ts,
-            "config": config_snapshot,
-            "quotes": {
-                "path": str(quotes_path),
-                "file_age_s": quotes_file_age_s,
-                "last_rows": last_rows,
-                "last_prices": last_prices,
-            },
-            "last_move": last_move,
-        }
-        path.parent.mkdir(parents=True, exist_ok=True)
-        tmp = path.with_suffix(path.suffix + ".tmp")
-        with tmp.open("w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-        tmp.replace(path)
+        atomic_write_json(path, build_status_payload(**fields), indent=2, ensure_ascii=False)
     except Exception as e:
         try:
             print(f"[WARN] failed to write status.json: {e}")
@@ -272,11 +279,59 @@ def as_upper_symbol_series(s: pd.Series) -> pd.Series:
     return s.astype(str).str.upper()
 
 
-@dataclass
-class FlatState:
-    run_len: int = 0
-    last_price: Optional[float] = None
-    last_ts: Optional[pd.Timestamp] = None
+def read_full_snapshot(path: Path, watchlist_set: Optional[set]) -> QuotesSnapshot:
+    """Re-read the whole quotes.csv (legacy mode); cost grows with file size."""
+    df = safe_read_csv(path)
+    snapshot = QuotesSnapshot(raw_rows=int(len(df)))
+    if df.empty:
+        return snapshot
+
+    # required columns
+    cols_lower = {c.lower(): c for c in df.columns}
+    sym_col = cols_lower.get("symbol")
+    price_col = cols_lower.get("price")
+    ts_col = cols_lower.get("ts_utc")
+
+    if not sym_col or not price_col or not ts_col:
+        snapshot.schema_ok = False
+        return snapshot
+
+    # normalize
+    df = df[[ts_col, sym_col, price_col]].copy()
+    df.rename(columns={ts_col: "ts_utc", sym_col: "symbol", price_col: "price"}, inplace=True)
+
+    df["ts_utc"] = pd.to_datetime(df["ts_utc"], utc=True, errors="coerce")
+    df["symbol"] = as_upper_symbol_series(df["symbol"])
+    df["price"] = pd.to_numeric(df["price"], errors="coerce")
+
+    df = df.dropna(subset=["ts_utc", "symbol", "price"]).sort_values("ts_utc")
+
+    if watchlist_set is not None:
+        df = df[df["symbol"].isin(watchlist_set)]
+
+    if df.empty:
+        return snapshot
+
+    snapshot.last_rows = int(len(df))
+    latest_by_symbol = df.sort_values("ts_utc").drop_duplicates("symbol", keep="last")
+    for _, row in latest_by_symbol.iterrows():
+        try:
+            snapshot.last_prices[str(row["symbol"])] = float(row["price"])
+        except Exception:
+            continue
+
+    for sym, g in df.groupby("symbol"):
+        g = g.sort_values("ts_utc")
+        if len(g) < 2:
+            continue
+        last2 = g.tail(2)
+        snapshot.pairs.append(
+            (str(sym), float(last2.iloc[0]["price"]), float(last2.iloc[1]["price"]), last2.iloc[1]["ts_utc"])
+        )
+    snapshot.ticks = [
+        (str(sym), float(px), ts) for ts, sym, px in df[["ts_utc", "symbol", "price"]].itertuples(index=False)
+    ]
+    return snapshot
 
 
 # ---------- main ----------
@@ -288,7 +343,9 @@ def main() -> None:
     data_dir = ROOT / str(logging_cfg.get("data_dir", ".\\Data"))
     logs_dir = ROOT / str(logging_cfg.get("log_dir", ".\\Logs"))
 
-    quotes_path = data_dir / "quotes.csv"
+    # rotate_daily: quotes.py writes quotes_YYYY-MM-DD.csv; follow the newest one
+    rotate_daily = bool((cfg.get("quotes", {}) or {}).get("rotate_daily", False))
+    quotes_path = current_quotes_path(data_dir, rotate_daily=rotate_daily)
     alerts_log = logs_dir / "alerts.log"
     status_path = logs_dir / "status.json"
     learning_cards_path = data_dir / "learning_cards.md"
@@ -312,11 +369,47 @@ def main() -> None:
     if cooldown_seconds <= 0:
         cooldown_seconds = poll_seconds
     debug_enabled = bool(alerts_cfg.get("debug", False))
+    incremental_read = bool(alerts_cfg.get("incremental_read", False))
+    watch_mode = str(alerts_cfg.get("watch_mode", "off") or "off").strip().lower()
+    watch_debounce_s = float(alerts_cfg.get("watch_debounce_ms", 50)) / 1000.0
+    state_flush_s = float(alerts_cfg.get("state_flush_seconds", 2.0))
+    day_move_pct = float(alerts_cfg.get("day_move_pct", 0) or 0)
+    window_moves = {float(k): float(v) for k, v in (alerts_cfg.get("move_windows") or {}).items()}
+    status_min_interval_s = float(alerts_cfg.get("status_min_interval_seconds", 1.0))
+    status_heartbeat_s = float(alerts_cfg.get("status_heartbeat_seconds", poll_seconds))
 
     risk_cfg = cfg.get("risk_guards", {}) or {}
     kill_switch_path = ROOT / str(risk_cfg.get("kill_switch_path", "./Data/KILL_SWITCH"))
+    kill_switch = monitor_from_config(cfg, root=ROOT, always_on=True)
 
     alert_state = load_alert_state(alert_state_path)
+    sink = sink_from_config(cfg)
+    # alert_state.json / status.json: coalesce rewrites, flush on exit and kill switch
+    state_file = DebouncedJsonFile(alert_state_path, min_interval_s=state_flush_s)
+    state_file.set(alert_state)
+    status_file = DebouncedJsonFile(
+        status_path,
+        min_interval_s=status_min_interval_s,
+        heartbeat_s=status_heartbeat_s,
+        volatile_keys=("ts_utc", "ts_local", "quotes.file_age_s"),
+        ensure_ascii=False,
+    )
+
+    def persist_all() -> None:
+        state_file.flush()
+        status_file.flush()
+        sink.close()
+
+    atexit.register(persist_all)
+    engine = AlertEngine(
+        minute_move_pct=minute_thr,
+        flat_repeats=flat_repeats,
+        stale_seconds=stale_seconds,
+        cooldown_seconds=cooldown_seconds,
+        cooldowns=alert_state,
+        window_moves=window_moves,
+        day_move_pct=day_move_pct,
+    )
 
     last_alert_ts: Optional[str] = None
 
@@ -332,8 +425,7 @@ def main() -> None:
     ) -> None:
         ts_utc_dt = datetime.now(timezone.utc)
         ts_local, _ = _local_dt_from_utc(ts_utc_dt)
-        write_status(
-            status_path,
+        payload = build_status_payload(
             ts_utc=ts_utc_dt,
             ts_local=ts_local,
             quotes_path=quotes_path,
@@ -351,6 +443,8 @@ def main() -> None:
             },
             last_move=last_move,
         )
+        status_file.set(payload)
+        status_file.maybe_flush()
 
     watchlist = cfg.get("watchlist")
     if isinstance(watchlist, str):
@@ -360,12 +454,38 @@ def main() -> None:
     else:
         watchlist_set = None  # no filter
 
+    # watch mode: wake as soon as quotes.csv changes; poll_seconds becomes the upper bound
+    watcher: Optional[FileWatcher] = None
+    if watch_mode not in ("off", "false", "none", ""):
+        watcher = build_file_watcher(quotes_path, mode=watch_mode, debounce_s=watch_debounce_s)
+
+    def idle() -> None:
+        # wait up to poll_seconds, waking early only to write debounced state on time
+        deadline = time.monotonic() + poll_seconds
+        while True:
+            wait_s = deadline - time.monotonic()
+            for f in (state_file, status_file):
+                due = f.seconds_until_due()
+                if due is not None:
+                    wait_s = min(wait_s, due)
+            wait_s = max(0.0, wait_s)
+            if watcher is None:
+                time.sleep(wait_s)
+                woke = False
+            else:
+                woke = watcher.wait(wait_s)
+            state_file.maybe_flush()
+            status_file.maybe_flush()
+            if woke or time.monotonic() >= deadline:
+                return
+
     # startup banner
     utc_s, local_s, tzname = now_stamps()
     start_line = (
         f"[{utc_s} | {local_s} {tzname}] ALERTS_START "
         f"thr={minute_thr}% poll={poll_seconds}s flat={flat_repeats} stale={stale_seconds}s "
-        f"cooldown={cooldown_seconds}s debug={debug_enabled} quotes={quotes_path}"
+        f"cooldown={cooldown_seconds}s debug={debug_enabled} incremental={incremental_read} "
+        f"watch={watcher.kind if watcher else 'off'} quotes={quotes_path}"
     )
     start_event, start_ts = make_event(
         "ALERTS_START",
@@ -388,21 +508,33 @@ def main() -> None:
         start_line,
         alerts_log=alerts_log,
         events_log_dir=logs_dir,
+        sink=sink,
     )
     last_alert_ts = start_event["ts_utc"]
 
     # file health state
     last_file_mtime: float = 0.0
 
-    # per-symbol state
-    flat_state: Dict[str, FlatState] = {}
+    # incremental mode: parse only rows appended since the last poll
+    tail_reader = QuotesTailReader(quotes_path, watchlist_set) if incremental_read else None
 
     while True:
         quotes_file_age_s: Optional[float] = None
         last_rows: Optional[int] = None
         last_prices: Optional[Dict[str, float]] = None
 
-        if kill_switch_path.exists():
+        if rotate_daily:
+            latest_path = current_quotes_path(data_dir, rotate_daily=True)
+            if latest_path != quotes_path:
+                quotes_path = latest_path
+                last_file_mtime = 0.0
+                if tail_reader is not None:
+                    tail_reader.follow(quotes_path)
+                if watcher is not None:
+                    watcher.close()
+                    watcher = build_file_watcher(quotes_path, mode=watch_mode, debounce_s=watch_debounce_s)
+
+        if kill_switch.engaged():
             utc_s, local_s, tzname = now_stamps()
             msg = f"[{utc_s} | {local_s} {tzname}] KILL_SWITCH detected at {kill_switch_path}, exiting"
             kill_event, kill_ts = make_event(
@@ -419,8 +551,12 @@ def main() -> None:
                 msg,
                 alerts_log=alerts_log,
                 events_log_dir=logs_dir,
+                sink=sink,
             )
             last_alert_ts = kill_event["ts_utc"]
+            if watcher is not None:
+                watcher.close()
+            persist_all()
             return
 
         # --- DATA_MISSING ---
@@ -444,6 +580,7 @@ def main() -> None:
                     msg,
                     alerts_log=alerts_log,
                     events_log_dir=logs_dir,
+                    sink=sink,
                     learning_card={
                         "path": learning_cards_path,
                         "alert_type": "DATA_MISSING",
@@ -455,9 +592,9 @@ def main() -> None:
                     },
                 )
                 last_alert_ts = event["ts_utc"]
-                record_emit(key, alert_state, alert_state_path, now_epoch=now_epoch)
+                record_emit(key, alert_state, state_file, now_epoch=now_epoch)
             flush_status(quotes_file_age_s, last_rows, last_prices)
-            time.sleep(poll_seconds)
+            idle()
             continue
 
         # --- DATA_STALE (mtime based) ---
@@ -465,7 +602,7 @@ def main() -> None:
             mtime = quotes_path.stat().st_mtime
         except Exception:
             flush_status(quotes_file_age_s, last_rows, last_prices)
-            time.sleep(poll_seconds)
+            idle()
             continue
 
         quotes_file_age_s = time.time() - mtime
@@ -479,51 +616,53 @@ def main() -> None:
                 # unchanged mtime
                 age = time.time() - mtime
                 quotes_file_age_s = age
-                if age >= stale_seconds:
-                    now_epoch = time.time()
-                    key = alert_key("DATA_STALE", "__GLOBAL__")
-                    if not is_on_cooldown(key, cooldown_seconds, alert_state, now_epoch=now_epoch):
-                        utc_s, local_s, tzname = now_stamps()
-                        msg = (
-                            f"[{utc_s} | {local_s} {tzname}] ⚠️ DATA_STALE symbol=- "
-                            f"quotes.csv mtime unchanged >= {stale_seconds}s"
-                        )
-                        event, event_ts = make_event(
-                            "DATA_STALE",
-                            "__GLOBAL__",
-                            "med",
-                            msg,
-                            metrics={"stale_age_s": age, "threshold": stale_seconds},
-                            source="quotes.csv",
-                        )
-                        emit_event(
-                            event,
-                            event_ts,
-                            msg,
-                            alerts_log=alerts_log,
-                            events_log_dir=logs_dir,
-                            learning_card={
-                                "path": learning_cards_path,
-                                "alert_type": "DATA_STALE",
-                                "symbol": "-",
-                                "facts": f"- quotes.csv 超过 {stale_seconds}s 没有更新（mtime 未变化）。",
-                                "hypotheses": "- quotes.py 停了 / 网络断了 / 数据源卡住 / 进程挂起",
-                                "checks": "- quotes.py 窗口是否还在输出？\n- `dir .\\Data\\quotes.csv` 看修改时间\n- 先重启 quotes：Ctrl+C → `python .\\quotes.py`",
-                                "concepts": "- DATA_STALE：数据流健康检查，和市场是否波动是两回事。",
-                            },
-                        )
-                        last_alert_ts = event["ts_utc"]
-                        record_emit(key, alert_state, alert_state_path, now_epoch=now_epoch)
+                stale = engine.check_stale(age)
+                if stale is not None:
+                    utc_s, local_s, tzname = now_stamps()
+                    msg = (
+                        f"[{utc_s} | {local_s} {tzname}] ⚠️ DATA_STALE symbol=- "
+                        f"quotes.csv mtime unchanged >= {stale_seconds}s"
+                    )
+                    event, event_ts = make_event(
+                        "DATA_STALE",
+                        "__GLOBAL__",
+                        "med",
+                        msg,
+                        metrics=stale.metrics,
+                        source="quotes.csv",
+                    )
+                    emit_event(
+                        event,
+                        event_ts,
+                        msg,
+                        alerts_log=alerts_log,
+                        events_log_dir=logs_dir,
+                        sink=sink,
+                        learning_card={
+                            "path": learning_cards_path,
+                            "alert_type": "DATA_STALE",
+                            "symbol": "-",
+                            "facts": f"- quotes.csv 超过 {stale_seconds}s 没有更新（mtime 未变化）。",
+                            "hypotheses": "- quotes.py 停了 / 网络断了 / 数据源卡住 / 进程挂起",
+                            "checks": "- quotes.py 窗口是否还在输出？\n- `dir .\\Data\\quotes.csv` 看修改时间\n- 先重启 quotes：Ctrl+C → `python .\\quotes.py`",
+                            "concepts": "- DATA_STALE：数据流健康检查，和市场是否波动是两回事。",
+                        },
+                    )
+                    last_alert_ts = event["ts_utc"]
+                    state_file.mark_dirty()
 
         # --- read csv (with retry) ---
         try:
-            df = safe_read_csv(quotes_path)
+            if tail_reader is not None:
+                snapshot = tail_reader.poll()
+            else:
+                snapshot = read_full_snapshot(quotes_path, watchlist_set)
         except Exception as e:
             now_epoch = time.time()
             key = alert_key("READ_FAIL", "__GLOBAL__")
             if is_on_cooldown(key, cooldown_seconds, alert_state, now_epoch=now_epoch):
                 flush_status(quotes_file_age_s, last_rows, last_prices)
-                time.sleep(poll_seconds)
+                idle()
                 continue
             utc_s, local_s, tzname = now_stamps()
             msg = f"[{utc_s} | {local_s} {tzname}] ⚠️ READ_FAIL symbol=- {type(e).__name__}: {e}"
@@ -535,207 +674,188 @@ def main() -> None:
                 metrics={"error": str(e)},
                 source="quotes.csv",
             )
-            emit_event(event, event_ts, msg, alerts_log=alerts_log, events_log_dir=logs_dir)
+            emit_event(event, event_ts, msg, alerts_log=alerts_log, events_log_dir=logs_dir, sink=sink)
             last_alert_ts = event["ts_utc"]
-            record_emit(key, alert_state, alert_state_path, now_epoch=now_epoch)
+            record_emit(key, alert_state, state_file, now_epoch=now_epoch)
             flush_status(quotes_file_age_s, last_rows, last_prices)
-            time.sleep(poll_seconds)
+            idle()
             continue
 
         if debug_enabled:
             age = time.time() - mtime
             utc_s, _, _ = now_stamps()
             print(
-                f"[{utc_s}] DEBUG FILE age={age:.1f}s stale_thr={stale_seconds}s rows={len(df)}"
+                f"[{utc_s}] DEBUG FILE age={age:.1f}s stale_thr={stale_seconds}s rows={snapshot.raw_rows}"
             )
 
-        if df.empty:
+        if snapshot.raw_rows == 0:
             last_rows = 0
             flush_status(quotes_file_age_s, last_rows, last_prices)
-            time.sleep(poll_seconds)
+            idle()
             continue
 
-        # required columns
-        cols_lower = {c.lower(): c for c in df.columns}
-        sym_col = cols_lower.get("symbol")
-        price_col = cols_lower.get("price")
-        ts_col = cols_lower.get("ts_utc")
-
-        if not sym_col or not price_col or not ts_col:
+        if not snapshot.schema_ok:
             # silently wait; file schema not ready
             flush_status(quotes_file_age_s, last_rows, last_prices)
-            time.sleep(poll_seconds)
+            idle()
             continue
 
-        # normalize
-        df = df[[ts_col, sym_col, price_col]].copy()
-        df.rename(columns={ts_col: "ts_utc", sym_col: "symbol", price_col: "price"}, inplace=True)
-
-        df["ts_utc"] = pd.to_datetime(df["ts_utc"], utc=True, errors="coerce")
-        df["symbol"] = as_upper_symbol_series(df["symbol"])
-        df["price"] = pd.to_numeric(df["price"], errors="coerce")
-
-        df = df.dropna(subset=["ts_utc", "symbol", "price"]).sort_values("ts_utc")
-
-        if watchlist_set is not None:
-            df = df[df["symbol"].isin(watchlist_set)]
-
-        if df.empty:
+        if snapshot.last_rows == 0:
             last_rows = 0
             flush_status(quotes_file_age_s, last_rows, last_prices)
-            time.sleep(poll_seconds)
+            idle()
             continue
 
-        last_rows = int(len(df))
-        last_prices = {}
-        latest_by_symbol = df.sort_values("ts_utc").drop_duplicates("symbol", keep="last")
-        for _, row in latest_by_symbol.iterrows():
-            try:
-                last_prices[str(row["symbol"])] = float(row["price"])
-            except Exception:
-                continue
+        last_rows = snapshot.last_rows
+        last_prices = dict(snapshot.last_prices)
+
+        # 每一行都进 N 分钟 / 当日窗口（不只是每个 symbol 最新的两行）
+        for sym, px, ts in snapshot.ticks:
+            engine.on_tick(sym, px, ts)
 
         # --- per symbol: MOVE + DATA_FLAT ---
-        for sym, g in df.groupby("symbol"):
-            g = g.sort_values("ts_utc")
-            if len(g) < 2:
+        for sym, prev, now, now_ts in snapshot.pairs:
+            ev = engine.on_pair(sym, prev, now, now_ts)
+            if ev.skipped:
                 continue
 
-            last2 = g.tail(2)
-            now_ts = last2.iloc[1]["ts_utc"]
-            prev = float(last2.iloc[0]["price"])
-            now = float(last2.iloc[1]["price"])
-
-            st = flat_state.get(sym) or FlatState()
-
-            # avoid re-processing same latest timestamp
-            if st.last_ts is not None and pd.Timestamp(now_ts) == pd.Timestamp(st.last_ts):
-                flat_state[sym] = st
-                continue
+            for sig in ev.signals:
+                if sig.alert_type != "DATA_FLAT":
+                    continue
+                utc_s, local_s, tzname = now_stamps()
+                msg = (
+                    f"[{utc_s} | {local_s} {tzname}] ⚠️ DATA_FLAT symbol={sym} "
+                    f"unchanged run_len={ev.run_len} price={now:.6f} last_ts={now_ts.isoformat(timespec='seconds')}"
+                )
+                event, event_ts = make_event(
+                    "DATA_FLAT",
+                    sym,
+                    "low",
+                    msg,
+                    metrics=sig.metrics,
+                    source="quotes.csv",
+                )
+                emit_event(
+                    event,
+                    event_ts,
+                    msg,
+                    alerts_log=alerts_log,
+                    events_log_dir=logs_dir,
+                    sink=sink,
+                    learning_card={
+                        "path": learning_cards_path,
+                        "alert_type": "DATA_FLAT",
+                        "symbol": sym,
+                        "facts": f"- {sym} 价格连续 {flat_repeats} 次更新未变化\n- price={now:.6f}\n- last_ts={now_ts.isoformat(timespec='seconds')}",
+                        "hypotheses": "- 周末/盘后正常冻结\n- 数据源只给昨收/最后成交\n- 你拿到的是缓存价",
+                        "checks": "- 看 SPY 是否也冻结\n- 检查是否周末/盘后\n- 后续可在 quotes.py 增加 source 字段区分数据来源",
+                        "concepts": "- DATA_FLAT：文件在更新，但数值不变（可能市场没动，也可能数据源不刷新）。",
+                    },
+                )
+                last_alert_ts = event["ts_utc"]
+                state_file.mark_dirty()
 
-            # DATA_FLAT run length (count consecutive updates with same price)
-            if st.last_price is None:
-                st.run_len = 1
-            else:
-                if abs(now - float(st.last_price)) < 1e-12:
-                    st.run_len += 1
-                else:
-                    st.run_len = 1
-
-            st.last_price = now
-            st.last_ts = pd.Timestamp(now_ts)
-            flat_state[sym] = st
-
-            if st.run_len == flat_repeats:
-                now_epoch = time.time()
-                key = alert_key("DATA_FLAT", sym)
-                if not is_on_cooldown(key, cooldown_seconds, alert_state, now_epoch=now_epoch):
-                    utc_s, local_s, tzname = now_stamps()
-                    msg = (
-                        f"[{utc_s} | {local_s} {tzname}] ⚠️ DATA_FLAT symbol={sym} "
-                        f"unchanged run_len={st.run_len} price={now:.6f} last_ts={now_ts.isoformat(timespec='seconds')}"
-                    )
-                    event, event_ts = make_event(
-                        "DATA_FLAT",
-                        sym,
-                        "low",
-                        msg,
-                        metrics={
-                            "run_len": st.run_len,
-                            "price": now,
-                            "threshold": flat_repeats,
-                            "last_ts": now_ts.isoformat(timespec="seconds"),
-                        },
-                        source="quotes.csv",
-                    )
-                    emit_event(
-                        event,
-                        event_ts,
-                        msg,
-                        alerts_log=alerts_log,
-                        events_log_dir=logs_dir,
-                        learning_card={
-                            "path": learning_cards_path,
-                            "alert_type": "DATA_FLAT",
-                            "symbol": sym,
-                            "facts": f"- {sym} 价格连续 {flat_repeats} 次更新未变化\n- price={now:.6f}\n- last_ts={now_ts.isoformat(timespec='seconds')}",
-                            "hypotheses": "- 周末/盘后正常冻结\n- 数据源只给昨收/最后成交\n- 你拿到的是缓存价",
-                            "checks": "- 看 SPY 是否也冻结\n- 检查是否周末/盘后\n- 后续可在 quotes.py 增加 source 字段区分数据来源",
-                            "concepts": "- DATA_FLAT：文件在更新，但数值不变（可能市场没动，也可能数据源不刷新）。",
-                        },
-                    )
-                    last_alert_ts = event["ts_utc"]
-                    record_emit(key, alert_state, alert_state_path, now_epoch=now_epoch)
-
-            # MOVE
-            if prev > 0:
-                move = (now - prev) / prev * 100.0
-                if debug_enabled:
-                    utc_s, _, _ = now_stamps()
-                    will_move = abs(move) >= minute_thr
-                    print(
-                        f"[{utc_s}] DEBUG {sym} prev={prev:.6f} now={now:.6f} "
-                        f"move={move:+.2f}% thr={minute_thr:.2f}% flat_count={st.run_len} will_move={will_move}"
-                    )
-                if abs(move) >= minute_thr:
-                    now_epoch = time.time()
-                    key = alert_key("MOVE", sym)
-                    if not is_on_cooldown(key, cooldown_seconds, alert_state, now_epoch=now_epoch):
-                        utc_s, local_s, tzname = now_stamps()
-                        msg = (
-                            f"[{utc_s} | {local_s} {tzname}] 🚨 MOVE symbol={sym} "
-                            f"move={move:+.2f}% prev={prev:.6f} now={now:.6f} now_ts={now_ts.isoformat(timespec='seconds')}"
-                        )
-                        event, event_ts = make_event(
-                            "MOVE",
-                            sym,
-                            "high",
-                            msg,
-                            metrics={
-                                "prev": prev,
-                                "now": now,
-                                "move_pct": move,
-                                "threshold": minute_thr,
-                                "now_ts": now_ts.isoformat(timespec="seconds"),
-                            },
-                            source="quotes.csv",
-                        )
-                        emit_event(
-                            event,
-                            event_ts,
-                            msg,
-                            alerts_log=alerts_log,
-                            events_log_dir=logs_dir,
-                            learning_card={
-                                "path": learning_cards_path,
-                                "alert_type": "MOVE",
-                                "symbol": sym,
-                                "facts": f"- move={move:+.2f}% (thr={minute_thr:.2f}%)\n- prev={prev:.6f} now={now:.6f}\n- now_ts={now_ts.isoformat(timespec='seconds')}",
-                                "hypotheses": "- 市场真实波动\n- 盘后流动性导致跳价\n- 新闻/财报/宏观事件",
-                                "checks": "- 同期 SPY 是否同向？\n- 查该标的新闻/公告\n- 查是否财报/分红/拆股相关日期",
-                                "concepts": "- MOVE：相邻两条记录的涨跌幅；采样频率由 poll_seconds 决定。",
-                            },
-                        )
-                        last_alert_ts = event["ts_utc"]
-                        last_move = {
-                            "ts_utc": event["ts_utc"],
-                            "symbol": sym,
-                            "move_pct": move,
-                            "prev": prev,
-                            "now": now,
-                            "now_ts": now_ts.isoformat(timespec="seconds"),
-                        }
-                        record_emit(key, alert_state, alert_state_path, now_epoch=now_epoch)
-
-            elif debug_enabled:
+            if debug_enabled:
                 utc_s, _, _ = now_stamps()
+                move = ev.move_pct if ev.move_pct is not None else 0.0
+                will_move = ev.move_pct is not None and abs(move) >= minute_thr
                 print(
-                    f"[{utc_s}] DEBUG {sym} prev={prev:.6f} now={now:.6f} move=0.00% "
-                    f"thr={minute_thr:.2f}% flat_count={st.run_len} will_move=False"
+                    f"[{utc_s}] DEBUG {sym} prev={prev:.6f} now={now:.6f} "
+                    f"move={move:+.2f}% thr={minute_thr:.2f}% flat_count={ev.run_len} will_move={will_move}"
                 )
 
+            for sig in ev.signals:
+                if sig.alert_type != "MOVE":
+                    continue
+                move = float(sig.metrics["move_pct"])
+                utc_s, local_s, tzname = now_stamps()
+                msg = (
+                    f"[{utc_s} | {local_s} {tzname}] 🚨 MOVE symbol={sym} "
+                    f"move={move:+.2f}% prev={prev:.6f} now={now:.6f} now_ts={now_ts.isoformat(timespec='seconds')}"
+                )
+                event, event_ts = make_event(
+                    "MOVE",
+                    sym,
+                    "high",
+                    msg,
+                    metrics=sig.metrics,
+                    source="quotes.csv",
+                )
+                emit_event(
+                    event,
+                    event_ts,
+                    msg,
+                    alerts_log=alerts_log,
+                    events_log_dir=logs_dir,
+                    sink=sink,
+                    learning_card={
+                        "path": learning_cards_path,
+                        "alert_type": "MOVE",
+                        "symbol": sym,
+                        "facts": f"- move={move:+.2f}% (thr={minute_thr:.2f}%)\n- prev={prev:.6f} now={now:.6f}\n- now_ts={now_ts.isoformat(timespec='seconds')}",
+                        "hypotheses": "- 市场真实波动\n- 盘后流动性导致跳价\n- 新闻/财报/宏观事件",
+                        "checks": "- 同期 SPY 是否同向？\n- 查该标的新闻/公告\n- 查是否财报/分红/拆股相关日期",
+                        "concepts": "- MOVE：相邻两条记录的涨跌幅；采样频率由 poll_seconds 决定。",
+                    },
+                )
+                last_alert_ts = event["ts_utc"]
+                last_move = {
+                    "ts_utc": event["ts_utc"],
+                    "symbol": sym,
+                    "move_pct": move,
+                    "prev": prev,
+                    "now": now,
+                    "now_ts": now_ts.isoformat(timespec="seconds"),
+                }
+                state_file.mark_dirty()
+
+        # N 分钟 / 当日涨跌幅：整份 watchlist 一次向量化计算
+        for sig in engine.evaluate_windows():
+            move = float(sig.metrics["move_pct"])
+            window = str(sig.metrics["window"])
+            now_px = float(sig.metrics["now"])
+            if sig.alert_type == "DAY_MOVE":
+                ref_desc = f"day_open={float(sig.metrics['day_open']):.6f}"
+                thr = day_move_pct
+            else:
+                ref_ts = datetime.fromtimestamp(float(sig.metrics["ref_ts_epoch"]), tz=timezone.utc)
+                ref_desc = f"ref_ts={ref_ts.isoformat(timespec='seconds')}"
+                thr = float(sig.metrics["threshold"])
+            utc_s, local_s, tzname = now_stamps()
+            msg = (
+                f"[{utc_s} | {local_s} {tzname}] 🚨 {sig.alert_type} window={window} symbol={sig.symbol} "
+                f"move={move:+.2f}% now={now_px:.6f} {ref_desc}"
+            )
+            event, event_ts = make_event(
+                sig.alert_type,
+                sig.symbol,
+                "high",
+                msg,
+                metrics=sig.metrics,
+                source="quotes.csv",
+            )
+            emit_event(
+                event,
+                event_ts,
+                msg,
+                alerts_log=alerts_log,
+                events_log_dir=logs_dir,
+                sink=sink,
+                learning_card={
+                    "path": learning_cards_path,
+                    "alert_type": sig.alert_type,
+                    "symbol": sig.symbol,
+                    "facts": f"- move={move:+.2f}% over {window} (thr={thr:.2f}%)\n- now={now_px:.6f} {ref_desc}",
+                    "hypotheses": "- 趋势性行情（不是单根跳价）\n- 新闻/财报/宏观事件\n- 板块或大盘整体联动",
+                    "checks": "- 同期 SPY 是否同向？\n- 查该标的新闻/公告\n- 对照 MOVE 事件看是急拉还是慢涨",
+                    "concepts": "- MOVE_{N}M / DAY_MOVE：N 分钟窗口 / 当日开盘（UTC 日首笔）以来的累计涨跌幅。",
+                },
+            )
+            last_alert_ts = event["ts_utc"]
+            state_file.mark_dirty()
+
         flush_status(quotes_file_age_s, last_rows, last_prices)
-        time.sleep(poll_seconds)
+        idle()
 
 
 if __name__ == "__main__":
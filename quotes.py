@@ -1,34 +1,22 @@
 from __future__ import annotations
 
-import csv
-import sys
 import time
-from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
 import yaml
 
-try:
-    import yfinance as yf
-except ImportError:
-    print("缺少依赖 yfinance。请先运行：pip install yfinance pandas", file=sys.stderr)
-    raise
+from tools.kill_switch import KillSwitchMonitor, monitor_from_config
+from tools.quote_source import FetchCycle, Quote, QuoteSource, build_quote_source, fetch_last_price  # noqa: F401
+from tools.quote_store import QuoteStoreWriter, store_from_config
+from tools.quote_writer import QuotesCsvWriter, writer_from_config
 
 
 ROOT = Path(__file__).resolve().parent
 CONFIG_PATH = ROOT / "config.yaml"
 
 
-@dataclass
-class Quote:
-    ts_utc: str
-    symbol: str
-    price: float
-    source: str
-
-
 def load_config() -> dict:
     if not CONFIG_PATH.exists():
         raise FileNotFoundError(f"找不到 config.yaml：{CONFIG_PATH}")
@@ -62,52 +50,11 @@ def get_kill_switch_path(cfg: dict) -> Path:
     return ROOT / str(risk_cfg.get("kill_switch_path", "./Data/KILL_SWITCH"))
 
 
-def fetch_last_price(symbol: str) -> Optional[float]:
-    """
-    取“最新价”：先 fast_info，失败则用 1分钟K线最后一个 close
-    """
-    t = yf.Ticker(symbol)
-
-    try:
-        fi = getattr(t, "fast_info", None)
-        if fi:
-            p = fi.get("last_price") or fi.get("lastPrice")
-            if p is not None:
-                return float(p)
-    except Exception:
-        pass
-
-    try:
-        hist = t.history(period="1d", interval="1m", prepost=True)
-        if hist is None or hist.empty:
-            return None
-        last_close = hist["Close"].dropna()
-        if last_close.empty:
-            return None
-        return float(last_close.iloc[-1])
-    except Exception:
-        return None
-
-
-def append_quotes_csv(data_dir: Path, quotes: list[Quote]) -> Path:
-    ensure_dir(data_dir)
-    out = data_dir / "quotes.csv"
-    file_exists = out.exists()
-
-    with out.open("a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if not file_exists:
-            w.writerow(["ts_utc", "symbol", "price", "source"])
-        for q in quotes:
-            w.writerow([q.ts_utc, q.symbol, q.price, q.source])
-
-    return out
-
-
 def main() -> None:
     cfg = load_config()
     log_dir, data_dir = get_dirs(cfg)
     kill_switch_path = get_kill_switch_path(cfg)
+    kill_switch = monitor_from_config(cfg, root=ROOT, always_on=True)
 
     wl = cfg.get("watchlist", {})
     symbols = list(wl.get("stocks", [])) + list(wl.get("etfs", []))
@@ -117,40 +64,81 @@ def main() -> None:
     # 每隔多少秒拉一次（没写就默认 60s）
     poll_seconds = int(cfg.get("poll_seconds", 60))
     stale_seconds = int(cfg.get("alerts", {}).get("data_stale_seconds", 30))
-
-    last_good_ts = time.time()
+    source = build_quote_source(cfg)
+    writer = writer_from_config(cfg, data_dir)
+    store = store_from_config(cfg, ROOT)
 
     write_log(
         log_dir,
-        f"[{now_utc_iso()}] QUOTES_START symbols={symbols} poll_seconds={poll_seconds} kill_switch={kill_switch_path}",
+        f"[{now_utc_iso()}] QUOTES_START symbols={symbols} poll_seconds={poll_seconds} "
+        f"source={source.name} kill_switch={kill_switch_path}",
     )
 
+    try:
+        _run_loop(
+            symbols,
+            source=source,
+            writer=writer,
+            store=store,
+            poll_seconds=poll_seconds,
+            stale_seconds=stale_seconds,
+            log_dir=log_dir,
+            kill_switch_path=kill_switch_path,
+            kill_switch=kill_switch,
+        )
+    finally:
+        writer.close()
+        if store is not None:
+            store.close()
+        source.close()
+
+
+def _run_loop(
+    symbols: list[str],
+    *,
+    source: QuoteSource,
+    writer: QuotesCsvWriter,
+    store: Optional[QuoteStoreWriter],
+    poll_seconds: int,
+    stale_seconds: int,
+    log_dir: Path,
+    kill_switch_path: Path,
+    kill_switch: Optional[KillSwitchMonitor] = None,
+) -> None:
+    last_good_ts = time.time()
+    if kill_switch is None:
+        kill_switch = KillSwitchMonitor(kill_switch_path)
+
     while True:
-        if kill_switch_path.exists():
+        if kill_switch.engaged():
             msg = f"[{now_utc_iso()}] KILL_SWITCH detected at {kill_switch_path}, exiting"
             print(msg)
             write_log(log_dir, msg)
             return
 
         ts = now_utc_iso()
-        quotes: list[Quote] = []
-        failed: list[str] = []
+        cycle: FetchCycle = source.fetch(symbols, ts)
+        quotes = cycle.quotes
+        failed = cycle.failed
 
-        for sym in symbols:
-            p = fetch_last_price(sym)
-            if p is None:
-                failed.append(sym)
-            else:
-                quotes.append(Quote(ts_utc=ts, symbol=sym, price=p, source="yfinance"))
+        write_log(
+            log_dir,
+            f"[{ts}] QUOTES_CYCLE n={len(symbols)} ok={len(quotes)} failed={len(failed)} "
+            f"timed_out={len(cycle.timed_out)} latency_ms={cycle.latency_s * 1000.0:.0f}",
+        )
 
         if quotes:
             last_good_ts = time.time()
-            out = append_quotes_csv(data_dir, quotes)
+            out = writer.append(quotes)
+            if store is not None:
+                store.append(quotes)
             print(f"[{ts}] ✅ 写入 {len(quotes)} 条报价 -> {out}")
             write_log(log_dir, f"[{ts}] QUOTES_OK n={len(quotes)} file={out.name}")
 
         if failed:
             msg = f"[{ts}] ⚠️ 报价获取失败：{failed}"
+            if cycle.timed_out:
+                msg += f"（超时：{cycle.timed_out}）"
             print(msg)
             write_log(log_dir, msg)
 
@@ -160,7 +148,16 @@ def main() -> None:
             write_log(log_dir, msg)
             last_good_ts = time.time()
 
-        time.sleep(poll_seconds)
+        if source.exhausted:
+            msg = f"[{now_utc_iso()}] QUOTES_SOURCE_EXHAUSTED source={source.name}, exiting"
+            print(msg)
+            write_log(log_dir, msg)
+            return
+
+        # 扣掉本轮拉取耗时，保持采样节奏稳定
+        sleep_s = max(0.0, poll_seconds - cycle.latency_s)
+        writer.flush_before_sleep(sleep_s)
+        time.sleep(sleep_s)
 
 
 if __name__ == "__main__":
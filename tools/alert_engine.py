@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from tools.move_windows import MoveWindowDetector
+from tools.quotes_tail import parse_ts_utc
+
+GLOBAL_SYMBOL = "__GLOBAL__"
+
+
+def alert_key(alert_type: str, symbol: str) -> str:
+    sym = symbol.strip().upper() if symbol else GLOBAL_SYMBOL
+    if sym == "-":
+        sym = GLOBAL_SYMBOL
+    return f"{alert_type}|{sym}"
+
+
+def is_on_cooldown(
+    key: str, cooldown_seconds: int, state: Dict[str, Any], *, now_epoch: Optional[float] = None
+) -> bool:
+    now_epoch = now_epoch if now_epoch is not None else time.time()
+    last = state.get(key, {}).get("last_emit_epoch")
+    return bool(last) and (now_epoch - float(last) < cooldown_seconds)
+
+
+class AlertSignal:
+    """One alert that passed its threshold and cooldown; rendering/IO is the caller's job."""
+
+    __slots__ = ("alert_type", "symbol", "key", "now_epoch", "metrics")
+
+    def __init__(self, alert_type: str, symbol: str, now_epoch: float, metrics: Dict[str, Any]) -> None:
+        self.alert_type = alert_type
+        self.symbol = symbol
+        self.key = alert_key(alert_type, symbol)
+        self.now_epoch = now_epoch
+        self.metrics = metrics
+
+
+class PairEvaluation:
+    """Result of evaluating one (prev, now) pair; kept for debug output even when nothing fires."""
+
+    __slots__ = ("symbol", "prev", "now", "now_ts", "move_pct", "run_len", "skipped", "signals")
+
+    def __init__(self, symbol: str, prev: float, now: float, now_ts: datetime) -> None:
+        self.symbol = symbol
+        self.prev = prev
+        self.now = now
+        self.now_ts = now_ts
+        self.move_pct: Optional[float] = None
+        self.run_len = 0
+        self.skipped = False
+        self.signals: List[AlertSignal] = []
+
+
+class SymbolAlertState:
+    __slots__ = ("tail_price", "last_price", "last_ts", "run_len")
+
+    def __init__(self) -> None:
+        self.tail_price: Optional[float] = None
+        self.last_price: Optional[float] = None
+        self.last_ts: Optional[datetime] = None
+        self.run_len = 0
+
+
+class AlertEngine:
+    """
+    Per-symbol MOVE / DATA_FLAT state machine plus the global DATA_STALE check.
+
+    ``on_pair`` takes the two newest rows of a symbol (polling loop);
+    ``on_quote`` takes raw quotes one at a time (replay / streaming) and
+    feeds the same state machine, so both paths fire identical alerts.
+    Cooldowns live in ``cooldowns`` (the alert_state.json dict) and are
+    recorded as soon as a signal fires; persisting them is up to the caller.
+    With ``window_moves`` ({minutes: pct}) and/or ``day_move_pct`` every
+    row feeds a MoveWindowDetector (``on_quote`` does it itself, the polling
+    loop passes each polled row to ``on_tick``); ``evaluate_windows`` then
+    checks all symbols at once (MOVE_{N}M / DAY_MOVE, same cooldowns).
+    """
+
+    def __init__(
+        self,
+        *,
+        minute_move_pct: float,
+        flat_repeats: int,
+        stale_seconds: int,
+        cooldown_seconds: int,
+        cooldowns: Optional[Dict[str, Any]] = None,
+        window_moves: Optional[Dict[float, float]] = None,
+        day_move_pct: Optional[float] = None,
+    ) -> None:
+        self.minute_move_pct = float(minute_move_pct)
+        self.flat_repeats = int(flat_repeats)
+        self.stale_seconds = int(stale_seconds)
+        self.cooldown_seconds = int(cooldown_seconds)
+        self.cooldowns: Dict[str, Any] = cooldowns if cooldowns is not None else {}
+        self.symbols: Dict[str, SymbolAlertState] = {}
+        self.last_quote_epoch: Optional[float] = None
+        windows = sorted((float(m), float(p)) for m, p in (window_moves or {}).items() if float(m) > 0 and float(p) > 0)
+        self.window_pcts = [p for _, p in windows]
+        self.day_move_pct = float(day_move_pct) if day_move_pct else None
+        self.windows: Optional[MoveWindowDetector] = None
+        if windows or self.day_move_pct:
+            self.windows = MoveWindowDetector([m * 60.0 for m, _ in windows])
+
+    def _fire(self, alert_type: str, symbol: str, now_epoch: Optional[float], metrics: Dict[str, Any]) -> Optional[AlertSignal]:
+        now_epoch = now_epoch if now_epoch is not None else time.time()
+        key = alert_key(alert_type, symbol)
+        if is_on_cooldown(key, self.cooldown_seconds, self.cooldowns, now_epoch=now_epoch):
+            return None
+        self.cooldowns[key] = {"last_emit_epoch": float(now_epoch)}
+        return AlertSignal(alert_type, symbol, now_epoch, metrics)
+
+    def on_pair(
+        self,
+        symbol: str,
+        prev: float,
+        now: float,
+        now_ts: datetime,
+        *,
+        now_epoch: Optional[float] = None,
+    ) -> PairEvaluation:
+        ev = PairEvaluation(symbol, prev, now, now_ts)
+        st = self.symbols.get(symbol)
+        if st is None:
+            st = self.symbols[symbol] = SymbolAlertState()
+
+        # avoid re-processing same latest timestamp
+        if st.last_ts is not None and now_ts == st.last_ts:
+            ev.skipped = True
+            ev.run_len = st.run_len
+            return ev
+
+        # DATA_FLAT run length (count consecutive updates with same price)
+        if st.last_price is None or abs(now - st.last_price) >= 1e-12:
+            st.run_len = 1
+        else:
+            st.run_len += 1
+        st.last_price = now
+        st.last_ts = now_ts
+        ev.run_len = st.run_len
+
+        if st.run_len == self.flat_repeats:
+            sig = self._fire(
+                "DATA_FLAT",
+                symbol,
+                now_epoch,
+                {
+                    "run_len": st.run_len,
+                    "price": now,
+                    "threshold": self.flat_repeats,
+                    "last_ts": now_ts.isoformat(timespec="seconds"),
+                },
+            )
+            if sig is not None:
+                ev.signals.append(sig)
+
+        if prev > 0:
+            move = (now - prev) / prev * 100.0
+            ev.move_pct = move
+            if abs(move) >= self.minute_move_pct:
+                sig = self._fire(
+                    "MOVE",
+                    symbol,
+                    now_epoch,
+                    {
+                        "prev": prev,
+                        "now": now,
+                        "move_pct": move,
+                        "threshold": self.minute_move_pct,
+                        "now_ts": now_ts.isoformat(timespec="seconds"),
+                    },
+                )
+                if sig is not None:
+                    ev.signals.append(sig)
+        return ev
+
+    def on_quote(
+        self, symbol: str, price: float, ts: datetime, *, now_epoch: Optional[float] = None
+    ) -> Optional[PairEvaluation]:
+        """Streaming entry point; the first quote of a symbol only primes its state."""
+        st = self.symbols.get(symbol)
+        if st is None:
+            st = self.symbols[symbol] = SymbolAlertState()
+        prev = st.tail_price
+        st.tail_price = price
+        self.last_quote_epoch = ts.timestamp()
+        self.on_tick(symbol, price, ts)
+        if prev is None:
+            return None
+        return self.on_pair(symbol, prev, price, ts, now_epoch=now_epoch)
+
+    def on_tick(self, symbol: str, price: float, ts: datetime) -> None:
+        """Feed one row into the move windows only; rows older than the symbol's newest are ignored."""
+        if self.windows is not None:
+            self.windows.push(symbol, price, ts.timestamp())
+
+    def evaluate_windows(self, *, now_epoch: Optional[float] = None) -> List[AlertSignal]:
+        """N-minute / intraday breaches for every symbol updated since the last call."""
+        if self.windows is None:
+            return []
+        signals: List[AlertSignal] = []
+        for alert_type, symbol, metrics in self.windows.breaches(self.window_pcts, self.day_move_pct):
+            sig = self._fire(alert_type, symbol, now_epoch, metrics)
+            if sig is not None:
+                signals.append(sig)
+        return signals
+
+    def check_stale(self, age_s: float, *, now_epoch: Optional[float] = None) -> Optional[AlertSignal]:
+        if age_s < self.stale_seconds:
+            return None
+        return self._fire("DATA_STALE", GLOBAL_SYMBOL, now_epoch, {"stale_age_s": age_s, "threshold": self.stale_seconds})
+
+
+def replay_alerts(rows: Iterable[Dict[str, object]], engine: AlertEngine) -> List[AlertSignal]:
+    """
+    Feed quote rows (ts_utc/symbol/price) through the engine using the quote
+    timestamps as the clock, so cooldowns and DATA_STALE gaps replay
+    deterministically.
+    """
+    signals: List[AlertSignal] = []
+    for row in rows:
+        ts = parse_ts_utc(str(row.get("ts_utc") or row.get("ts") or ""))
+        symbol = str(row.get("symbol") or "").strip().upper()
+        try:
+            price = float(row.get("price"))  # type: ignore[arg-type]
+        except Exception:
+            continue
+        if ts is None or not symbol or price != price:
+            continue
+        now_epoch = ts.timestamp()
+        if engine.last_quote_epoch is not None:
+            stale = engine.check_stale(now_epoch - engine.last_quote_epoch, now_epoch=now_epoch)
+            if stale is not None:
+                signals.append(stale)
+        ev = engine.on_quote(symbol, price, ts, now_epoch=now_epoch)
+        if ev is not None:
+            signals.extend(ev.signals)
+            signals.extend(engine.evaluate_windows(now_epoch=now_epoch))
+    return signals
+
+
+__all__ = [
+    "AlertEngine",
+    "AlertSignal",
+    "PairEvaluation",
+    "SymbolAlertState",
+    "alert_key",
+    "is_on_cooldown",
+    "replay_alerts",
+]
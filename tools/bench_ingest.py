@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+if str(Path(__file__).resolve().parent.parent) not in sys.path:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.quote_source import DEFAULT_REPLAY_PATH, Quote, QuoteSource, RandomWalkSource, ReplaySource
+from tools.quote_writer import QuotesCsvWriter
+
+
+def _build_source(args: argparse.Namespace) -> QuoteSource:
+    if args.source == "replay":
+        return ReplaySource(Path(args.replay_path), batch_size=args.batch_size, rate_per_s=args.rate, loop=True)
+    return RandomWalkSource(seed=args.seed, rate_per_s=args.rate, ticks_per_fetch=args.batch_size)
+
+
+def _stage_ingest(
+    source: QuoteSource, symbols: List[str], total: int, writer: QuotesCsvWriter
+) -> tuple[List[Quote], float]:
+    collected: List[Quote] = []
+    start = time.perf_counter()
+    while len(collected) < total and not source.exhausted:
+        cycle = source.fetch(symbols, "")
+        if not cycle.quotes:
+            break
+        writer.append(cycle.quotes)
+        collected.extend(cycle.quotes)
+    writer.close()
+    return collected[:total], time.perf_counter() - start
+
+
+def _stage_sim(quotes: List[Quote], logs_dir: Path, *, per_row: bool = False) -> float:
+    from tools.sim_autopilot import SimSession, run_step
+
+    sim_state: Dict[str, object] = {"cash_usd": 10_000.0}
+    cfg = {"logs_dir": logs_dir, "momentum_threshold_pct": 0.5, "policy_version": "bench"}
+    start = time.perf_counter()
+    if per_row:
+        for q in quotes:
+            sim_state, _ = run_step({"ts_utc": q.ts_utc, "symbol": q.symbol, "price": q.price}, sim_state, cfg)
+    else:
+        session = SimSession(cfg, sim_state)
+        for q in quotes:
+            session.step({"ts_utc": q.ts_utc, "symbol": q.symbol, "price": q.price})
+    return time.perf_counter() - start
+
+
+def _stage_alerts(quotes: List[Quote]) -> tuple[float, int]:
+    from tools.alert_engine import AlertEngine, replay_alerts
+
+    engine = AlertEngine(
+        minute_move_pct=0.5,
+        flat_repeats=5,
+        stale_seconds=600,
+        cooldown_seconds=300,
+        window_moves={5: 2.0, 15: 3.0},
+        day_move_pct=3.0,
+    )
+    rows = [{"ts_utc": q.ts_utc, "symbol": q.symbol, "price": q.price} for q in quotes]
+    start = time.perf_counter()
+    signals = replay_alerts(rows, engine)
+    return time.perf_counter() - start, len(signals)
+
+
+def _rate(n: int, seconds: float) -> float:
+    return n / seconds if seconds > 0 else 0.0
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Offline ingest -> sim throughput benchmark (no network)",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--source", choices=["random_walk", "replay"], default="random_walk")
+    parser.add_argument("--replay-path", dest="replay_path", default=str(DEFAULT_REPLAY_PATH))
+    parser.add_argument("--symbols", default="AAPL,MSFT,NVDA,SPY", help="Comma separated symbols (random_walk)")
+    parser.add_argument("--total", type=int, default=10_000, help="Quotes to ingest")
+    parser.add_argument("--rate", type=float, default=0.0, help="Target quotes/s; 0 = as fast as possible")
+    parser.add_argument("--batch-size", type=int, default=1, dest="batch_size", help="Rows/ticks per fetch")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--flush-rows", type=int, default=0, dest="flush_rows", help="quotes.csv writer flush_rows")
+    parser.add_argument("--sim-steps", type=int, default=1_000, dest="sim_steps", help="Quotes fed to the sim; 0 skips")
+    parser.add_argument("--skip-alerts", action="store_true", dest="skip_alerts", help="Skip the AlertEngine replay stage")
+    parser.add_argument("--per-row", action="store_true", dest="per_row", help="Sim stage via run_step (per-row rehydration)")
+    parser.add_argument("--work-dir", dest="work_dir", help="Output dir (default: temp dir)")
+    return parser.parse_args(argv)
+
+
+def run_bench(args: argparse.Namespace, work_dir: Path) -> Dict[str, float]:
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    source = _build_source(args)
+    try:
+        writer = QuotesCsvWriter(work_dir / "Data", flush_rows=args.flush_rows)
+        quotes, ingest_s = _stage_ingest(source, symbols, int(args.total), writer)
+    finally:
+        source.close()
+    result = {
+        "source": source.name,
+        "ingested": len(quotes),
+        "ingest_s": round(ingest_s, 4),
+        "ingest_qps": round(_rate(len(quotes), ingest_s), 1),
+    }
+    if quotes and not args.skip_alerts:
+        alerts_s, fired = _stage_alerts(quotes)
+        result.update({"alerts_s": round(alerts_s, 4), "alerts_qps": round(_rate(len(quotes), alerts_s), 1), "alerts_fired": fired})
+    sim_quotes = quotes[: max(0, int(args.sim_steps))]
+    if sim_quotes:
+        sim_s = _stage_sim(sim_quotes, work_dir / "Logs", per_row=args.per_row)
+        result.update({"sim_steps": len(sim_quotes), "sim_s": round(sim_s, 4), "sim_sps": round(_rate(len(sim_quotes), sim_s), 1)})
+    return result
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    if args.work_dir:
+        result = run_bench(args, Path(args.work_dir).expanduser().resolve())
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = run_bench(args, Path(tmp))
+    print("BENCH_INGEST_SUMMARY|" + "|".join(f"{k}={v}" for k, v in result.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
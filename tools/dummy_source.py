@@ -6,6 +6,10 @@ import time
 from datetime import datetime, timezone
 from pathlib import Path
 
+if str(Path(__file__).resolve().parent.parent) not in sys.path:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.kill_switch import shared_monitor
 
 ROOT = Path(__file__).resolve().parent.parent
 LOGS_DIR = ROOT / "Logs"
@@ -22,8 +26,9 @@ def write_heartbeat(path: Path, name: str) -> None:
 def run(name: str, interval: float) -> int:
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
     heartbeat_path = LOGS_DIR / f"_tmp_dummy_{name}.txt"
+    kill_switch = shared_monitor(KILL_SWITCH)
     while True:
-        if KILL_SWITCH.exists():
+        if kill_switch.engaged():
             return 0
         write_heartbeat(heartbeat_path, name)
         time.sleep(interval)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Tuple
+
+# none   : write + flush to the OS, never fsync (crash of the machine may lose the tail)
+# batch  : group commit, fsync once per ``fsync_every`` lines or ``fsync_ms`` per file
+# strict : fsync before ``write_line`` returns (the old per-event behaviour)
+DURABILITY_LEVELS = ("none", "batch", "strict")
+
+_FLUSH = object()
+_STOP = object()
+
+
+class _OpenFile:
+    __slots__ = ("fh", "unsynced", "unsynced_since")
+
+    def __init__(self, fh: IO[str]) -> None:
+        self.fh = fh
+        self.unsynced = 0
+        self.unsynced_since: Optional[float] = None
+
+
+class EventSink:
+    """
+    Shared append-only writer for JSONL events and text logs.
+
+    Handles stay open (at most ``max_open_files``, least recently used closed
+    first), lines for the same file are written in one call, and fsync is
+    amortised according to ``durability``. With ``background=True`` lines
+    are queued and written by a daemon thread so callers never wait on the
+    disk; ``flush()`` blocks until everything queued so far is on disk.
+    Lines for one path are always written in submission order.
+    """
+
+    def __init__(
+        self,
+        *,
+        durability: str = "batch",
+        fsync_every: int = 64,
+        fsync_ms: float = 200.0,
+        background: bool = True,
+        max_open_files: int = 8,
+    ) -> None:
+        durability = str(durability or "batch").strip().lower()
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"durability must be one of {DURABILITY_LEVELS}, got {durability!r}")
+        self.durability = durability
+        self.fsync_every = max(1, int(fsync_every))
+        self.fsync_ms = max(0.0, float(fsync_ms))
+        self.max_open_files = max(1, int(max_open_files))
+        # strict callers must not return before fsync, so they always write inline
+        self.background = bool(background) and durability != "strict"
+        self.last_error: Optional[str] = None
+        self.lines_written = 0
+        self.fsync_calls = 0
+        self._files: "OrderedDict[Path, _OpenFile]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._queue: "queue.Queue[object]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        if self.background:
+            self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+            self._thread.start()
+
+    # ---------- public API ----------
+    def write_line(self, path: Path, line: str) -> None:
+        if self._closed:
+            raise RuntimeError("EventSink is closed")
+        if self.background:
+            self._queue.put((path, line))
+            return
+        with self._lock:
+            self._write_batch([(path, line)])
+            self._sync_due(force=self.durability == "strict")
+
+    def write_json(self, path: Path, payload: Dict[str, object]) -> None:
+        self.write_line(path, json.dumps(payload, ensure_ascii=False))
+
+    def write_text(self, path: Path, text: str) -> None:
+        """Append a multi-line block as-is (no trailing newline is added)."""
+        self.write_line(path, text[:-1] if text.endswith("\n") else text)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write and fsync (unless durability=none) everything submitted so far."""
+        if self._thread is not None and self._thread.is_alive():
+            done = threading.Event()
+            self._queue.put((_FLUSH, done))
+            return done.wait(timeout)
+        with self._lock:
+            self._sync_due(force=True)
+        return True
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put((_STOP, None))
+            self._thread.join()
+        self._closed = True
+        with self._lock:
+            self._sync_due(force=True)
+            for entry in self._files.values():
+                entry.fh.close()
+            self._files.clear()
+
+    def __enter__(self) -> "EventSink":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # ---------- internals ----------
+    def _warn(self, message: str) -> None:
+        self.last_error = message
+        try:
+            print(f"[WARN] event sink: {message}")
+        except Exception:
+            pass
+
+    def _handle(self, path: Path) -> _OpenFile:
+        entry = self._files.get(path)
+        if entry is not None:
+            self._files.move_to_end(path)
+            return entry
+        while len(self._files) >= self.max_open_files:
+            _, oldest = self._files.popitem(last=False)
+            self._sync(oldest)
+            oldest.fh.close()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = _OpenFile(path.open("a", encoding="utf-8"))
+        self._files[path] = entry
+        return entry
+
+    def _write_batch(self, items: List[Tuple[Path, str]]) -> None:
+        grouped: Dict[Path, List[str]] = {}
+        for path, line in items:
+            grouped.setdefault(path, []).append(line)
+        now = time.monotonic()
+        for path, lines in grouped.items():
+            try:
+                entry = self._handle(path)
+                entry.fh.write("\n".join(lines) + "\n")
+                entry.fh.flush()
+            except Exception as exc:
+                self._warn(f"failed to append {path}: {exc}")
+                continue
+            self.lines_written += len(lines)
+            entry.unsynced += len(lines)
+            if entry.unsynced_since is None:
+                entry.unsynced_since = now
+
+    def _sync(self, entry: _OpenFile) -> None:
+        if not entry.unsynced:
+            return
+        if self.durability != "none":
+            try:
+                os.fsync(entry.fh.fileno())
+                self.fsync_calls += 1
+            except Exception as exc:
+                self._warn(f"fsync failed: {exc}")
+        entry.unsynced = 0
+        entry.unsynced_since = None
+
+    def _sync_due(self, *, force: bool = False) -> None:
+        now = time.monotonic()
+        for entry in self._files.values():
+            if not entry.unsynced:
+                continue
+            if (
+                force
+                or entry.unsynced >= self.fsync_every
+                or (entry.unsynced_since is not None and (now - entry.unsynced_since) * 1000.0 >= self.fsync_ms)
+            ):
+                self._sync(entry)
+
+    def _next_timeout(self) -> Optional[float]:
+        pending = [e.unsynced_since for e in self._files.values() if e.unsynced and e.unsynced_since is not None]
+        if not pending or self.durability == "none":
+            return None
+        return max(0.0, self.fsync_ms / 1000.0 - (time.monotonic() - min(pending)))
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=self._next_timeout())
+            except queue.Empty:
+                with self._lock:
+                    self._sync_due()
+                continue
+            batch: List[Tuple[Path, str]] = []
+            waiters: List[threading.Event] = []
+            while True:
+                target, value = item  # type: ignore[misc]
+                if target is _STOP:
+                    stop = True
+                elif target is _FLUSH:
+                    waiters.append(value)
+                else:
+                    batch.append((target, value))
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            with self._lock:
+                if batch:
+                    self._write_batch(batch)
+                self._sync_due(force=bool(waiters) or stop)
+            for waiter in waiters:
+                waiter.set()
+
+
+def sink_from_config(cfg: dict, section: str = "event_sink") -> EventSink:
+    sink_cfg = cfg.get(section, {}) or {}
+    return EventSink(
+        durability=str(sink_cfg.get("durability", "batch")),
+        fsync_every=int(sink_cfg.get("fsync_every", 64)),
+        fsync_ms=float(sink_cfg.get("fsync_ms", 200)),
+        background=bool(sink_cfg.get("background", True)),
+    )
+
+
+__all__ = ["DURABILITY_LEVELS", "EventSink", "sink_from_config"]
@@ -3,8 +3,9 @@ from __future__ import annotations
 import hashlib
 import json
 import random
+from dataclasses import dataclass, field, fields, replace
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 from tools.paths import repo_root
 
@@ -22,6 +23,9 @@ DEFAULT_POLICY = {
     "gap_bps": 12.0,
     "gap_threshold_pct": 0.5,
 }
+# what apply_friction assumes for a key missing from a hand-built policy dict
+_ZERO_POLICY = {name: 0.0 for name in DEFAULT_POLICY}
+_ZERO_POLICY.update({"schema_version": DEFAULT_POLICY["schema_version"], "max_fill_fraction": 1.0})
 
 
 def _coerce_float(value: object, fallback: float) -> float:
@@ -44,118 +48,378 @@ def _pick_prev_price(snapshot: Dict[str, object]) -> float:
     return 0.0
 
 
-def load_friction_policy(path: Path | None = None) -> Dict[str, float | int]:
-    policy_path = path or (repo_root() / "Data" / "friction_policy.json")
-    if not policy_path.is_absolute():
-        policy_path = repo_root() / policy_path
-    policy_path = policy_path.expanduser().resolve()
-    payload: Dict[str, object] = {}
-    if policy_path.exists():
+@dataclass(frozen=True, slots=True)
+class FrictionPolicy:
+    """
+    Validated, immutable friction policy with its derived values precomputed
+    (price multipliers with and without the gap add-on, clamped
+    probabilities, latency in seconds), so ``apply_friction`` does no
+    per-call coercion. ``to_dict()`` is the dict ``load_friction_policy``
+    returns; the seed hash of an unseeded fill still covers the mapping the
+    policy was built from, so fills match the dict-based calls exactly.
+    """
+
+    schema_version: int = 2
+    fee_per_trade: float = 0.0
+    fee_per_share: float = 0.0
+    spread_bps: float = 0.0
+    slippage_bps: float = 0.0
+    latency_ms: float = 0.0
+    partial_fill_prob: float = 0.0
+    max_fill_fraction: float = 1.0
+    reject_prob: float = 0.0
+    fail_prob: float = 0.0
+    gap_bps: float = 0.0
+    gap_threshold_pct: float = 0.0
+    fill_fraction_cap: float = field(init=False, repr=False)
+    reject_p: float = field(init=False, repr=False)
+    fail_p: float = field(init=False, repr=False)
+    partial_active: bool = field(init=False, repr=False)
+    latency_sec: float = field(init=False, repr=False)
+    buy_mult: float = field(init=False, repr=False)
+    sell_mult: float = field(init=False, repr=False)
+    buy_gap_mult: float = field(init=False, repr=False)
+    sell_gap_mult: float = field(init=False, repr=False)
+    _source: Optional[Dict[str, object]] = field(default=None, init=False, repr=False, compare=False)
+    _seed_json: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        put = object.__setattr__
+        cap = max(0.0, min(1.0, self.max_fill_fraction))
+        put(self, "fill_fraction_cap", cap)
+        put(self, "reject_p", max(0.0, min(1.0, self.reject_prob)))
+        put(self, "fail_p", max(0.0, min(1.0, self.fail_prob)))
+        put(self, "partial_active", self.partial_fill_prob > 0.0 and cap < 1.0)
+        put(self, "latency_sec", self.latency_ms / 1000.0)
+        # same expression order as the per-call (spread + slippage + gap) / 10_000 it replaces
+        no_gap = (self.spread_bps + self.slippage_bps + 0.0) / 10_000.0
+        with_gap = (self.spread_bps + self.slippage_bps + self.gap_bps) / 10_000.0
+        put(self, "buy_mult", 1.0 + no_gap)
+        put(self, "sell_mult", 1.0 - no_gap)
+        put(self, "buy_gap_mult", 1.0 + with_gap)
+        put(self, "sell_gap_mult", 1.0 - with_gap)
+
+    @classmethod
+    def from_mapping(
+        cls, payload: Mapping[str, object], defaults: Optional[Mapping[str, object]] = None
+    ) -> "FrictionPolicy":
+        """
+        Coerce a policy dict. Unparseable or missing values fall back to
+        ``defaults`` (by default what apply_friction always assumed: 0, and 1
+        for max_fill_fraction).
+        """
+        fallback = _ZERO_POLICY if defaults is None else defaults
+        values: Dict[str, object] = {}
+        for item in fields(cls):
+            if not item.init:
+                continue
+            if item.name == "schema_version":
+                values[item.name] = int(payload.get(item.name, fallback["schema_version"]))  # type: ignore[arg-type]
+            else:
+                values[item.name] = _coerce_float(payload.get(item.name), float(fallback[item.name]))  # type: ignore[arg-type]
+        policy = cls(**values)  # type: ignore[arg-type]
+        object.__setattr__(policy, "_source", dict(payload))
+        return policy
+
+    @classmethod
+    def coerce(cls, policy: "PolicyLike") -> "FrictionPolicy":
+        return policy if isinstance(policy, FrictionPolicy) else cls.from_mapping(policy)
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> "FrictionPolicy":
+        """``Data/friction_policy.json`` merged over DEFAULT_POLICY; re-read only when the file changes."""
+        policy_path = path or (repo_root() / "Data" / "friction_policy.json")
+        if not policy_path.is_absolute():
+            policy_path = repo_root() / policy_path
+        policy_path = policy_path.expanduser().resolve()
         try:
-            payload = json.loads(policy_path.read_text(encoding="utf-8"))
-        except Exception:
-            payload = {}
-    merged = dict(DEFAULT_POLICY)
-    if isinstance(payload, dict):
-        merged.update(payload)
-    return {
-        "schema_version": int(merged.get("schema_version", DEFAULT_POLICY["schema_version"])),
-        "fee_per_trade": _coerce_float(merged.get("fee_per_trade"), DEFAULT_POLICY["fee_per_trade"]),
-        "fee_per_share": _coerce_float(merged.get("fee_per_share"), DEFAULT_POLICY["fee_per_share"]),
-        "spread_bps": _coerce_float(merged.get("spread_bps"), DEFAULT_POLICY["spread_bps"]),
-        "slippage_bps": _coerce_float(merged.get("slippage_bps"), DEFAULT_POLICY["slippage_bps"]),
-        "latency_ms": _coerce_float(merged.get("latency_ms"), DEFAULT_POLICY["latency_ms"]),
-        "partial_fill_prob": _coerce_float(
-            merged.get("partial_fill_prob"), DEFAULT_POLICY["partial_fill_prob"]
-        ),
-        "max_fill_fraction": _coerce_float(
-            merged.get("max_fill_fraction"), DEFAULT_POLICY["max_fill_fraction"]
-        ),
-        "reject_prob": _coerce_float(merged.get("reject_prob"), DEFAULT_POLICY["reject_prob"]),
-        "fail_prob": _coerce_float(merged.get("fail_prob"), DEFAULT_POLICY["fail_prob"]),
-        "gap_bps": _coerce_float(merged.get("gap_bps"), DEFAULT_POLICY["gap_bps"]),
-        "gap_threshold_pct": _coerce_float(
-            merged.get("gap_threshold_pct"), DEFAULT_POLICY["gap_threshold_pct"]
-        ),
-    }
+            st = policy_path.stat()
+            stamp: Optional[Tuple[int, int]] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        cached = _LOADED.get(policy_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        payload: Dict[str, object] = {}
+        if stamp is not None:
+            try:
+                payload = json.loads(policy_path.read_text(encoding="utf-8"))
+            except Exception:
+                payload = {}
+        merged = dict(DEFAULT_POLICY)
+        if isinstance(payload, dict):
+            merged.update(payload)
+        policy = cls.from_mapping(merged, DEFAULT_POLICY)
+        object.__setattr__(policy, "_source", None)  # hashes as to_dict(), like the loaded dict did
+        _LOADED[policy_path] = (stamp, policy)
+        return policy
+
+    def to_dict(self) -> Dict[str, float | int]:
+        return {item.name: getattr(self, item.name) for item in fields(self) if item.init}
+
+    def replace(self, **changes: float) -> "FrictionPolicy":
+        return replace(self, **changes)
+
+    def seed_payload(self) -> Dict[str, object]:
+        """The mapping an unseeded fill hashes: the source dict, or ``to_dict()``."""
+        return dict(self._source) if self._source is not None else self.to_dict()  # type: ignore[return-value]
+
+    def seed_json(self) -> str:
+        if self._seed_json is None:
+            object.__setattr__(self, "_seed_json", _canonical_json(self.seed_payload()))
+        return self._seed_json  # type: ignore[return-value]
+
+    def apply_many(
+        self,
+        orders: Sequence[Dict[str, object]],
+        snapshots: Sequence[Dict[str, object]],
+        *,
+        sampler: "FrictionSampler | None" = None,
+        start_index: int = 0,
+        rng_seeds: Optional[Sequence[int | None]] = None,
+    ) -> List[Dict[str, object]]:
+        """
+        ``[apply_friction(order, snapshot, self, ...) for ...]`` in one pass.
+        With a sampler (fill ``start_index + i`` for order ``i``) prices,
+        gaps, fill decisions and fees are computed as NumPy arrays; without
+        one each order takes the per-fill ``rng_seeds`` path.
+        """
+        if len(orders) != len(snapshots):
+            raise ValueError("orders and snapshots must have the same length")
+        if sampler is None:
+            seeds = list(rng_seeds) if rng_seeds is not None else [None] * len(orders)
+            return [apply_friction(o, s, self, rng_seed=seed) for o, s, seed in zip(orders, snapshots, seeds)]
+
+        import numpy as np
+
+        n = len(orders)
+        qty = np.array([_coerce_float(o.get("qty"), 0.0) for o in orders], dtype=np.float64)
+        price = np.array(
+            [_coerce_float(o.get("price"), _coerce_float(s.get("price"), 0.0)) for o, s in zip(orders, snapshots)],
+            dtype=np.float64,
+        )
+        sell = np.array([str(o.get("side") or "").upper() == "SELL" for o in orders], dtype=bool) | (qty < 0)
+        prev = np.array([_pick_prev_price(s) for s in snapshots], dtype=np.float64)
+        has_prev = prev > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gap_pct = np.where(has_prev, np.abs(price - prev) / prev * 100.0, 0.0)
+        gapped = has_prev & (gap_pct >= self.gap_threshold_pct)
+        mult = np.where(
+            sell,
+            np.where(gapped, self.sell_gap_mult, self.sell_mult),
+            np.where(gapped, self.buy_gap_mult, self.buy_mult),
+        )
+        fill_price = price * mult
+        status, fraction, partial = sampler.sample(start_index, n)
+        filled = status == 0
+        fill_qty = np.where(filled, qty * fraction, 0.0)
+        fee_usd = np.where(filled, self.fee_per_trade + self.fee_per_share * np.abs(fill_qty), self.fee_per_trade)
+        gap_bps = np.where(gapped, self.gap_bps, 0.0)
+        columns = zip(
+            fill_qty.tolist(),
+            fill_price.tolist(),
+            fee_usd.tolist(),
+            gap_bps.tolist(),
+            gap_pct.tolist(),
+            fraction.tolist(),  # type: ignore[attr-defined]
+            partial.tolist(),  # type: ignore[attr-defined]
+            status.tolist(),  # type: ignore[attr-defined]
+        )
+        out: List[Dict[str, object]] = []
+        for i, (f_qty, f_price, fee, g_bps, g_pct, frac, part, code) in enumerate(columns):
+            out.append(
+                {
+                    "fill_qty": f_qty,
+                    "fill_price": f_price,
+                    "fee_usd": fee,
+                    "slippage_bps": self.slippage_bps,
+                    "spread_bps": self.spread_bps,
+                    "gap_bps": g_bps,
+                    "gap_pct": g_pct,
+                    "latency_sec": self.latency_sec,
+                    "fill_fraction": frac,
+                    "partial_fill": part,
+                    "rng_seed": sampler.seed,
+                    "fill_status": FILL_STATUSES[code],
+                    "reject_reason": _REJECT_REASONS[code],
+                    "reject_prob": sampler.reject_prob,
+                    "fail_prob": sampler.fail_prob,
+                    "rng_index": int(start_index) + i,
+                }
+            )
+        return out
+
+
+PolicyLike = Union[FrictionPolicy, Mapping[str, object]]
+_LOADED: Dict[Path, Tuple[Optional[Tuple[int, int]], FrictionPolicy]] = {}
+
+
+def _canonical_json(payload: object) -> str:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _fill_seed(order: Dict[str, object], market_snapshot: Dict[str, object], policy: FrictionPolicy) -> int:
+    # byte-for-byte the JSON of _stable_seed(order, snapshot, policy_dict), with the policy part cached
+    encoded = "[" + _canonical_json(order) + "," + _canonical_json(market_snapshot) + "," + policy.seed_json() + "]"
+    digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    return int(digest[:12], 16)
+
+
+def load_friction_policy(path: Path | None = None) -> Dict[str, float | int]:
+    return FrictionPolicy.load(path).to_dict()
+
+
+FILL_STATUSES = ("FILLED", "FAILED", "REJECTED")
+_REJECT_REASONS = (None, "execution_failure", "order_rejected")
+
+
+class FrictionSampler:
+    """
+    Per-run source of the fail/reject/partial decisions in ``apply_friction``.
+
+    Fill ``k`` always reads uniforms ``3k..3k+2`` of a Philox stream keyed by
+    ``seed``. Philox is counter-based, so any block of fills starts by
+    setting the counter rather than replaying the stream: a fill can be
+    drawn alone, in order or in bulk (any ``block_size``) and the answer
+    depends only on (seed, k, policy). Decisions are pre-drawn one block at a
+    time with NumPy. The draws are not the ones the per-fill ``random.Random``
+    path makes, so sampler runs reproduce each other, not ``rng_seed`` runs.
+    """
+
+    def __init__(self, seed: int, policy: PolicyLike, *, block_size: int = 1024) -> None:
+        import numpy as np
+
+        self._np = np
+        self.seed = int(seed)
+        # multiple of 4: every block then starts on a Philox counter boundary (4 outputs per step)
+        self.block_size = max(4, int(block_size) + (-int(block_size)) % 4)
+        compiled = FrictionPolicy.coerce(policy)
+        self.partial_prob = compiled.partial_fill_prob
+        self.max_fraction = compiled.fill_fraction_cap
+        self.reject_prob = compiled.reject_p
+        self.fail_prob = compiled.fail_p
+        self._key = self.seed % (1 << 128)
+        self._cached_block = -1
+        self._cached: Tuple[object, object, object] = ((), (), ())
+
+    @classmethod
+    def for_run(cls, seed: int | None, policy: PolicyLike, *salt: object) -> "FrictionSampler":
+        """Sampler for ``seed``; without one, a seed hashed once from the policy and ``salt``."""
+        compiled = FrictionPolicy.coerce(policy)
+        return cls(_stable_seed(compiled.seed_payload(), *salt) if seed is None else int(seed), compiled)
+
+    def _draw_block(self, block: int) -> Tuple[object, object, object]:
+        np = self._np
+        counter = 3 * block * self.block_size // 4
+        gen = np.random.Generator(np.random.Philox(key=self._key, counter=counter))
+        uniforms = gen.random((self.block_size, 3))
+        failed = uniforms[:, 0] < self.fail_prob
+        rejected = ~failed & (uniforms[:, 1] < self.reject_prob)
+        status = np.where(failed, 1, np.where(rejected, 2, 0)).astype(np.int8)
+        partial = (status == 0) & (uniforms[:, 2] < self.partial_prob)
+        if not (self.partial_prob > 0.0 and self.max_fraction < 1.0):
+            partial[:] = False
+        fraction = np.where(status == 0, np.where(partial, self.max_fraction, 1.0), 0.0)
+        return status, fraction, partial
+
+    def sample(self, start: int, count: int) -> Tuple[object, object, object]:
+        """(status codes into FILL_STATUSES, fill fractions, partial flags) for fills start..start+count-1."""
+        np = self._np
+        start = int(start)
+        count = max(0, int(count))
+        if count == 0:
+            return np.empty(0, np.int8), np.empty(0), np.empty(0, bool)
+        first, last = start // self.block_size, (start + count - 1) // self.block_size
+        parts = [self._draw_block(block) for block in range(first, last + 1)]
+        lo = start - first * self.block_size
+        return tuple(np.concatenate([part[i] for part in parts])[lo : lo + count] for i in range(3))  # type: ignore[return-value]
+
+    def draw(self, index: int) -> Tuple[str, float, bool]:
+        """(fill_status, fill_fraction, partial_fill) for fill ``index``."""
+        block, offset = divmod(int(index), self.block_size)
+        if block != self._cached_block:
+            # plain lists: per-fill lookups are cheaper than NumPy scalar indexing
+            self._cached = tuple(part.tolist() for part in self._draw_block(block))  # type: ignore[attr-defined]
+            self._cached_block = block
+        status, fraction, partial = self._cached
+        return FILL_STATUSES[status[offset]], fraction[offset], partial[offset]  # type: ignore[index]
 
 
 def apply_friction(
     order: Dict[str, object],
     market_snapshot: Dict[str, object],
-    policy: Dict[str, float | int],
+    policy: PolicyLike,
     rng_seed: int | None = None,
+    *,
+    sampler: FrictionSampler | None = None,
+    fill_index: int = 0,
 ) -> Dict[str, object]:
+    policy = FrictionPolicy.coerce(policy)
     qty = _coerce_float(order.get("qty"), 0.0)
     price = _coerce_float(order.get("price"), _coerce_float(market_snapshot.get("price"), 0.0))
     side = str(order.get("side") or "").upper()
     if not side:
         side = "BUY" if qty >= 0 else "SELL"
 
-    spread_bps = _coerce_float(policy.get("spread_bps"), 0.0)
-    slippage_bps = _coerce_float(policy.get("slippage_bps"), 0.0)
     gap_bps = 0.0
     gap_pct = 0.0
+    gapped = False
     prev_price = _pick_prev_price(market_snapshot)
     if prev_price > 0:
         gap_pct = abs(price - prev_price) / prev_price * 100.0
-        if gap_pct >= _coerce_float(policy.get("gap_threshold_pct"), 0.0):
-            gap_bps = _coerce_float(policy.get("gap_bps"), 0.0)
-
-    total_bps = (spread_bps + slippage_bps + gap_bps) / 10_000.0
+        if gap_pct >= policy.gap_threshold_pct:
+            gap_bps = policy.gap_bps
+            gapped = True
 
     if side == "SELL" or qty < 0:
-        fill_price = price * (1.0 - total_bps)
+        fill_price = price * (policy.sell_gap_mult if gapped else policy.sell_mult)
     else:
-        fill_price = price * (1.0 + total_bps)
+        fill_price = price * (policy.buy_gap_mult if gapped else policy.buy_mult)
 
     fill_fraction = 1.0
     partial_fill = False
     seed_used: int | None = None
-    rng = None
-    if rng_seed is not None:
-        seed_used = int(rng_seed)
-    else:
-        seed_used = _stable_seed(order, market_snapshot, policy)
-    rng = random.Random(seed_used)
-    partial_prob = _coerce_float(policy.get("partial_fill_prob"), 0.0)
-    max_fraction = max(0.0, min(1.0, _coerce_float(policy.get("max_fill_fraction"), 1.0)))
-    rejection_prob = max(0.0, min(1.0, _coerce_float(policy.get("reject_prob"), 0.0)))
-    failure_prob = max(0.0, min(1.0, _coerce_float(policy.get("fail_prob"), 0.0)))
+    rejection_prob = policy.reject_p
+    failure_prob = policy.fail_p
     fill_status = "FILLED"
     reject_reason: str | None = None
-    if rng is not None:
+    if sampler is not None:
+        # decisions come from the run's counter-based stream (its policy's probabilities)
+        seed_used = sampler.seed
+        fill_status, fill_fraction, partial_fill = sampler.draw(fill_index)
+        reject_reason = _REJECT_REASONS[FILL_STATUSES.index(fill_status)]
+        rejection_prob, failure_prob = sampler.reject_prob, sampler.fail_prob
+    else:
+        seed_used = int(rng_seed) if rng_seed is not None else _fill_seed(order, market_snapshot, policy)
+        rng = random.Random(seed_used)
         if rng.random() < failure_prob:
             fill_status = "FAILED"
             reject_reason = "execution_failure"
         elif rng.random() < rejection_prob:
             fill_status = "REJECTED"
             reject_reason = "order_rejected"
-    if fill_status == "FILLED" and partial_prob > 0.0 and max_fraction < 1.0 and rng is not None:
-        if rng.random() < partial_prob:
-            fill_fraction = max_fraction
-            partial_fill = True
+        if fill_status == "FILLED" and policy.partial_active:
+            if rng.random() < policy.partial_fill_prob:
+                fill_fraction = policy.fill_fraction_cap
+                partial_fill = True
 
     fill_qty = qty * fill_fraction
-    fee_per_trade = _coerce_float(policy.get("fee_per_trade"), 0.0)
-    fee_per_share = _coerce_float(policy.get("fee_per_share"), 0.0)
-    fee_usd = fee_per_trade + fee_per_share * abs(fill_qty)
+    fee_usd = policy.fee_per_trade + policy.fee_per_share * abs(fill_qty)
     if fill_status != "FILLED":
         fill_qty = 0.0
-        fee_usd = fee_per_trade
+        fee_usd = policy.fee_per_trade
         fill_fraction = 0.0
         partial_fill = False
-    latency_sec = _coerce_float(policy.get("latency_ms"), 0.0) / 1000.0
 
-    return {
+    result: Dict[str, object] = {
         "fill_qty": fill_qty,
         "fill_price": fill_price,
         "fee_usd": fee_usd,
-        "slippage_bps": slippage_bps,
-        "spread_bps": spread_bps,
+        "slippage_bps": policy.slippage_bps,
+        "spread_bps": policy.spread_bps,
         "gap_bps": gap_bps,
         "gap_pct": gap_pct,
-        "latency_sec": latency_sec,
+        "latency_sec": policy.latency_sec,
         "fill_fraction": fill_fraction,
         "partial_fill": partial_fill,
         "rng_seed": seed_used,
@@ -164,6 +428,9 @@ def apply_friction(
         "reject_prob": rejection_prob,
         "fail_prob": failure_prob,
     }
+    if sampler is not None:
+        result["rng_index"] = int(fill_index)
+    return result
 
 
-__all__ = ["apply_friction", "load_friction_policy"]
+__all__ = ["FILL_STATUSES", "FrictionPolicy", "FrictionSampler", "apply_friction", "load_friction_policy"]
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Tuple
+
+# linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+# (device, inode, size, mtime_ns); None while the file does not exist
+FileSignature = Optional[Tuple[int, int, int, int]]
+
+
+def file_signature(path: Path) -> FileSignature:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class FileWatcher(ABC):
+    """
+    Blocks until ``path`` changes or a timeout passes.
+
+    ``wait(timeout)`` returns True when the file was modified, created,
+    replaced or removed, and False on timeout. After the first change it
+    keeps absorbing further changes until the file has been quiet for
+    ``debounce_s`` (bounded by the timeout), so a burst of appends produces
+    one wake-up instead of many.
+    """
+
+    kind = "base"
+
+    def __init__(self, path: Path, *, debounce_s: float = 0.05) -> None:
+        self.path = path
+        self.debounce_s = max(0.0, float(debounce_s))
+
+    @abstractmethod
+    def _wait_change(self, timeout_s: float) -> bool:
+        """Block up to ``timeout_s`` for one change; True if one was seen."""
+
+    def wait(self, timeout_s: float) -> bool:
+        deadline = time.monotonic() + max(0.0, float(timeout_s))
+        if not self._wait_change(max(0.0, deadline - time.monotonic())):
+            return False
+        while self.debounce_s > 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._wait_change(min(self.debounce_s, remaining)):
+                break
+        return True
+
+    def close(self) -> None:
+        return None
+
+    def __enter__(self) -> "FileWatcher":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class StatPollWatcher(FileWatcher):
+    """
+    Portable fallback: polls the file signature, starting at ``min_interval_s``
+    right after a change and backing off (x2) to ``max_interval_s`` while idle.
+    """
+
+    kind = "stat_poll"
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        debounce_s: float = 0.05,
+        min_interval_s: float = 0.02,
+        max_interval_s: float = 0.5,
+    ) -> None:
+        super().__init__(path, debounce_s=debounce_s)
+        self.min_interval_s = max(0.001, float(min_interval_s))
+        self.max_interval_s = max(self.min_interval_s, float(max_interval_s))
+        self._interval = self.min_interval_s
+        self._signature = file_signature(path)
+
+    def _wait_change(self, timeout_s: float) -> bool:
+        deadline = time.monotonic() + timeout_s
+        while True:
+            signature = file_signature(self.path)
+            if signature != self._signature:
+                self._signature = signature
+                self._interval = self.min_interval_s
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self._interval, remaining))
+            self._interval = min(self._interval * 2, self.max_interval_s)
+
+
+class InotifyWatcher(FileWatcher):
+    """
+    Linux inotify via libc. The parent directory is watched (not the file) so
+    that rotation, replacement and late creation of the file are all seen.
+    """
+
+    kind = "inotify"
+
+    def __init__(self, path: Path, *, debounce_s: float = 0.05) -> None:
+        super().__init__(path, debounce_s=debounce_s)
+        libc = _load_libc()
+        if libc is None:
+            raise OSError("inotify is not available")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(fd, os.fsencode(str(self.path.parent)), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, "inotify_add_watch failed")
+        self._fd: Optional[int] = fd
+        self._name = os.fsencode(self.path.name)
+
+    def _drain(self) -> bool:
+        assert self._fd is not None
+        hit = False
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return hit
+            if not buf:
+                return hit
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buf):
+                _wd, _mask, _cookie, name_len = _EVENT_HEADER.unpack_from(buf, offset)
+                start = offset + _EVENT_HEADER.size
+                name = buf[start : start + name_len].rstrip(b"\0")
+                if name == self._name:
+                    hit = True
+                offset = start + name_len
+
+    def _wait_change(self, timeout_s: float) -> bool:
+        if self._fd is None:
+            return False
+        deadline = time.monotonic() + timeout_s
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining < 0:
+                return False
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if not readable:
+                return False
+            if self._drain():
+                return True
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def build_file_watcher(
+    path: Path,
+    *,
+    mode: str = "auto",
+    debounce_s: float = 0.05,
+    min_interval_s: float = 0.02,
+    max_interval_s: float = 0.5,
+) -> FileWatcher:
+    """mode: auto (inotify, else stat poll) | inotify | stat_poll."""
+    mode = (mode or "auto").strip().lower()
+    if mode in ("auto", "inotify"):
+        try:
+            return InotifyWatcher(path, debounce_s=debounce_s)
+        except OSError:
+            if mode == "inotify":
+                raise
+    return StatPollWatcher(path, debounce_s=debounce_s, min_interval_s=min_interval_s, max_interval_s=max_interval_s)
+
+
+__all__ = [
+    "FileWatcher",
+    "InotifyWatcher",
+    "StatPollWatcher",
+    "build_file_watcher",
+    "file_signature",
+]
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import errno
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_KILL_SWITCH = "./Data/KILL_SWITCH"
+DEFAULT_CHECK_INTERVAL_S = 0.1
+# only "the file is not there" counts as released; any other stat error keeps the switch engaged
+_ABSENT_ERRNOS = {errno.ENOENT, errno.ENOTDIR}
+
+
+def kill_switch_path(cfg: Dict[str, object], *, root: Path = ROOT) -> Path:
+    risk_cfg = cfg.get("risk_guards", {}) or {}
+    path = Path(str(risk_cfg.get("kill_switch_path", DEFAULT_KILL_SWITCH))).expanduser()
+    if not path.is_absolute():
+        path = root / path
+    return path
+
+
+def kill_switch_enabled(cfg: Dict[str, object]) -> bool:
+    risk_cfg = cfg.get("risk_guards", {}) or {}
+    return bool(risk_cfg.get("kill_switch_enabled", True))
+
+
+class KillSwitchMonitor:
+    """
+    Cheap, fail-closed answer to "is the kill switch file present?".
+
+    The path is resolved once. ``engaged()`` stats it at most once per
+    ``interval_s`` and otherwise returns the last answer, so a newly created
+    switch is seen within ``interval_s``; a switch that was seen engaged
+    stays engaged until a later stat finds it gone. Stat errors other than
+    "not found" count as engaged. With ``watch`` (auto | inotify |
+    stat_poll) a daemon thread blocks on a file watcher and refreshes the
+    answer as soon as the file changes, rechecking every ``heartbeat_s``
+    regardless; ``engaged()`` is then a plain attribute read. If the watcher
+    cannot be built or its thread dies, the monitor falls back to polling.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        enabled: bool = True,
+        interval_s: float = DEFAULT_CHECK_INTERVAL_S,
+        watch: str = "off",
+        heartbeat_s: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = Path(path).expanduser().resolve()
+        self.enabled = bool(enabled)
+        self.interval_s = max(0.0, float(interval_s))
+        self.heartbeat_s = max(0.01, float(heartbeat_s))
+        self._clock = clock
+        self._engaged = False
+        self._checked_at: Optional[float] = None
+        self.checks = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._watcher = None
+        self.kind = "disabled" if not self.enabled else "poll"
+        if not self.enabled:
+            return
+        self.check()
+        watch = str(watch or "off").strip().lower()
+        if watch not in ("", "off", "none", "false"):
+            self._start_watch(watch)
+
+    def check(self) -> bool:
+        """Stat the switch now, bypassing the cadence."""
+        if not self.enabled:
+            return False
+        try:
+            os.stat(self.path)
+            engaged = True
+        except OSError as exc:
+            engaged = exc.errno not in _ABSENT_ERRNOS
+        self._engaged = engaged
+        self._checked_at = self._clock()
+        self.checks += 1
+        return engaged
+
+    def engaged(self) -> bool:
+        if not self.enabled:
+            return False
+        if self._thread is not None and self._thread.is_alive():
+            return self._engaged
+        if self._checked_at is None or self._clock() - self._checked_at >= self.interval_s:
+            return self.check()
+        return self._engaged
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.heartbeat_s + 1.0)
+            self._thread = None
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
+    def _start_watch(self, mode: str) -> None:
+        from tools.file_watch import build_file_watcher
+
+        try:
+            self._watcher = build_file_watcher(self.path, mode=mode, debounce_s=0.0)
+        except OSError:
+            return
+        self.kind = f"watch:{self._watcher.kind}"
+        self.check()  # a switch created before the watch was armed
+        self._thread = threading.Thread(target=self._run_watch, name="kill-switch-watch", daemon=True)
+        self._thread.start()
+
+    def _run_watch(self) -> None:
+        try:
+            while not self._stop.is_set():
+                # short slices keep close() prompt; the stat itself only runs on change or heartbeat
+                changed = self._watcher.wait(min(self.heartbeat_s, 0.25))
+                if changed or self._clock() - (self._checked_at or 0.0) >= self.heartbeat_s:
+                    self.check()
+        except Exception:
+            # engaged() notices the dead thread and goes back to polling
+            self.kind = "poll"
+
+
+_SHARED: Dict[Path, KillSwitchMonitor] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_monitor(
+    path: Path,
+    *,
+    interval_s: float = DEFAULT_CHECK_INTERVAL_S,
+    watch: str = "off",
+) -> KillSwitchMonitor:
+    """Process-wide monitor per resolved path; the first caller's cadence and watch mode win."""
+    resolved = Path(path).expanduser().resolve()
+    with _SHARED_LOCK:
+        monitor = _SHARED.get(resolved)
+        if monitor is None:
+            monitor = KillSwitchMonitor(resolved, interval_s=interval_s, watch=watch)
+            _SHARED[resolved] = monitor
+        return monitor
+
+
+def monitor_from_config(cfg: Dict[str, object], *, root: Path = ROOT, always_on: bool = False) -> KillSwitchMonitor:
+    """
+    Shared monitor for ``risk_guards`` (kill_switch_path, kill_switch_enabled,
+    kill_switch_check_ms, kill_switch_watch); a disabled switch gets its own
+    monitor that always answers False. ``always_on`` ignores
+    kill_switch_enabled for loops that always stopped on the file.
+    """
+    risk_cfg = cfg.get("risk_guards", {}) or {}
+    path = kill_switch_path(cfg, root=root)
+    if not always_on and not kill_switch_enabled(cfg):
+        return KillSwitchMonitor(path, enabled=False)
+    interval_s = float(risk_cfg.get("kill_switch_check_ms", DEFAULT_CHECK_INTERVAL_S * 1000.0)) / 1000.0
+    return shared_monitor(path, interval_s=interval_s, watch=str(risk_cfg.get("kill_switch_watch", "off")))
+
+
+__all__ = [
+    "DEFAULT_CHECK_INTERVAL_S",
+    "KillSwitchMonitor",
+    "kill_switch_enabled",
+    "kill_switch_path",
+    "monitor_from_config",
+    "shared_monitor",
+]
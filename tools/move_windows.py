@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SECONDS_PER_DAY = 86_400
+
+
+def window_label(seconds: float) -> str:
+    minutes = seconds / 60.0
+    return f"{int(minutes)}m" if minutes == int(minutes) else f"{int(seconds)}s"
+
+
+class MoveWindowDetector:
+    """
+    Rolling N-minute and intraday moves for a whole watchlist in one pass.
+
+    Each symbol owns one row of fixed-size ring buffers (timestamps, prices).
+    Ticks closer together than ``resolution_s`` overwrite the newest slot, so
+    ``capacity`` slots always span the longest window. ``moves()`` finds, for
+    every symbol and window at once, the newest buffered tick at or before
+    ``last_ts - window`` and returns the percentage move against it (NaN while
+    there is not enough history). The intraday reference is the first price
+    seen on the current UTC day.
+    """
+
+    def __init__(
+        self,
+        windows_s: Sequence[float],
+        *,
+        symbols: Sequence[str] = (),
+        capacity: int = 128,
+    ) -> None:
+        self.windows_s = np.asarray(sorted({float(w) for w in windows_s if float(w) > 0}), dtype=np.float64)
+        self.capacity = max(4, int(capacity))
+        longest = float(self.windows_s[-1]) if self.windows_s.size else 60.0
+        self.resolution_s = longest / (self.capacity - 2)
+        self.symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._ts = np.full((0, self.capacity), np.inf)
+        self._px = np.full((0, self.capacity), np.nan)
+        self._head = np.zeros(0, dtype=np.int64)
+        self._slot_ts = np.full(0, -np.inf)
+        self.last_ts = np.full(0, np.nan)
+        self.last_px = np.full(0, np.nan)
+        self.day_open = np.full(0, np.nan)
+        self._day = np.full(0, -1, dtype=np.int64)
+        self.updated = np.zeros(0, dtype=bool)
+        for symbol in symbols:
+            self.symbol_index(symbol)
+
+    def symbol_index(self, symbol: str) -> int:
+        idx = self._index.get(symbol)
+        if idx is not None:
+            return idx
+        idx = len(self.symbols)
+        self.symbols.append(symbol)
+        self._index[symbol] = idx
+        self._ts = np.vstack([self._ts, np.full((1, self.capacity), np.inf)])
+        self._px = np.vstack([self._px, np.full((1, self.capacity), np.nan)])
+        self._head = np.append(self._head, 0)
+        self._slot_ts = np.append(self._slot_ts, -np.inf)
+        self.last_ts = np.append(self.last_ts, np.nan)
+        self.last_px = np.append(self.last_px, np.nan)
+        self.day_open = np.append(self.day_open, np.nan)
+        self._day = np.append(self._day, -1)
+        self.updated = np.append(self.updated, False)
+        return idx
+
+    def push(self, symbol: str, price: float, ts_epoch: float) -> None:
+        i = self.symbol_index(symbol)
+        if not math.isnan(self.last_ts[i]) and ts_epoch < self.last_ts[i]:
+            return  # out-of-order tick; windows only move forward
+        if ts_epoch == self.last_ts[i] and price == self.last_px[i]:
+            return  # the newest tick again (e.g. a full re-read); nothing changed
+        day = int(ts_epoch // SECONDS_PER_DAY)
+        if day != self._day[i]:
+            self._day[i] = day
+            self.day_open[i] = price
+        if ts_epoch - self._slot_ts[i] >= self.resolution_s:
+            # open a new slot; otherwise the newest slot is overwritten in place
+            self._head[i] = (self._head[i] + 1) % self.capacity
+            self._slot_ts[i] = ts_epoch
+        pos = self._head[i]
+        self._ts[i, pos] = ts_epoch
+        self._px[i, pos] = price
+        self.last_ts[i] = ts_epoch
+        self.last_px[i] = price
+        self.updated[i] = True
+
+    def moves(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(window_moves[W, S], ref_ts[W, S], day_moves[S]) in percent; NaN where unknown."""
+        n_sym = len(self.symbols)
+        n_win = int(self.windows_s.size)
+        if n_sym == 0 or n_win == 0:
+            empty = np.full((n_win, n_sym), np.nan)
+            return empty, empty.copy(), self._day_moves()
+        cutoff = self.last_ts[None, :, None] - self.windows_s[:, None, None]  # (W, S, 1)
+        eligible = self._ts[None, :, :] <= cutoff  # (W, S, C)
+        masked_ts = np.where(eligible, self._ts[None, :, :], -np.inf)
+        ref_slot = masked_ts.argmax(axis=2)  # newest eligible slot per (window, symbol)
+        rows = np.arange(n_sym)[None, :]
+        ref_px = self._px[rows, ref_slot]
+        ref_ts = self._ts[rows, ref_slot]
+        valid = eligible.any(axis=2) & (ref_px > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            window_moves = np.where(valid, (self.last_px[None, :] - ref_px) / ref_px * 100.0, np.nan)
+        return window_moves, np.where(valid, ref_ts, np.nan), self._day_moves()
+
+    def _day_moves(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.day_open > 0, (self.last_px - self.day_open) / self.day_open * 100.0, np.nan)
+
+    def breaches(
+        self, window_pcts: Sequence[float], day_pct: Optional[float], *, only_updated: bool = True
+    ) -> List[Tuple[str, str, Dict[str, object]]]:
+        """
+        (alert_type, symbol, metrics) for every |move| >= threshold, e.g.
+        ("MOVE_5M", "AAPL", ...) or ("DAY_MOVE", "AAPL", ...). Clears the
+        per-symbol ``updated`` flags, so each tick is judged once.
+        """
+        window_moves, ref_ts, day_moves = self.moves()
+        gate = self.updated if only_updated else np.ones(len(self.symbols), dtype=bool)
+        out: List[Tuple[str, str, Dict[str, object]]] = []
+        thresholds = np.asarray(list(window_pcts), dtype=np.float64)[:, None]
+        if window_moves.size:
+            hit_w, hit_s = np.nonzero((np.abs(window_moves) >= thresholds) & gate[None, :])
+            for w, s in zip(hit_w.tolist(), hit_s.tolist()):
+                label = window_label(float(self.windows_s[w]))
+                out.append(
+                    (
+                        f"MOVE_{label.upper()}",
+                        self.symbols[s],
+                        {
+                            "window": label,
+                            "move_pct": float(window_moves[w, s]),
+                            "threshold": float(thresholds[w, 0]),
+                            "ref_ts_epoch": float(ref_ts[w, s]),
+                            "now": float(self.last_px[s]),
+                            "now_ts_epoch": float(self.last_ts[s]),
+                        },
+                    )
+                )
+        if day_pct is not None and day_pct > 0 and day_moves.size:
+            for s in np.nonzero((np.abs(day_moves) >= day_pct) & gate)[0].tolist():
+                out.append(
+                    (
+                        "DAY_MOVE",
+                        self.symbols[s],
+                        {
+                            "window": "day",
+                            "move_pct": float(day_moves[s]),
+                            "threshold": float(day_pct),
+                            "day_open": float(self.day_open[s]),
+                            "now": float(self.last_px[s]),
+                            "now_ts_epoch": float(self.last_ts[s]),
+                        },
+                    )
+                )
+        self.updated[:] = False
+        return out
+
+
+__all__ = ["MoveWindowDetector", "window_label"]
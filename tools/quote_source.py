@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import csv
+import random
+import sys
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_REPLAY_PATH = ROOT / "fixtures" / "quotes_sample.csv"
+DEFAULT_WALK_START = "2024-01-02T14:30:00+00:00"
+
+
+@dataclass
+class Quote:
+    ts_utc: str
+    symbol: str
+    price: float
+    source: str
+
+
+@dataclass
+class FetchCycle:
+    quotes: List[Quote] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    timed_out: List[str] = field(default_factory=list)
+    latency_s: float = 0.0
+
+
+class QuoteSource(ABC):
+    """One poll cycle worth of quotes per ``fetch`` call."""
+
+    name = "base"
+    exhausted = False
+
+    @abstractmethod
+    def fetch(self, symbols: Sequence[str], ts: str) -> FetchCycle:
+        ...
+
+    def close(self) -> None:
+        return None
+
+
+def _import_yfinance():
+    try:
+        import yfinance as yf
+    except ImportError:
+        print("缺少依赖 yfinance。请先运行：pip install yfinance pandas", file=sys.stderr)
+        raise
+    return yf
+
+
+def fetch_last_price(symbol: str, yf=None) -> Optional[float]:
+    """
+    取“最新价”：先 fast_info，失败则用 1分钟K线最后一个 close
+    """
+    yf = yf or _import_yfinance()
+    t = yf.Ticker(symbol)
+
+    try:
+        fi = getattr(t, "fast_info", None)
+        if fi:
+            p = fi.get("last_price") or fi.get("lastPrice")
+            if p is not None:
+                return float(p)
+    except Exception:
+        pass
+
+    try:
+        hist = t.history(period="1d", interval="1m", prepost=True)
+        if hist is None or hist.empty:
+            return None
+        last_close = hist["Close"].dropna()
+        if last_close.empty:
+            return None
+        return float(last_close.iloc[-1])
+    except Exception:
+        return None
+
+
+class YFinanceSource(QuoteSource):
+    """
+    并发拉取整个 watchlist：每个 symbol 一个任务，整轮共用一个截止时间。
+    截止时间内没返回的 symbol 记为失败（timed_out），不阻塞下一轮。
+    已经在跑的请求无法取消：卡住的 symbol 在其请求结束前直接记为 timed_out、不再提交，
+    并换一个新线程池，卡住的线程不再占用后续轮次的并发额度。
+    """
+
+    name = "yfinance"
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        timeout_s: float = 20.0,
+        fetcher: Optional[Callable[[str], Optional[float]]] = None,
+    ) -> None:
+        if fetcher is None:
+            yf = _import_yfinance()
+            fetcher = lambda sym: fetch_last_price(sym, yf)  # noqa: E731
+        self._fetcher = fetcher
+        self.max_workers = max(1, int(max_workers))
+        self.timeout_s = float(timeout_s)
+        self._executor = self._new_executor()
+        self._stuck: Dict[str, Future] = {}
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="quotes")
+
+    def fetch(self, symbols: Sequence[str], ts: str) -> FetchCycle:
+        start = time.monotonic()
+        self._stuck = {sym: fut for sym, fut in self._stuck.items() if not fut.done()}
+        futures = {
+            self._executor.submit(self._fetcher, sym): sym for sym in symbols if sym not in self._stuck
+        }
+        done, not_done = wait(futures, timeout=self.timeout_s if self.timeout_s > 0 else None)
+
+        prices: Dict[str, Optional[float]] = {}
+        for fut in done:
+            try:
+                prices[futures[fut]] = fut.result()
+            except Exception:
+                prices[futures[fut]] = None
+        hung = False
+        for fut in not_done:
+            if not fut.cancel():
+                # already running: it keeps its worker thread until the request returns
+                self._stuck[futures[fut]] = fut
+                hung = True
+        if hung:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+
+        cycle = FetchCycle()
+        for sym in symbols:
+            p = prices.get(sym)
+            if p is None:
+                cycle.failed.append(sym)
+                if sym not in prices:
+                    cycle.timed_out.append(sym)
+            else:
+                cycle.quotes.append(Quote(ts_utc=ts, symbol=sym, price=p, source=self.name))
+        cycle.latency_s = time.monotonic() - start
+        return cycle
+
+    @property
+    def stuck_symbols(self) -> List[str]:
+        return [sym for sym, fut in self._stuck.items() if not fut.done()]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _PacedSource(QuoteSource):
+    """Offline sources: emit ``batch_size`` quotes per fetch, paced to ``rate_per_s`` (0 = unpaced)."""
+
+    def __init__(self, batch_size: int, rate_per_s: float) -> None:
+        self.batch_size = max(1, int(batch_size))
+        self.rate_per_s = max(0.0, float(rate_per_s))
+        self._next_due: Optional[float] = None
+
+    def _pace(self, n: int) -> None:
+        if self.rate_per_s <= 0 or n <= 0:
+            return
+        now = time.monotonic()
+        if self._next_due is None:
+            self._next_due = now
+        delay = self._next_due - now
+        if delay > 0:
+            time.sleep(delay)
+        self._next_due = max(self._next_due, now) + n / self.rate_per_s
+
+
+class ReplaySource(_PacedSource):
+    """
+    Replay a quotes CSV in file order; with ``loop`` the timestamps keep
+    advancing on each pass. Rows without a price are skipped, and a
+    non-empty ``symbols`` watchlist passed to ``fetch`` filters the rows.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: Path = DEFAULT_REPLAY_PATH, batch_size: int = 1, rate_per_s: float = 0.0, loop: bool = False) -> None:
+        super().__init__(batch_size, rate_per_s)
+        self.path = path
+        self.loop = bool(loop)
+        self._rows: List[tuple[datetime, str, float]] = []
+        with path.open("r", newline="", encoding="utf-8") as fh:
+            for row in csv.DictReader(fh):
+                raw_price = str(row.get("price") or "").strip()
+                if not raw_price:
+                    continue
+                try:
+                    ts = datetime.fromisoformat(str(row.get("ts_utc") or row.get("ts")))
+                    price = float(raw_price)
+                except Exception:
+                    continue
+                if ts.tzinfo is None:
+                    ts = ts.replace(tzinfo=timezone.utc)
+                self._rows.append((ts, str(row.get("symbol") or "-").upper(), price))
+        if self._rows:
+            span = self._rows[-1][0] - self._rows[0][0]
+            self._pass_shift = span + timedelta(seconds=60)
+        else:
+            self._pass_shift = timedelta(0)
+        self._symbols = {symbol for _, symbol, _ in self._rows}
+        self._pos = 0
+        self._passes = 0
+        self.exhausted = not self._rows
+
+    def fetch(self, symbols: Sequence[str], ts: str) -> FetchCycle:
+        start = time.monotonic()
+        cycle = FetchCycle()
+        watch = {str(sym).upper() for sym in symbols}
+        if watch and watch.isdisjoint(self._symbols):
+            # nothing on the watchlist is in the file: looping would spin forever
+            self.exhausted = True
+        while len(cycle.quotes) < self.batch_size and not self.exhausted:
+            if self._pos >= len(self._rows):
+                if not self.loop:
+                    self.exhausted = True
+                    break
+                self._pos = 0
+                self._passes += 1
+            row_ts, symbol, price = self._rows[self._pos]
+            self._pos += 1
+            if watch and symbol not in watch:
+                continue
+            row_ts = row_ts + self._pass_shift * self._passes
+            cycle.quotes.append(
+                Quote(ts_utc=row_ts.isoformat(timespec="seconds"), symbol=symbol, price=price, source=self.name)
+            )
+        self._pace(len(cycle.quotes))
+        cycle.latency_s = time.monotonic() - start
+        return cycle
+
+
+class RandomWalkSource(_PacedSource):
+    """Seeded geometric random walk, one quote per symbol per tick on a synthetic clock."""
+
+    name = "random_walk"
+
+    def __init__(
+        self,
+        seed: int = 7,
+        start_price: float = 100.0,
+        volatility_pct: float = 0.2,
+        start_ts: str = DEFAULT_WALK_START,
+        step_seconds: float = 60.0,
+        rate_per_s: float = 0.0,
+        ticks_per_fetch: int = 1,
+    ) -> None:
+        super().__init__(ticks_per_fetch, rate_per_s)
+        self._rng = random.Random(seed)
+        self.start_price = float(start_price)
+        self.volatility = float(volatility_pct) / 100.0
+        self._clock = datetime.fromisoformat(start_ts)
+        self._step = timedelta(seconds=float(step_seconds))
+        self._prices: Dict[str, float] = {}
+
+    def fetch(self, symbols: Sequence[str], ts: str) -> FetchCycle:
+        start = time.monotonic()
+        cycle = FetchCycle()
+        gauss = self._rng.gauss
+        for _ in range(self.batch_size):
+            stamp = self._clock.isoformat(timespec="seconds")
+            for sym in symbols:
+                price = self._prices.get(sym, self.start_price) * (1.0 + gauss(0.0, self.volatility))
+                price = max(price, 0.01)
+                self._prices[sym] = price
+                cycle.quotes.append(Quote(ts_utc=stamp, symbol=sym, price=round(price, 6), source=self.name))
+            self._clock += self._step
+        self._pace(len(cycle.quotes))
+        cycle.latency_s = time.monotonic() - start
+        return cycle
+
+
+def build_quote_source(cfg: dict) -> QuoteSource:
+    """Pick the source from ``quotes.source`` in config.yaml (default yfinance)."""
+    quotes_cfg = cfg.get("quotes", {}) or {}
+    kind = str(quotes_cfg.get("source", "yfinance")).strip().lower()
+    rate = float(quotes_cfg.get("rate_per_s", 0.0))
+    if kind == "replay":
+        path = Path(str(quotes_cfg.get("replay_path", DEFAULT_REPLAY_PATH)))
+        if not path.is_absolute():
+            path = ROOT / path
+        return ReplaySource(
+            path,
+            batch_size=int(quotes_cfg.get("batch_size", 1)),
+            rate_per_s=rate,
+            loop=bool(quotes_cfg.get("loop", False)),
+        )
+    if kind == "random_walk":
+        return RandomWalkSource(
+            seed=int(quotes_cfg.get("seed", 7)),
+            volatility_pct=float(quotes_cfg.get("volatility_pct", 0.2)),
+            rate_per_s=rate,
+            ticks_per_fetch=int(quotes_cfg.get("batch_size", 1)),
+        )
+    if kind != "yfinance":
+        raise ValueError(f"unknown quotes.source: {kind}")
+    return YFinanceSource(
+        max_workers=int(quotes_cfg.get("max_workers", 8)),
+        timeout_s=float(quotes_cfg.get("fetch_timeout_seconds", 20)),
+    )
+
+
+__all__ = [
+    "FetchCycle",
+    "Quote",
+    "QuoteSource",
+    "RandomWalkSource",
+    "ReplaySource",
+    "YFinanceSource",
+    "build_quote_source",
+    "fetch_last_price",
+]
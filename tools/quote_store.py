@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import sys
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_STORE_DIR = ROOT / "Data" / "quote_store"
+SYMBOLS_FILE = "symbols.json"
+# column name -> (file suffix, array typecode, numpy dtype)
+COLUMNS: Dict[str, Tuple[str, str, str]] = {
+    "ts_ns": ("ts.i64", "q", "<i8"),
+    "symbol_id": ("sym.i32", "i", "<i4"),
+    "price": ("px.f64", "d", "<f8"),
+}
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NS_PER_DAY = 86_400 * 1_000_000_000
+
+
+def iso_to_epoch_ns(value: str) -> int:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1_000
+
+
+def epoch_ns_to_iso(value: int) -> str:
+    seconds, ns = divmod(int(value), 1_000_000_000)
+    dt = datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=ns // 1_000)
+    return dt.isoformat()
+
+
+def _segment_path(store_dir: Path, day: str, column: str) -> Path:
+    return store_dir / f"{day}.{COLUMNS[column][0]}"
+
+
+def _load_symbols(store_dir: Path) -> List[str]:
+    path = store_dir / SYMBOLS_FILE
+    if not path.exists():
+        return []
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return []
+    return [str(s) for s in payload.get("symbols", [])] if isinstance(payload, dict) else []
+
+
+class QuoteStoreWriter:
+    """
+    Append-only columnar store: one segment per UTC day, one raw file per column
+    (int64 epoch-ns timestamps, int32 dictionary-encoded symbol ids, float64 prices).
+    The symbol dictionary lives in symbols.json and only ever grows.
+    """
+
+    def __init__(self, store_dir: Path = DEFAULT_STORE_DIR) -> None:
+        self.store_dir = store_dir
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self._symbols = _load_symbols(store_dir)
+        self._symbol_ids = {sym: idx for idx, sym in enumerate(self._symbols)}
+        self._day: Optional[str] = None
+        self._day_index: Optional[int] = None
+        self._handles: Dict[str, IO[bytes]] = {}
+
+    def _symbol_id(self, symbol: str) -> int:
+        sid = self._symbol_ids.get(symbol)
+        if sid is None:
+            sid = len(self._symbols)
+            self._symbols.append(symbol)
+            self._symbol_ids[symbol] = sid
+            path = self.store_dir / SYMBOLS_FILE
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_text(json.dumps({"schema_version": 1, "symbols": self._symbols}, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(path)
+        return sid
+
+    def _open_day(self, day_index: int) -> None:
+        self._close_handles()
+        day = epoch_ns_to_iso(day_index * NS_PER_DAY)[:10]
+        self._handles = {col: _segment_path(self.store_dir, day, col).open("ab") for col in COLUMNS}
+        self._day = day
+        self._day_index = day_index
+
+    def _write_batch(self, ts: array, sym: array, px: array) -> None:
+        for column, values in (("ts_ns", ts), ("symbol_id", sym), ("price", px)):
+            if sys.byteorder != "little":
+                values.byteswap()
+            self._handles[column].write(values.tobytes())
+        for fh in self._handles.values():
+            fh.flush()
+
+    def append(self, quotes: Iterable[object]) -> int:
+        """Append quotes (objects with ts_utc/symbol/price); returns rows written."""
+        written = 0
+        ts, sym, px = array("q"), array("i"), array("d")
+        for q in quotes:
+            ts_utc = str(getattr(q, "ts_utc"))
+            try:
+                ts_ns = iso_to_epoch_ns(ts_utc)
+                price = float(getattr(q, "price"))
+            except Exception:
+                continue
+            day_index = ts_ns // NS_PER_DAY
+            if day_index != self._day_index:
+                if len(ts):
+                    self._write_batch(ts, sym, px)
+                    ts, sym, px = array("q"), array("i"), array("d")
+                self._open_day(day_index)
+            ts.append(ts_ns)
+            sym.append(self._symbol_id(str(getattr(q, "symbol")).upper()))
+            px.append(price)
+            written += 1
+        if len(ts):
+            self._write_batch(ts, sym, px)
+        return written
+
+    def _close_handles(self) -> None:
+        for fh in self._handles.values():
+            fh.close()
+        self._handles = {}
+        self._day = None
+        self._day_index = None
+
+    def close(self) -> None:
+        self._close_handles()
+
+    def __enter__(self) -> "QuoteStoreWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+@dataclass
+class QuoteColumns:
+    ts_ns: np.ndarray
+    symbol_id: np.ndarray
+    price: np.ndarray
+    symbols: List[str]
+
+    def __len__(self) -> int:
+        return int(self.ts_ns.shape[0])
+
+    def symbol_mask(self, symbol: str) -> np.ndarray:
+        try:
+            sid = self.symbols.index(symbol.upper())
+        except ValueError:
+            return np.zeros(len(self), dtype=bool)
+        return self.symbol_id == sid
+
+    def to_rows(self) -> List[Dict[str, object]]:
+        """Row dicts shaped like the CSV loaders' output (ts_utc/symbol/price)."""
+        symbols = self.symbols
+        return [
+            {"ts_utc": epoch_ns_to_iso(ts), "symbol": symbols[sid], "price": px}
+            for ts, sid, px in zip(self.ts_ns.tolist(), self.symbol_id.tolist(), self.price.tolist())
+        ]
+
+
+class QuoteStore:
+    """Read-only view over a store directory; day segments are memory mapped, not parsed."""
+
+    def __init__(self, store_dir: Path = DEFAULT_STORE_DIR) -> None:
+        self.store_dir = store_dir
+        self.symbols = _load_symbols(store_dir)
+
+    def days(self) -> List[str]:
+        suffix = "." + COLUMNS["ts_ns"][0]
+        if not self.store_dir.exists():
+            return []
+        return sorted(p.name[: -len(suffix)] for p in self.store_dir.glob(f"*{suffix}"))
+
+    def _map(self, day: str, column: str) -> np.ndarray:
+        path = _segment_path(self.store_dir, day, column)
+        dtype = np.dtype(COLUMNS[column][2])
+        size = path.stat().st_size if path.exists() else 0
+        count = size // dtype.itemsize
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+    def load_day(self, day: str) -> QuoteColumns:
+        cols = {column: self._map(day, column) for column in COLUMNS}
+        # a writer killed mid-batch can leave columns uneven; keep the common prefix
+        n = min(arr.shape[0] for arr in cols.values())
+        return QuoteColumns(cols["ts_ns"][:n], cols["symbol_id"][:n], cols["price"][:n], list(self.symbols))
+
+    def load(self, start_day: Optional[str] = None, end_day: Optional[str] = None) -> QuoteColumns:
+        days = [d for d in self.days() if (start_day is None or d >= start_day) and (end_day is None or d <= end_day)]
+        parts = [self.load_day(d) for d in days]
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return QuoteColumns(
+                np.empty(0, dtype="<i8"), np.empty(0, dtype="<i4"), np.empty(0, dtype="<f8"), list(self.symbols)
+            )
+        return QuoteColumns(
+            np.concatenate([p.ts_ns for p in parts]),
+            np.concatenate([p.symbol_id for p in parts]),
+            np.concatenate([p.price for p in parts]),
+            list(self.symbols),
+        )
+
+
+def store_from_config(cfg: dict, root: Path = ROOT) -> Optional[QuoteStoreWriter]:
+    quotes_cfg = cfg.get("quotes", {}) or {}
+    if not quotes_cfg.get("columnar_store", False):
+        return None
+    store_dir = Path(str(quotes_cfg.get("columnar_store_dir", "./Data/quote_store")))
+    if not store_dir.is_absolute():
+        store_dir = root / store_dir
+    return QuoteStoreWriter(store_dir)
+
+
+def load_quote_rows(store_dir: Path) -> List[Dict[str, object]]:
+    return QuoteStore(store_dir).load().to_rows()
+
+
+__all__ = [
+    "DEFAULT_STORE_DIR",
+    "QuoteColumns",
+    "QuoteStore",
+    "QuoteStoreWriter",
+    "epoch_ns_to_iso",
+    "iso_to_epoch_ns",
+    "load_quote_rows",
+    "store_from_config",
+]
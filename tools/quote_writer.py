@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import csv
+import io
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Iterable, Optional
+
+QUOTES_HEADER = ["ts_utc", "symbol", "price", "source"]
+
+
+class QuotesCsvWriter:
+    """
+    Long-lived appender for quotes.csv.
+
+    Rows are buffered in memory and written through one open handle. The
+    buffer is flushed when any configured threshold is reached (rows, bytes
+    or milliseconds since the first pending row); with every threshold at 0
+    each ``append`` is flushed immediately. The header is written through
+    the same handle when the file is empty, so there is no exists()/open race.
+    With ``rotate_daily`` rows go to ``quotes_YYYY-MM-DD.csv`` keyed on the
+    UTC date of each quote's ``ts_utc``.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        *,
+        flush_rows: int = 0,
+        flush_bytes: int = 0,
+        flush_ms: float = 0.0,
+        rotate_daily: bool = False,
+        base_name: str = "quotes",
+    ) -> None:
+        self.data_dir = data_dir
+        self.flush_rows = max(0, int(flush_rows))
+        self.flush_bytes = max(0, int(flush_bytes))
+        self.flush_ms = max(0.0, float(flush_ms))
+        self.rotate_daily = bool(rotate_daily)
+        self.base_name = base_name
+        self._fh: Optional[IO[str]] = None
+        self._day: Optional[str] = None
+        self._path: Optional[Path] = None
+        self._buf = io.StringIO()
+        self._writer = csv.writer(self._buf)
+        self._pending_rows = 0
+        self._pending_since: Optional[float] = None
+
+    @property
+    def path(self) -> Path:
+        if self._path is not None:
+            return self._path
+        return self._path_for_day(None)
+
+    @property
+    def pending_rows(self) -> int:
+        return self._pending_rows
+
+    def _path_for_day(self, day: Optional[str]) -> Path:
+        if self.rotate_daily and day:
+            return self.data_dir / f"{self.base_name}_{day}.csv"
+        return self.data_dir / f"{self.base_name}.csv"
+
+    def _open(self, day: Optional[str]) -> None:
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path_for_day(day)
+        fh = path.open("a", newline="", encoding="utf-8")
+        if fh.tell() == 0:
+            csv.writer(fh).writerow(QUOTES_HEADER)
+            fh.flush()
+        self._fh = fh
+        self._day = day
+        self._path = path
+
+    def _rotate_to(self, day: Optional[str]) -> None:
+        if self._fh is not None and day == self._day:
+            return
+        self.flush()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self._open(day)
+
+    def append(self, quotes: Iterable[object]) -> Path:
+        """Buffer quotes (objects with ts_utc/symbol/price/source) and flush if a threshold is hit."""
+        for q in quotes:
+            ts_utc = str(getattr(q, "ts_utc"))
+            if self.rotate_daily:
+                day = ts_utc[:10]
+                if day != self._day:
+                    self._rotate_to(day)
+            elif self._fh is None:
+                self._open(None)
+            self._writer.writerow([ts_utc, getattr(q, "symbol"), getattr(q, "price"), getattr(q, "source")])
+            self._pending_rows += 1
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+        self.maybe_flush()
+        return self.path
+
+    def _due(self) -> bool:
+        if not self._pending_rows:
+            return False
+        if not (self.flush_rows or self.flush_bytes or self.flush_ms):
+            return True
+        if self.flush_rows and self._pending_rows >= self.flush_rows:
+            return True
+        if self.flush_bytes and self._buf.tell() >= self.flush_bytes:
+            return True
+        if self.flush_ms and self._pending_since is not None:
+            return (time.monotonic() - self._pending_since) * 1000.0 >= self.flush_ms
+        return False
+
+    def maybe_flush(self) -> bool:
+        if self._due():
+            self.flush()
+            return True
+        return False
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Time left before the ms threshold forces a flush; None when nothing is pending or no ms policy."""
+        if not self._pending_rows or not self.flush_ms or self._pending_since is None:
+            return None
+        return max(0.0, self.flush_ms / 1000.0 - (time.monotonic() - self._pending_since))
+
+    def flush_before_sleep(self, sleep_s: float) -> None:
+        """
+        Called by idle loops: flush now only if the ms deadline would expire
+        during the sleep. Row/byte thresholds keep buffering across sleeps.
+        """
+        if sleep_s <= 0:
+            return
+        remaining = self.seconds_until_due()
+        if remaining is not None and remaining <= sleep_s:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending_rows:
+            return
+        if self._fh is None:
+            self._open(self._day)
+        assert self._fh is not None
+        self._fh.write(self._buf.getvalue())
+        self._fh.flush()
+        self._buf.seek(0)
+        self._buf.truncate(0)
+        self._pending_rows = 0
+        self._pending_since = None
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def __enter__(self) -> "QuotesCsvWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def current_quotes_path(data_dir: Path, *, rotate_daily: bool = False, base_name: str = "quotes") -> Path:
+    """
+    The file the writer is appending to right now: ``quotes.csv``, or with
+    ``rotate_daily`` the newest ``quotes_YYYY-MM-DD.csv`` (ISO dates sort by
+    name). Falls back to today's UTC dated name before the first rotation.
+    """
+    if not rotate_daily:
+        return data_dir / f"{base_name}.csv"
+    pattern = f"{base_name}_[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9].csv"
+    dated = sorted(data_dir.glob(pattern)) if data_dir.is_dir() else []
+    if dated:
+        return dated[-1]
+    return data_dir / f"{base_name}_{datetime.now(timezone.utc).date().isoformat()}.csv"
+
+
+def writer_from_config(cfg: dict, data_dir: Path) -> QuotesCsvWriter:
+    quotes_cfg = cfg.get("quotes", {}) or {}
+    return QuotesCsvWriter(
+        data_dir,
+        flush_rows=int(quotes_cfg.get("flush_rows", 0)),
+        flush_bytes=int(quotes_cfg.get("flush_bytes", 0)),
+        flush_ms=float(quotes_cfg.get("flush_ms", 0)),
+        rotate_daily=bool(quotes_cfg.get("rotate_daily", False)),
+    )
+
+
+__all__ = ["QUOTES_HEADER", "QuotesCsvWriter", "current_quotes_path", "writer_from_config"]
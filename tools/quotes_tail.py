@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import csv
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# (symbol, prev_price, now_price, now_ts)
+PricePair = Tuple[str, float, float, datetime]
+# (symbol, price, ts)
+QuoteTick = Tuple[str, float, datetime]
+
+
+@dataclass
+class QuotesSnapshot:
+    """What one alerts poll needs from quotes.csv, however it was read."""
+
+    raw_rows: int = 0
+    schema_ok: bool = True
+    last_rows: int = 0
+    last_prices: Dict[str, float] = field(default_factory=dict)
+    pairs: List[PricePair] = field(default_factory=list)
+    ticks: List[QuoteTick] = field(default_factory=list)
+
+
+def parse_ts_utc(value: str) -> Optional[datetime]:
+    try:
+        ts = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except Exception:
+        return None
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+
+class _SymbolTail:
+    __slots__ = ("prev_ts", "prev_price", "last_ts", "last_price")
+
+    def __init__(self) -> None:
+        self.prev_ts: Optional[datetime] = None
+        self.prev_price = 0.0
+        self.last_ts: Optional[datetime] = None
+        self.last_price = 0.0
+
+    def push(self, ts: datetime, price: float) -> bool:
+        """Keep the two newest rows by timestamp (later rows win ties); True if the pair needs re-evaluating."""
+        if self.last_ts is None or ts >= self.last_ts:
+            self.prev_ts, self.prev_price = self.last_ts, self.last_price
+            self.last_ts, self.last_price = ts, price
+            return True
+        first_pair = self.prev_ts is None
+        if first_pair or ts >= self.prev_ts:
+            self.prev_ts, self.prev_price = ts, price
+        return first_pair
+
+
+class QuotesTailReader:
+    """
+    Incremental reader for an append-only quotes.csv.
+
+    Remembers the byte offset of the last complete line plus the file
+    identity (device/inode). Each ``poll`` parses only rows appended since
+    the previous one. A different inode or a file shorter than the offset
+    means rotation or truncation; the reader then starts over from byte 0.
+    ``follow`` switches to a new dated file while keeping each symbol's last
+    prices, so the first pair of a new day still has its previous price.
+    ``ticks`` lists every row accepted by the poll, in file order.
+    """
+
+    def __init__(self, path: Path, watchlist: Optional[Set[str]] = None) -> None:
+        self.path = path
+        self.watchlist = watchlist
+        self._reset()
+
+    def _reset(self) -> None:
+        self._reset_position()
+        self._raw_rows = 0
+        self._valid_rows = 0
+        self._tails: Dict[str, _SymbolTail] = {}
+
+    def _reset_position(self) -> None:
+        self._identity: Optional[Tuple[int, int]] = None
+        self._offset = 0
+        self._columns: Optional[Tuple[int, int, int]] = None
+
+    def follow(self, path: Path) -> None:
+        """Continue from the start of ``path`` (e.g. the next ``quotes_YYYY-MM-DD.csv``)."""
+        if path == self.path:
+            return
+        self.path = path
+        self._reset_position()
+
+    def _read_new_lines(self) -> List[str]:
+        st = os.stat(self.path)
+        identity = (st.st_dev, st.st_ino)
+        if self._identity is not None and (identity != self._identity or st.st_size < self._offset):
+            self._reset()
+        self._identity = identity
+        if st.st_size == self._offset:
+            return []
+        with self.path.open("rb") as fh:
+            fh.seek(self._offset)
+            chunk = fh.read(st.st_size - self._offset)
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return []
+        self._offset += end + 1
+        return chunk[: end + 1].decode("utf-8", errors="replace").splitlines()
+
+    def _parse_header(self, line: str) -> bool:
+        header = next(csv.reader([line.lstrip("\ufeff")]), [])
+        cols_lower = {c.strip().lower(): idx for idx, c in enumerate(header)}
+        if not all(k in cols_lower for k in ("ts_utc", "symbol", "price")):
+            return False
+        self._columns = (cols_lower["ts_utc"], cols_lower["symbol"], cols_lower["price"])
+        return True
+
+    def poll(self) -> QuotesSnapshot:
+        lines = self._read_new_lines()
+        if self._columns is None and lines:
+            header_line, lines = lines[0], lines[1:]
+            if not self._parse_header(header_line):
+                # schema not ready: re-read the header next time
+                self._offset = 0
+                return QuotesSnapshot(raw_rows=len(lines), schema_ok=False)
+
+        changed: Set[str] = set()
+        ticks: List[QuoteTick] = []
+        if lines and self._columns is not None:
+            ts_idx, sym_idx, px_idx = self._columns
+            width = max(self._columns)
+            for row in csv.reader(lines):
+                if not row:
+                    continue
+                self._raw_rows += 1
+                if len(row) <= width:
+                    continue
+                ts = parse_ts_utc(row[ts_idx])
+                symbol = row[sym_idx].strip().upper()
+                try:
+                    price = float(row[px_idx])
+                except ValueError:
+                    continue
+                if ts is None or not symbol or price != price:
+                    continue
+                if self.watchlist is not None and symbol not in self.watchlist:
+                    continue
+                self._valid_rows += 1
+                ticks.append((symbol, price, ts))
+                tail = self._tails.get(symbol)
+                if tail is None:
+                    tail = self._tails[symbol] = _SymbolTail()
+                if tail.push(ts, price):
+                    changed.add(symbol)
+
+        pairs: List[PricePair] = []
+        for symbol in sorted(changed):
+            tail = self._tails[symbol]
+            if tail.prev_ts is not None and tail.last_ts is not None:
+                pairs.append((symbol, tail.prev_price, tail.last_price, tail.last_ts))
+        return QuotesSnapshot(
+            raw_rows=self._raw_rows,
+            schema_ok=self._columns is not None,
+            last_rows=self._valid_rows,
+            last_prices={sym: t.last_price for sym, t in self._tails.items()},
+            pairs=pairs,
+            ticks=ticks,
+        )
+
+
+__all__ = ["PricePair", "QuoteTick", "QuotesSnapshot", "QuotesTailReader", "parse_ts_utc"]
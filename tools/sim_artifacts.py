@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import IO, Any, Dict, List, Tuple
+
+from tools.state_persist import atomic_write_json
+
+
+def count_lines(path: Path) -> Tuple[int, bool]:
+    """Line count as ``sum(1 for _ in fh)`` sees it, plus whether the file ends with a newline."""
+    lines = 0
+    last = b"\n"
+    with path.open("rb") as fh:
+        while True:
+            chunk = fh.read(1 << 20)
+            if not chunk:
+                break
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":
+        lines += 1
+    return lines, last == b"\n"
+
+
+class SimArtifactWriter:
+    """
+    Run-scoped writer for the files one sim run produces.
+
+    JSONL appends (orders, events, equity curve) are buffered per file behind
+    handles that stay open for the whole run, and written once ``flush_lines``
+    lines are pending. Snapshot files (risk_state.json, portfolio_sim.json)
+    only keep their latest payload in memory and are written atomically every
+    ``checkpoint_every`` ticks, on ``flush()`` and on ``close()``.
+    ``append_json`` returns the 1-based line number the record will occupy,
+    so evidence such as ``orders_sim.jsonl#L12`` stays exact.
+    """
+
+    def __init__(self, *, checkpoint_every: int = 500, flush_lines: int = 1024, indent: int | None = 2) -> None:
+        self.checkpoint_every = max(0, int(checkpoint_every))
+        self.flush_lines = max(1, int(flush_lines))
+        self.indent = indent
+        self.ticks = 0
+        self.checkpoints = 0
+        self.last_error: str | None = None
+        self._handles: Dict[Path, IO[str]] = {}
+        self._pending: Dict[Path, List[str]] = {}
+        self._pending_count = 0
+        self._lines: Dict[Path, int] = {}
+        self._snapshots: Dict[Path, Any] = {}
+        self._closed = False
+
+    # ---------- appends ----------
+    def line_count(self, path: Path) -> int:
+        """Lines in ``path`` including buffered ones; read from disk once per run."""
+        count = self._lines.get(path)
+        if count is None:
+            try:
+                count = count_lines(path)[0] if path.exists() else 0
+            except Exception:
+                count = 0
+            self._lines[path] = count
+        return count
+
+    def append_json(self, path: Path, payload: Dict[str, object]) -> int:
+        return self.append_line(path, json.dumps(payload, ensure_ascii=False))
+
+    def append_line(self, path: Path, line: str) -> int:
+        if self._closed:
+            raise RuntimeError("SimArtifactWriter is closed")
+        line_no = self.line_count(path) + 1
+        self._lines[path] = line_no
+        self._pending.setdefault(path, []).append(line)
+        self._pending_count += 1
+        if self._pending_count >= self.flush_lines:
+            self._write_pending()
+        return line_no
+
+    # ---------- snapshots ----------
+    def snapshot(self, path: Path, payload: Any) -> None:
+        """Stage the latest content of a whole-file JSON snapshot."""
+        if self._closed:
+            raise RuntimeError("SimArtifactWriter is closed")
+        self._snapshots[path] = payload
+
+    # ---------- lifecycle ----------
+    def tick(self) -> bool:
+        """Mark the end of one sim step; checkpoints when one is due."""
+        self.ticks += 1
+        if self.checkpoint_every and self.ticks % self.checkpoint_every == 0:
+            self.flush()
+            return True
+        return False
+
+    def flush(self) -> None:
+        """Write every buffered line and staged snapshot (checkpoint, kill switch, end of run)."""
+        self._write_pending()
+        for path, payload in self._snapshots.items():
+            try:
+                atomic_write_json(path, payload, indent=self.indent, ensure_ascii=False)
+            except Exception as exc:
+                self._warn(f"failed to write {path.name}: {exc}")
+        self._snapshots.clear()
+        self.checkpoints += 1
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        for fh in self._handles.values():
+            try:
+                fh.close()
+            except Exception:
+                pass
+        self._handles.clear()
+
+    def __enter__(self) -> "SimArtifactWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # ---------- internals ----------
+    def _warn(self, message: str) -> None:
+        self.last_error = message
+        try:
+            print(f"[WARN] sim artifacts: {message}")
+        except Exception:
+            pass
+
+    def _write_pending(self) -> None:
+        for path, lines in self._pending.items():
+            if not lines:
+                continue
+            try:
+                fh = self._handles.get(path)
+                if fh is None:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    fh = path.open("a", encoding="utf-8")
+                    self._handles[path] = fh
+                fh.write("\n".join(lines) + "\n")
+                fh.flush()
+            except Exception as exc:
+                self._warn(f"failed to append {path.name}: {exc}")
+        self._pending.clear()
+        self._pending_count = 0
+
+
+__all__ = ["SimArtifactWriter", "count_lines"]
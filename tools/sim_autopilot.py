@@ -1,17 +1,27 @@
 from __future__ import annotations
 
 import json
+import os
+import struct
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
 
 import yaml
 
-from tools.execution_friction import apply_friction, load_friction_policy
+from tools.event_sink import EventSink
+from tools.execution_friction import FrictionPolicy, FrictionSampler, PolicyLike, apply_friction
+from tools.kill_switch import kill_switch_enabled, kill_switch_path, monitor_from_config
+from tools.sim_artifacts import SimArtifactWriter, count_lines
+from tools.sim_portfolio import PortfolioBook
 
 ROOT = Path(__file__).resolve().parent.parent
 UTC = timezone.utc
+# orders file -> (st_dev, st_ino, st_size, line_count); lets every SimAutopilot in the
+# process number orders without re-reading the log, and notices outside writers by size
+_ORDER_LINE_CACHE: Dict[Path, Tuple[int, int, int, int]] = {}
 
 
 def _now() -> datetime:
@@ -30,41 +40,177 @@ def _default_risk_config() -> Dict[str, float | int | str]:
     }
 
 
+def _load_config_file(path: Path) -> Dict[str, object]:
+    if not path.exists():
+        return {}
+    try:
+        with path.open("r", encoding="utf-8") as fh:
+            return yaml.safe_load(fh) or {}
+    except Exception:
+        return {}
+
+
 def _kill_switch_path(cfg: Dict[str, object]) -> Path:
-    risk_cfg = cfg.get("risk_guards", {}) or {}
-    kill_switch = risk_cfg.get("kill_switch_path", "./Data/KILL_SWITCH")
-    path = Path(str(kill_switch)).expanduser()
-    if not path.is_absolute():
-        path = ROOT / path
-    return path
+    return kill_switch_path(cfg, root=ROOT)
 
 
 def _kill_switch_enabled(cfg: Dict[str, object]) -> bool:
-    risk_cfg = cfg.get("risk_guards", {}) or {}
-    return bool(risk_cfg.get("kill_switch_enabled", True))
+    return kill_switch_enabled(cfg)
+
+
+RATE_WINDOW = timedelta(minutes=1)
+REJECTS_KEPT = 10
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=UTC)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+_ONE_US = timedelta(microseconds=1)
+# binary RiskState snapshot: magic, fixed floats/flags, then length-prefixed sections
+_SNAPSHOT_MAGIC = b"RSK1"
+_SNAPSHOT_HEAD = struct.Struct("<6d?")
+_SNAPSHOT_TS = struct.Struct("<Bqq")  # kind (0 none, 1 naive, 2 aware), epoch us, utc offset us
+_SNAPSHOT_LEN = struct.Struct("<I")
+
+
+def _pack_ts(ts: Optional[datetime]) -> bytes:
+    if ts is None:
+        return _SNAPSHOT_TS.pack(0, 0, 0)
+    offset = ts.utcoffset()
+    if offset is None:
+        return _SNAPSHOT_TS.pack(1, (ts - _EPOCH_NAIVE) // _ONE_US, 0)
+    return _SNAPSHOT_TS.pack(2, (ts - _EPOCH_UTC) // _ONE_US, offset // _ONE_US)
+
 
+def _pack_str(value: str) -> bytes:
+    raw = value.encode("utf-8")
+    return _SNAPSHOT_LEN.pack(len(raw)) + raw
 
-@dataclass
+
+class _SnapshotReader:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes) -> None:
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def unpack(self, fmt: struct.Struct) -> Tuple:
+        values = fmt.unpack_from(self.data, self.pos)
+        self.pos += fmt.size
+        return values
+
+    def count(self) -> int:
+        return self.unpack(_SNAPSHOT_LEN)[0]
+
+    def text(self) -> str:
+        size = self.count()
+        raw = bytes(self.data[self.pos : self.pos + size])
+        self.pos += size
+        return raw.decode("utf-8")
+
+    def ts(self) -> Optional[datetime]:
+        kind, micros, offset = self.unpack(_SNAPSHOT_TS)
+        if kind == 0:
+            return None
+        if kind == 1:
+            return _EPOCH_NAIVE + micros * _ONE_US
+        return (_EPOCH_UTC + micros * _ONE_US).astimezone(timezone(offset * _ONE_US))
+
+
+@dataclass(slots=True)
 class RiskState:
+    """
+    Live risk bookkeeping for one sim run.
+
+    ``intent_times`` is a rolling one-minute window kept in arrival order, so
+    the orders-per-minute check only pops expired entries off the left;
+    ``rejects_recent`` keeps the last ten reasons. ``to_bytes``/``from_bytes``
+    are a compact snapshot format that skips the ISO-string round trip of
+    ``_risk_state_to_dict``.
+    """
+
     mode: str = "NORMAL"
-    intent_times: List[datetime] = field(default_factory=list)
+    intent_times: Deque[datetime] = field(default_factory=deque)
     last_exec_ts: Optional[datetime] = None
-    rejects_recent: List[str] = field(default_factory=list)
+    rejects_recent: Deque[str] = field(default_factory=lambda: deque(maxlen=REJECTS_KEPT))
     daily_loss: float = 0.0
     start_equity: float = 10_000.0
     peak_equity: float = 10_000.0
     equity: float = 10_000.0
     postmortem_triggered: bool = False
     evidence_notes: List[str] = field(default_factory=list)
+    max_daily_loss: float = 0.0
+    max_drawdown: float = 0.0
+    # False once an out-of-order timestamp arrives; the window then falls back to a full filter
+    _times_ordered: bool = field(default=True, init=False, repr=False, compare=False)
 
     def record_reject(self, reason: str) -> None:
         self.rejects_recent.append(reason)
-        self.rejects_recent = self.rejects_recent[-10:]
 
     def register_intent(self, ts: datetime) -> None:
-        self.intent_times.append(ts)
-        cutoff = ts - timedelta(minutes=1)
-        self.intent_times = [t for t in self.intent_times if t >= cutoff]
+        times = self.intent_times
+        cutoff = ts - RATE_WINDOW
+        if self._times_ordered and times and ts < times[-1]:
+            self._times_ordered = False
+        times.append(ts)
+        if self._times_ordered:
+            while times[0] < cutoff:
+                times.popleft()
+            return
+        kept = deque(t for t in times if t >= cutoff)
+        self._times_ordered = all(a <= b for a, b in zip(kept, list(kept)[1:]))
+        self.intent_times = kept
+
+    def set_intent_times(self, times: List[datetime]) -> None:
+        self.intent_times = deque(times)
+        try:
+            self._times_ordered = all(a <= b for a, b in zip(times, times[1:]))
+        except TypeError:  # mixed naive/aware history: the next intent decides how to fail
+            self._times_ordered = False
+
+    def to_bytes(self) -> bytes:
+        parts = [
+            _SNAPSHOT_MAGIC,
+            _SNAPSHOT_HEAD.pack(
+                self.daily_loss,
+                self.start_equity,
+                self.peak_equity,
+                self.equity,
+                self.max_daily_loss,
+                self.max_drawdown,
+                self.postmortem_triggered,
+            ),
+            _pack_str(self.mode),
+            _pack_ts(self.last_exec_ts),
+            _SNAPSHOT_LEN.pack(len(self.intent_times)),
+        ]
+        parts.extend(_pack_ts(ts) for ts in self.intent_times)
+        for items in (self.rejects_recent, self.evidence_notes):
+            parts.append(_SNAPSHOT_LEN.pack(len(items)))
+            parts.extend(_pack_str(item) for item in items)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RiskState":
+        if bytes(data[:4]) != _SNAPSHOT_MAGIC:
+            raise ValueError("not a RiskState snapshot")
+        reader = _SnapshotReader(data)
+        reader.pos = len(_SNAPSHOT_MAGIC)
+        daily_loss, start_equity, peak_equity, equity, max_daily_loss, max_drawdown, postmortem = reader.unpack(
+            _SNAPSHOT_HEAD
+        )
+        state = cls(
+            mode=reader.text(),
+            last_exec_ts=reader.ts(),
+            daily_loss=daily_loss,
+            start_equity=start_equity,
+            peak_equity=peak_equity,
+            equity=equity,
+            postmortem_triggered=postmortem,
+            max_daily_loss=max_daily_loss,
+            max_drawdown=max_drawdown,
+        )
+        state.set_intent_times([reader.ts() for _ in range(reader.count())])  # type: ignore[misc]
+        state.rejects_recent.extend(reader.text() for _ in range(reader.count()))
+        state.evidence_notes = [reader.text() for _ in range(reader.count())]
+        return state
 
     def register_fill(self, pnl: float) -> None:
         self.daily_loss += max(-pnl, 0.0)
@@ -79,15 +225,15 @@ class RiskState:
 
     @property
     def risk_budget_used(self) -> float:
-        if self.max_daily_loss <= 0:  # type: ignore[attr-defined]
+        if self.max_daily_loss <= 0:
             return 0.0
-        return min(1.0, self.daily_loss / float(self.max_daily_loss))  # type: ignore[attr-defined]
+        return min(1.0, self.daily_loss / float(self.max_daily_loss))
 
     @property
     def drawdown_used(self) -> float:
-        if self.max_drawdown <= 0:  # type: ignore[attr-defined]
+        if self.max_drawdown <= 0:
             return 0.0
-        return min(1.0, self.drawdown / float(self.max_drawdown))  # type: ignore[attr-defined]
+        return min(1.0, self.drawdown / float(self.max_drawdown))
 
 
 class RiskEngine:
@@ -96,9 +242,10 @@ class RiskEngine:
         merged.update(cfg or {})
         self.cfg = merged
         self.kill_switch_cfg = kill_switch_cfg
+        self.kill_switch = monitor_from_config(kill_switch_cfg or {}, root=ROOT)
         self.state = state
-        self.state.max_daily_loss = float(self.cfg.get("max_daily_loss", 0.0))  # type: ignore[assignment]
-        self.state.max_drawdown = float(self.cfg.get("max_drawdown", 0.0))  # type: ignore[assignment]
+        self.state.max_daily_loss = float(self.cfg.get("max_daily_loss", 0.0))
+        self.state.max_drawdown = float(self.cfg.get("max_drawdown", 0.0))
 
     def _data_bad(self, status: Optional[Dict[str, object]]) -> bool:
         if not status:
@@ -152,9 +299,7 @@ class RiskEngine:
         return None
 
     def _check_kill_switch(self) -> Optional[str]:
-        if not _kill_switch_enabled(self.kill_switch_cfg):
-            return None
-        if _kill_switch_path(self.kill_switch_cfg).expanduser().resolve().exists():
+        if self.kill_switch.engaged():
             return "kill switch engaged"
         return None
 
@@ -209,7 +354,9 @@ class SimAutopilot:
         logs_dir: Optional[Path] = None,
         risk_overrides: Optional[Dict[str, object]] = None,
         policy_version: str | None = None,
-        friction_policy: Optional[Dict[str, float | int]] = None,
+        friction_policy: Optional[PolicyLike] = None,
+        event_sink: Optional[EventSink] = None,
+        artifacts: Optional[SimArtifactWriter] = None,
     ) -> None:
         self.root = Path(__file__).resolve().parent.parent
         self.config_path = config_path or (self.root / "config.yaml")
@@ -219,27 +366,23 @@ class SimAutopilot:
         self.logs_dir.mkdir(parents=True, exist_ok=True)
         self.orders_path = self.logs_dir / "orders_sim.jsonl"
         self.events_path = self.logs_dir / "events_sim.jsonl"
+        self.event_sink = event_sink
+        self.artifacts = artifacts
         risk_cfg = (cfg.get("sim_risk") or {}) if isinstance(cfg, dict) else {}
         if risk_overrides:
             risk_cfg.update(risk_overrides)
         self.state = RiskState(mode=str(risk_cfg.get("mode", "NORMAL")).upper())
         self.risk_engine = RiskEngine(risk_cfg, cfg or {}, self.state)
-        self.friction_policy = friction_policy or load_friction_policy()
+        self.friction_policy = FrictionPolicy.coerce(friction_policy) if friction_policy else FrictionPolicy.load()
         self.sim_fill = {
-            "slippage_bps": float(self.friction_policy.get("slippage_bps", 0.0)),
-            "spread_bps": float(self.friction_policy.get("spread_bps", 0.0)),
-            "fee_usd": float(self.friction_policy.get("fee_per_trade", 0.0)),
-            "latency_sec": float(self.friction_policy.get("latency_ms", 0.0)) / 1000.0,
+            "slippage_bps": self.friction_policy.slippage_bps,
+            "spread_bps": self.friction_policy.spread_bps,
+            "fee_usd": self.friction_policy.fee_per_trade,
+            "latency_sec": self.friction_policy.latency_sec,
         }
 
     def _load_config(self) -> Dict[str, object]:
-        if not self.config_path.exists():
-            return {}
-        try:
-            with self.config_path.open("r", encoding="utf-8") as fh:
-                return yaml.safe_load(fh) or {}
-        except Exception:
-            return {}
+        return _load_config_file(self.config_path)
 
     def _persist_risk_state(self) -> None:
         payload = {
@@ -251,32 +394,57 @@ class SimAutopilot:
             "policy_version": self.policy_version,
         }
         risk_state_path = self.logs_dir / "risk_state.json"
+        if self.artifacts is not None:
+            self.artifacts.snapshot(risk_state_path, payload)
+            return
         risk_state_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
 
     def _append_event(self, event: Dict[str, object]) -> None:
         event = dict(event)
         event.setdefault("ts_utc", _now().isoformat())
         event.setdefault("policy_version", self.policy_version)
+        if self.artifacts is not None:
+            self.artifacts.append_json(self.events_path, event)
+            return
+        if self.event_sink is not None:
+            self.event_sink.write_json(self.events_path, event)
+            return
         with self.events_path.open("a", encoding="utf-8") as fh:
             fh.write(json.dumps(event, ensure_ascii=False) + "\n")
 
     def _order_line_no(self) -> int:
-        if not self.orders_path.exists():
+        try:
+            st = os.stat(self.orders_path)
+        except OSError:
             return 1
+        cached = _ORDER_LINE_CACHE.get(self.orders_path)
+        if cached is not None and cached[:3] == (st.st_dev, st.st_ino, st.st_size):
+            return cached[3] + 1
         try:
-            with self.orders_path.open("r", encoding="utf-8") as fh:
-                return sum(1 for _ in fh) + 1
+            lines, complete = count_lines(self.orders_path)
         except Exception:
             return 1
+        if complete:
+            _ORDER_LINE_CACHE[self.orders_path] = (st.st_dev, st.st_ino, st.st_size, lines)
+        return lines + 1
 
     def _write_order(self, intent: Dict[str, object], now_ts: datetime, sim_fill: Optional[Dict[str, object]] = None) -> int:
-        line_no = self._order_line_no()
         record = dict(intent)
         record.setdefault("ts_utc", now_ts.isoformat())
         record.setdefault("policy_version", self.policy_version)
         record["sim_fill"] = dict(sim_fill or self.sim_fill)
+        if self.artifacts is not None:
+            return self.artifacts.append_json(self.orders_path, record)
+        line_no = self._order_line_no()
         with self.orders_path.open("a", encoding="utf-8") as fh:
             fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            fh.flush()
+            st = os.fstat(fh.fileno())
+        cached = _ORDER_LINE_CACHE.get(self.orders_path)
+        if line_no == 1 or (cached is not None and cached[3] == line_no - 1):
+            _ORDER_LINE_CACHE[self.orders_path] = (st.st_dev, st.st_ino, st.st_size, line_no)
+        else:
+            _ORDER_LINE_CACHE.pop(self.orders_path, None)
         return line_no
 
     def _trigger_postmortem(self, evidence: str, threshold_reason: str) -> None:
@@ -299,6 +467,8 @@ class SimAutopilot:
         }
         self.state.evidence_notes.append(evidence)
         self._append_event(event)
+        if self.artifacts is not None:
+            self.artifacts.flush()
 
     def process_intent(
         self,
@@ -330,10 +500,30 @@ class SimAutopilot:
                 }
             )
         self._persist_risk_state()
+        if reason == "kill switch" and self.artifacts is not None:
+            self.artifacts.flush()
         return decision, reason
 
 
-__all__ = ["SimAutopilot", "RiskEngine", "RiskState", "run_step", "_risk_state_from_dict", "_risk_state_to_dict"]
+__all__ = ["SimAutopilot", "SimSession", "RiskEngine", "RiskState", "run_step", "_risk_state_from_dict", "_risk_state_to_dict"]
+
+
+def _friction_policy_from_config(cfg: Dict[str, object]) -> FrictionPolicy:
+    """``friction_policy`` (dict or FrictionPolicy), else ``friction_policy_path``, else the repo policy file."""
+    friction_policy = cfg.get("friction_policy")
+    if isinstance(friction_policy, (dict, FrictionPolicy)):
+        return FrictionPolicy.coerce(friction_policy)
+    friction_policy_path = cfg.get("friction_policy_path")
+    return FrictionPolicy.load(Path(friction_policy_path) if friction_policy_path else None)  # type: ignore[arg-type]
+
+
+def _as_seed(value: object) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(value)  # type: ignore[arg-type]
+    except Exception:
+        return None
 
 
 def _risk_state_from_dict(data: Dict[str, object] | None) -> RiskState:
@@ -341,25 +531,23 @@ def _risk_state_from_dict(data: Dict[str, object] | None) -> RiskState:
         return RiskState()
     state = RiskState()
     state.mode = str(data.get("mode", state.mode)).upper()
-    state.intent_times = [
-        datetime.fromisoformat(ts) if isinstance(ts, str) else ts for ts in data.get("intent_times", [])
-    ]
+    state.set_intent_times(
+        [datetime.fromisoformat(ts) if isinstance(ts, str) else ts for ts in data.get("intent_times", [])]
+    )
     if data.get("last_exec_ts"):
         try:
             state.last_exec_ts = datetime.fromisoformat(str(data["last_exec_ts"]))
         except Exception:
             state.last_exec_ts = None
-    state.rejects_recent = list(data.get("rejects_recent", []))
+    state.rejects_recent.extend(data.get("rejects_recent", []))
     state.daily_loss = float(data.get("daily_loss", state.daily_loss))
     state.start_equity = float(data.get("start_equity", state.start_equity))
     state.peak_equity = float(data.get("peak_equity", state.peak_equity))
     state.equity = float(data.get("equity", state.equity))
     state.postmortem_triggered = bool(data.get("postmortem_triggered", False))
     state.evidence_notes = list(data.get("evidence_notes", []))
-    if "max_daily_loss" in data:
-        state.max_daily_loss = float(data.get("max_daily_loss", 0.0))  # type: ignore[assignment]
-    if "max_drawdown" in data:
-        state.max_drawdown = float(data.get("max_drawdown", 0.0))  # type: ignore[assignment]
+    state.max_daily_loss = float(data.get("max_daily_loss", 0.0))
+    state.max_drawdown = float(data.get("max_drawdown", 0.0))
     return state
 
 
@@ -376,213 +564,293 @@ def _risk_state_to_dict(state: RiskState) -> Dict[str, object]:
         "drawdown": state.drawdown,
         "postmortem_triggered": state.postmortem_triggered,
         "evidence_notes": list(state.evidence_notes),
-        "max_daily_loss": getattr(state, "max_daily_loss", 0.0),
-        "max_drawdown": getattr(state, "max_drawdown", 0.0),
+        "max_daily_loss": state.max_daily_loss,
+        "max_drawdown": state.max_drawdown,
     }
 
 
-def run_step(
-    quotes_snapshot: Dict[str, object], state: Dict[str, object] | None, config: Dict[str, object] | None
-) -> Tuple[Dict[str, object], List[Dict[str, object]]]:
+class SimSession:
     """
-    Stateless helper for sim replay loops.
-
-    The caller owns persistence of positions/cash and risk state. This wrapper
-    rehydrates a SimAutopilot per call to keep risk enforcement identical to the
-    main class while staying friendly to line-by-line replay.
+    Long-lived form of ``run_step`` for a whole replay/tournament/stress run.
+
+    One SimAutopilot (config.yaml and the friction policy are loaded once)
+    and one live RiskState serve every ``step(snapshot)``; nothing is
+    rehydrated per row. Decisions, fills, log lines and the state returned by
+    ``state`` are identical to chaining ``run_step`` calls with the same config.
+    Passing ``config["artifacts"]`` (a SimArtifactWriter owned by the caller)
+    buffers orders/events and defers risk_state.json to its checkpoints.
+    ``config["mark_to_market"] = "incremental"`` keeps equity in a
+    PortfolioBook (per-step cost independent of open positions, equal to the
+    full re-sum up to float rounding) instead of re-summing every position.
+    ``config["friction_rng"] = "counter"`` draws fill outcomes from one
+    FrictionSampler per run (fill k = draw ``friction_draws``) instead of a
+    ``random.Random`` per fill.
     """
 
-    cfg = config or {}
-    sim_state = state.copy() if state else {}
-    logs_dir = Path(cfg.get("logs_dir", ROOT / "Logs"))
-    if not logs_dir.is_absolute():
-        logs_dir = ROOT / logs_dir
-    logs_dir = logs_dir.expanduser().resolve()
-    risk_overrides = cfg.get("risk_overrides") or {}
-    friction_policy = cfg.get("friction_policy")
-    friction_policy_path = cfg.get("friction_policy_path")
-    if not isinstance(friction_policy, dict):
-        friction_policy = load_friction_policy(Path(friction_policy_path)) if friction_policy_path else load_friction_policy()
-
-    policy_version = str(cfg.get("policy_version", "baseline"))
-    autopilot = SimAutopilot(
-        logs_dir=logs_dir,
-        risk_overrides=risk_overrides,
-        policy_version=policy_version,
-        friction_policy=friction_policy,
-    )
-    autopilot.state = _risk_state_from_dict(sim_state.get("risk_state"))
-    autopilot.risk_engine.state = autopilot.state
-
-    price = float(quotes_snapshot.get("price") or 0.0)
-    symbol = str(quotes_snapshot.get("symbol") or "-").upper()
-    ts_raw = quotes_snapshot.get("ts_utc") or quotes_snapshot.get("ts")
-    now_ts = None
-    if isinstance(ts_raw, str):
-        try:
-            now_ts = datetime.fromisoformat(ts_raw)
-        except Exception:
-            now_ts = None
-    if not now_ts:
-        now_ts = _now()
-
-    if cfg.get("verify_no_lookahead"):
-        seen_ts = sim_state.get("max_ts_seen")
-        if seen_ts and isinstance(seen_ts, str):
-            prior = None
+    def __init__(self, config: Dict[str, object] | None = None, state: Dict[str, object] | None = None) -> None:
+        cfg = config or {}
+        self.cfg = cfg
+        logs_dir = Path(cfg.get("logs_dir", ROOT / "Logs"))
+        if not logs_dir.is_absolute():
+            logs_dir = ROOT / logs_dir
+        logs_dir = logs_dir.expanduser().resolve()
+        friction_policy = _friction_policy_from_config(cfg)
+        self.friction_policy = friction_policy
+        self.autopilot = SimAutopilot(
+            logs_dir=logs_dir,
+            risk_overrides=cfg.get("risk_overrides") or {},
+            policy_version=str(cfg.get("policy_version", "baseline")),
+            friction_policy=friction_policy,
+            event_sink=cfg.get("event_sink"),
+            artifacts=cfg.get("artifacts"),
+        )
+        self._state: Dict[str, object] = state.copy() if state else {}
+        risk = _risk_state_from_dict(self._state.get("risk_state"))  # type: ignore[arg-type]
+        self.autopilot.state = risk
+        self.autopilot.risk_engine.state = risk
+        self.threshold = float(cfg.get("momentum_threshold_pct", 0.5))
+        self.verify_no_lookahead = bool(cfg.get("verify_no_lookahead"))
+        self.friction_seed = cfg.get("friction_seed")
+        self.friction_sampler: Optional[FrictionSampler] = None
+        if str(cfg.get("friction_rng") or "legacy").lower() == "counter":
+            self.friction_sampler = FrictionSampler.for_run(
+                _as_seed(self.friction_seed), friction_policy, str(cfg.get("policy_version", "baseline"))
+            )
+        self._max_ts_seen: Optional[datetime] = None
+        seen = self._state.get("max_ts_seen")
+        if isinstance(seen, str):
             try:
-                prior = datetime.fromisoformat(seen_ts)
+                self._max_ts_seen = datetime.fromisoformat(seen)
             except Exception:
-                prior = None
-            if prior and now_ts < prior:
-                raise AssertionError("ts_seen exceeds current row (lookahead detected)")
-        sim_state["max_ts_seen"] = now_ts.isoformat()
-
-    status: Dict[str, object] = {}
-    if "data_status" in quotes_snapshot:
-        status["data_status"] = quotes_snapshot.get("data_status")
-    if "data_flags" in quotes_snapshot:
-        status["data_flags"] = quotes_snapshot.get("data_flags")
-    if "quotes_state" in quotes_snapshot:
-        status.setdefault("quotes", {})["state"] = quotes_snapshot.get("quotes_state")
-    if "quotes_health" in quotes_snapshot:
-        status.setdefault("quotes", {})["health"] = quotes_snapshot.get("quotes_health")
-
-    prev_prices: Dict[str, float] = sim_state.get("last_prices", {}) or {}
-    positions: Dict[str, float] = sim_state.get("positions", {}) or {}
-    cost_basis: Dict[str, float] = sim_state.get("avg_cost", {}) or {}
-    cash = float(sim_state.get("cash_usd", 10_000.0))
-
-    intent: Optional[Dict[str, object]] = None
-    threshold = float(cfg.get("momentum_threshold_pct", 0.5))
-    last_price = prev_prices.get(symbol)
-    if last_price:
-        pct_change = ((price - last_price) / last_price) * 100.0 if last_price else 0.0
-        if pct_change >= threshold:
-            intent = {"symbol": symbol, "qty": 1, "price": price, "side": "BUY"}
-        elif pct_change <= -threshold and positions.get(symbol, 0.0) > 0:
-            qty = positions.get(symbol, 0.0)
-            avg_cost = cost_basis.get(symbol, last_price)
-            pnl = (price - avg_cost) * qty
-            intent = {"symbol": symbol, "qty": -qty, "price": price, "side": "SELL", "pnl": pnl}
-
-    emitted_events: List[Dict[str, object]] = []
-    decision: str | None = None
-    reason: str | None = None
-    if intent:
-        fill_seed = None
-        if cfg.get("friction_seed") is not None:
+                self._max_ts_seen = None
+        self.prev_prices: Dict[str, float] = self._state.get("last_prices", {}) or {}  # type: ignore[assignment]
+        self.positions: Dict[str, float] = self._state.get("positions", {}) or {}  # type: ignore[assignment]
+        self.cost_basis: Dict[str, float] = self._state.get("avg_cost", {}) or {}  # type: ignore[assignment]
+        self.cash = float(self._state.get("cash_usd", 10_000.0))  # type: ignore[arg-type]
+        self.book: Optional[PortfolioBook] = None
+        if str(cfg.get("mark_to_market") or "full").lower() == "incremental":
+            self.book = PortfolioBook(self.positions, self.prev_prices, fallback_prices=self.cost_basis)
+        self.steps = 0
+
+    @property
+    def risk_state(self) -> RiskState:
+        return self.autopilot.state
+
+    @property
+    def equity(self) -> float:
+        return float(self.autopilot.state.equity)
+
+    def portfolio(self) -> Dict[str, object]:
+        return {"cash_usd": self.cash, "positions": self.positions, "avg_cost": self.cost_basis}
+
+    @property
+    def state(self) -> Dict[str, object]:
+        """The state dict ``run_step`` would have returned after the same rows."""
+        out = dict(self._state)
+        if "risk_state" in out:
+            out["risk_state"] = _risk_state_to_dict(self.autopilot.state)
+        return out
+
+    def step(self, quotes_snapshot: Dict[str, object]) -> List[Dict[str, object]]:
+        cfg = self.cfg
+        sim_state = self._state
+        autopilot = self.autopilot
+        friction_policy = self.friction_policy
+
+        price = float(quotes_snapshot.get("price") or 0.0)
+        symbol = str(quotes_snapshot.get("symbol") or "-").upper()
+        ts_raw = quotes_snapshot.get("ts_utc") or quotes_snapshot.get("ts")
+        now_ts = None
+        if isinstance(ts_raw, str):
             try:
-                fill_seed = int(cfg.get("friction_seed")) + int(sim_state.get("friction_fill_count", 0))
+                now_ts = datetime.fromisoformat(ts_raw)
             except Exception:
-                fill_seed = int(cfg.get("friction_seed"))
-        fill_result = apply_friction(intent, quotes_snapshot, friction_policy, rng_seed=fill_seed)
-        fill_status = str(fill_result.get("fill_status") or "FILLED").upper()
-        execution_rejected = False
-        if fill_status != "FILLED":
-            reason = str(fill_result.get("reject_reason") or "execution_unfilled")
-            autopilot.state.record_reject(reason)
-            autopilot._append_event(
-                {
-                    "event_type": "SIM_DECISION",
-                    "severity": "WARN",
-                    "symbol": symbol,
-                    "decision": f"EXECUTION_{fill_status}",
-                    "reason": reason,
-                    "sim_fill": fill_result,
-                }
-            )
-            emitted_events.append(
-                {
-                    "event_type": "SIM_DECISION",
-                    "symbol": symbol,
-                    "decision": f"EXECUTION_{fill_status}",
-                    "reason": reason,
-                    "sim_fill": fill_result,
-                }
-            )
-            execution_rejected = True
-            autopilot._persist_risk_state()
-            sim_state["risk_state"] = _risk_state_to_dict(autopilot.state)
-        if not execution_rejected:
-            fill_qty = float(fill_result.get("fill_qty", 0.0))
-            fill_price = float(fill_result.get("fill_price", float(intent.get("price") or price)))
-            fee_usd = float(fill_result.get("fee_usd", 0.0))
-            if fill_qty < 0:
-                avg_cost = cost_basis.get(symbol, last_price or price)
-                intent["pnl"] = (fill_price - avg_cost) * abs(fill_qty) - fee_usd
-            else:
-                intent["pnl"] = -fee_usd
-            decision, reason = autopilot.process_intent(intent, status=status, now_ts=now_ts, sim_fill=fill_result)
-            if decision == "ALLOW":
-                if fill_qty != 0:
-                    cash -= fill_qty * fill_price
-                    cash -= fee_usd
-                    positions[symbol] = positions.get(symbol, 0.0) + fill_qty
-                    if positions[symbol] != 0:
-                        prev_cost = cost_basis.get(symbol, last_price or price)
-                        if fill_qty > 0:
-                            total_qty = positions[symbol]
-                            cost_basis[symbol] = (prev_cost * (total_qty - fill_qty) + fill_price * fill_qty) / total_qty
-                    else:
-                        positions.pop(symbol, None)
-                        cost_basis.pop(symbol, None)
-                    sim_state["friction_fill_count"] = int(sim_state.get("friction_fill_count", 0)) + 1
-                emitted_events.append(
-                    {
-                        "event_type": "SIM_INTENT",
-                        "symbol": symbol,
-                        "decision": decision,
-                        "reason": reason,
-                        "fill_qty": fill_qty,
-                        "fill_price": fill_price,
-                        "fee_usd": fee_usd,
-                        "sim_fill": fill_result,
-                    }
+                now_ts = None
+        if not now_ts:
+            now_ts = _now()
+
+        if self.verify_no_lookahead:
+            prior = self._max_ts_seen
+            if prior and now_ts < prior:
+                raise AssertionError("ts_seen exceeds current row (lookahead detected)")
+            sim_state["max_ts_seen"] = now_ts.isoformat()
+
+        status: Dict[str, object] = {}
+        if "data_status" in quotes_snapshot:
+            status["data_status"] = quotes_snapshot.get("data_status")
+        if "data_flags" in quotes_snapshot:
+            status["data_flags"] = quotes_snapshot.get("data_flags")
+        if "quotes_state" in quotes_snapshot:
+            status.setdefault("quotes", {})["state"] = quotes_snapshot.get("quotes_state")
+        if "quotes_health" in quotes_snapshot:
+            status.setdefault("quotes", {})["health"] = quotes_snapshot.get("quotes_health")
+
+        prev_prices = self.prev_prices
+        positions = self.positions
+        cost_basis = self.cost_basis
+        cash = self.cash
+
+        intent: Optional[Dict[str, object]] = None
+        threshold = self.threshold
+        last_price = prev_prices.get(symbol)
+        if last_price:
+            pct_change = ((price - last_price) / last_price) * 100.0 if last_price else 0.0
+            if pct_change >= threshold:
+                intent = {"symbol": symbol, "qty": 1, "price": price, "side": "BUY"}
+            elif pct_change <= -threshold and positions.get(symbol, 0.0) > 0:
+                qty = positions.get(symbol, 0.0)
+                avg_cost = cost_basis.get(symbol, last_price)
+                pnl = (price - avg_cost) * qty
+                intent = {"symbol": symbol, "qty": -qty, "price": price, "side": "SELL", "pnl": pnl}
+
+        emitted_events: List[Dict[str, object]] = []
+        decision: str | None = None
+        reason: str | None = None
+        if intent:
+            if self.friction_sampler is not None:
+                draw = int(sim_state.get("friction_draws", 0))
+                fill_result = apply_friction(
+                    intent, quotes_snapshot, friction_policy, sampler=self.friction_sampler, fill_index=draw
                 )
+                sim_state["friction_draws"] = draw + 1
             else:
+                fill_seed = None
+                if self.friction_seed is not None:
+                    try:
+                        fill_seed = int(self.friction_seed) + int(sim_state.get("friction_fill_count", 0))
+                    except Exception:
+                        fill_seed = int(self.friction_seed)
+                fill_result = apply_friction(intent, quotes_snapshot, friction_policy, rng_seed=fill_seed)
+            fill_status = str(fill_result.get("fill_status") or "FILLED").upper()
+            execution_rejected = False
+            if fill_status != "FILLED":
+                reason = str(fill_result.get("reject_reason") or "execution_unfilled")
+                autopilot.state.record_reject(reason)
                 autopilot._append_event(
                     {
                         "event_type": "SIM_DECISION",
-                        "severity": "INFO",
+                        "severity": "WARN",
                         "symbol": symbol,
-                        "message": f"Intent rejected: {decision} {reason or ''}".strip(),
+                        "decision": f"EXECUTION_{fill_status}",
+                        "reason": reason,
+                        "sim_fill": fill_result,
                     }
                 )
                 emitted_events.append(
                     {
                         "event_type": "SIM_DECISION",
                         "symbol": symbol,
-                        "decision": decision,
+                        "decision": f"EXECUTION_{fill_status}",
                         "reason": reason,
+                        "sim_fill": fill_result,
                     }
                 )
-    else:
-        autopilot._append_event(
+                execution_rejected = True
+                autopilot._persist_risk_state()
+                sim_state["risk_state"] = None  # materialised from the live RiskState by ``state``
+            if not execution_rejected:
+                fill_qty = float(fill_result.get("fill_qty", 0.0))
+                fill_price = float(fill_result.get("fill_price", float(intent.get("price") or price)))
+                fee_usd = float(fill_result.get("fee_usd", 0.0))
+                if fill_qty < 0:
+                    avg_cost = cost_basis.get(symbol, last_price or price)
+                    intent["pnl"] = (fill_price - avg_cost) * abs(fill_qty) - fee_usd
+                else:
+                    intent["pnl"] = -fee_usd
+                decision, reason = autopilot.process_intent(intent, status=status, now_ts=now_ts, sim_fill=fill_result)
+                if decision == "ALLOW":
+                    if fill_qty != 0:
+                        cash -= fill_qty * fill_price
+                        cash -= fee_usd
+                        positions[symbol] = positions.get(symbol, 0.0) + fill_qty
+                        if positions[symbol] != 0:
+                            prev_cost = cost_basis.get(symbol, last_price or price)
+                            if fill_qty > 0:
+                                total_qty = positions[symbol]
+                                cost_basis[symbol] = (prev_cost * (total_qty - fill_qty) + fill_price * fill_qty) / total_qty
+                        else:
+                            positions.pop(symbol, None)
+                            cost_basis.pop(symbol, None)
+                        if self.book is not None:
+                            self.book.set_position(symbol, positions.get(symbol, 0.0))
+                        sim_state["friction_fill_count"] = int(sim_state.get("friction_fill_count", 0)) + 1
+                    emitted_events.append(
+                        {
+                            "event_type": "SIM_INTENT",
+                            "symbol": symbol,
+                            "decision": decision,
+                            "reason": reason,
+                            "fill_qty": fill_qty,
+                            "fill_price": fill_price,
+                            "fee_usd": fee_usd,
+                            "sim_fill": fill_result,
+                        }
+                    )
+                else:
+                    autopilot._append_event(
+                        {
+                            "event_type": "SIM_DECISION",
+                            "severity": "INFO",
+                            "symbol": symbol,
+                            "message": f"Intent rejected: {decision} {reason or ''}".strip(),
+                        }
+                    )
+                    emitted_events.append(
+                        {
+                            "event_type": "SIM_DECISION",
+                            "symbol": symbol,
+                            "decision": decision,
+                            "reason": reason,
+                        }
+                    )
+        else:
+            autopilot._append_event(
+                {
+                    "event_type": "SIM_HEARTBEAT",
+                    "severity": "INFO",
+                    "symbol": symbol,
+                    "message": "No intent generated (observe only)",
+                }
+            )
+            emitted_events.append({"event_type": "SIM_HEARTBEAT", "symbol": symbol})
+
+        prev_prices[symbol] = price
+        if self.book is not None:
+            market_value = self.book.mark(symbol, price)
+        else:
+            market_value = sum((positions.get(sym, 0.0) * prev_prices.get(sym, price) for sym in positions))
+        equity = cash + market_value
+        autopilot.state.equity = equity
+        autopilot.state.peak_equity = max(autopilot.state.peak_equity, equity)
+
+        self.cash = cash
+        sim_state.update(
             {
-                "event_type": "SIM_HEARTBEAT",
-                "severity": "INFO",
-                "symbol": symbol,
-                "message": "No intent generated (observe only)",
+                "risk_state": None,
+                "last_prices": prev_prices,
+                "positions": positions,
+                "avg_cost": cost_basis,
+                "cash_usd": cash,
             }
         )
-        emitted_events.append({"event_type": "SIM_HEARTBEAT", "symbol": symbol})
-
-    prev_prices[symbol] = price
-    market_value = sum((positions.get(sym, 0.0) * prev_prices.get(sym, price) for sym in positions))
-    equity = cash + market_value
-    autopilot.state.equity = equity
-    autopilot.state.peak_equity = max(autopilot.state.peak_equity, equity)
-
-    sim_state.update(
-        {
-            "risk_state": _risk_state_to_dict(autopilot.state),
-            "last_prices": prev_prices,
-            "positions": positions,
-            "avg_cost": cost_basis,
-            "cash_usd": cash,
-        }
-    )
-    if cfg.get("verify_no_lookahead"):
-        sim_state["max_ts_seen"] = now_ts.isoformat()
-    return sim_state, emitted_events if emitted_events else []
+        if self.verify_no_lookahead:
+            self._max_ts_seen = now_ts
+            sim_state["max_ts_seen"] = now_ts.isoformat()
+        self.steps += 1
+        return emitted_events
+
+
+def run_step(
+    quotes_snapshot: Dict[str, object], state: Dict[str, object] | None, config: Dict[str, object] | None
+) -> Tuple[Dict[str, object], List[Dict[str, object]]]:
+    """
+    Stateless helper for sim replay loops.
+
+    The caller owns persistence of positions/cash and risk state. Thin wrapper
+    over a one-step SimSession; runs that step many rows should keep one
+    SimSession instead of paying the per-call rehydration.
+    """
+
+    session = SimSession(config, state)
+    emitted = session.step(quotes_snapshot)
+    return session.state, emitted
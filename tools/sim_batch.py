@@ -0,0 +1,540 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tools.execution_friction import FrictionSampler, apply_friction
+from tools.quote_store import QuoteColumns
+from tools.sim_autopilot import (
+    ROOT,
+    RiskEngine,
+    RiskState,
+    _as_seed,
+    _friction_policy_from_config,
+    _load_config_file,
+    _risk_state_from_dict,
+    _risk_state_to_dict,
+)
+
+UTC = timezone.utc
+# row fields the tape columns already carry; anything else travels as a per-row extra
+_COLUMN_KEYS = frozenset(("ts_utc", "ts", "symbol", "price"))
+_HEARTBEAT = "No intent generated (observe only)"
+
+
+def _row_datetime(row: Mapping[str, object], index: int) -> datetime:
+    ts_raw = row.get("ts_utc") or row.get("ts")
+    if isinstance(ts_raw, str):
+        try:
+            return datetime.fromisoformat(ts_raw)
+        except ValueError:
+            pass
+    # run_step would fall back to the wall clock here, which a batch cannot reproduce
+    raise ValueError(f"row {index}: unparseable ts_utc {ts_raw!r}")
+
+
+class QuoteTape:
+    """
+    Columnar quotes in replay order, one row per ``run_step`` call.
+
+    ``codes`` index into ``symbols`` (first-appearance order) and ``ts`` holds
+    epoch seconds. When built from dict rows the original snapshots are kept:
+    they supply the ts_utc text, the data-status fields and, without a
+    friction_seed, the friction hash seed exactly as ``run_step`` saw them.
+    ``save``/``open`` store the columns as .npy files that other processes
+    memory-map read-only; row fields beyond ts/symbol/price (data_status,
+    prev_price, ...) come along as sparse ``extras``, so seeded runs on an
+    opened tape decide exactly as on the rows.
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        codes: np.ndarray,
+        prices: np.ndarray,
+        ts: np.ndarray,
+        rows: Optional[Sequence[Mapping[str, object]]] = None,
+        extras: Optional[Mapping[int, Mapping[str, object]]] = None,
+    ) -> None:
+        self.symbols = list(symbols)
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.ts = np.asarray(ts, dtype=np.float64)
+        self.rows = rows
+        self.extras = extras or {}
+        if not (len(self.codes) == len(self.prices) == len(self.ts)):
+            raise ValueError("codes, prices and ts must have the same length")
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Mapping[str, object]]) -> "QuoteTape":
+        n = len(rows)
+        symbols: List[str] = []
+        index: Dict[str, int] = {}
+        codes = np.empty(n, dtype=np.int64)
+        prices = np.empty(n, dtype=np.float64)
+        ts = np.empty(n, dtype=np.float64)
+        for i, row in enumerate(rows):
+            symbol = str(row.get("symbol") or "-").upper()
+            code = index.get(symbol)
+            if code is None:
+                code = index[symbol] = len(symbols)
+                symbols.append(symbol)
+            codes[i] = code
+            prices[i] = float(row.get("price") or 0.0)
+            ts[i] = _row_datetime(row, i).timestamp()
+        return cls(symbols, codes, prices, ts, rows=rows)
+
+    @classmethod
+    def from_symbol_arrays(cls, series: Mapping[str, Tuple[Sequence[float], Sequence[float]]]) -> "QuoteTape":
+        """``{symbol: (epoch_seconds, prices)}`` merged by time; ties keep the mapping's symbol order."""
+        symbols = [str(sym).upper() for sym in series]
+        ts_parts = [np.asarray(ts, dtype=np.float64) for ts, _ in series.values()]
+        px_parts = [np.asarray(px, dtype=np.float64) for _, px in series.values()]
+        code_parts = [np.full(len(part), code, dtype=np.int64) for code, part in enumerate(ts_parts)]
+        ts = np.concatenate(ts_parts) if ts_parts else np.empty(0)
+        order = np.argsort(ts, kind="stable")
+        codes = np.concatenate(code_parts)[order] if code_parts else np.empty(0, dtype=np.int64)
+        prices = np.concatenate(px_parts)[order] if px_parts else np.empty(0)
+        return cls(symbols, codes, prices, ts[order])
+
+    @classmethod
+    def from_columns(cls, columns: QuoteColumns) -> "QuoteTape":
+        """A ``QuoteStore`` load as a tape, straight from its arrays; rows stay in store order."""
+        ids = np.asarray(columns.symbol_id, dtype=np.int64)
+        present, first = np.unique(ids, return_index=True)
+        # re-code by first appearance, as from_rows would over the same rows
+        present = present[np.argsort(first, kind="stable")]
+        recode = np.zeros(int(present.max()) + 1 if present.size else 0, dtype=np.int64)
+        recode[present] = np.arange(present.size)
+        # microseconds, like the ts_utc text the store's rows carry
+        ts = (np.asarray(columns.ts_ns, dtype=np.int64) // 1_000) / 1e6
+        symbols = [columns.symbols[sid] for sid in present.tolist()]
+        return cls(symbols, recode[ids], np.asarray(columns.price, dtype=np.float64), ts)
+
+    def head(self, n: int) -> "QuoteTape":
+        """The first ``n`` rows (views of the same columns)."""
+        rows = self.rows[:n] if self.rows is not None else None
+        extras = {i: extra for i, extra in self.extras.items() if i < n}
+        return QuoteTape(self.symbols, self.codes[:n], self.prices[:n], self.ts[:n], rows=rows, extras=extras)
+
+    def __len__(self) -> int:
+        return int(self.codes.size)
+
+    def when(self, i: int) -> datetime:
+        if self.rows is not None:
+            return _row_datetime(self.rows[i], i)
+        return datetime.fromtimestamp(float(self.ts[i]), UTC)
+
+    def snapshot(self, i: int) -> Mapping[str, object]:
+        if self.rows is not None:
+            return self.rows[i]
+        snapshot = {"ts_utc": self.when(i).isoformat(), "symbol": self.symbols[self.codes[i]], "price": float(self.prices[i])}
+        extra = self.extras.get(i)
+        if extra:
+            snapshot.update(extra)
+        return snapshot
+
+    def save(self, directory: Path) -> Path:
+        """Write codes/prices/ts as .npy plus tape.json (symbols, per-row extras)."""
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "codes.npy", self.codes)
+        np.save(directory / "prices.npy", self.prices)
+        np.save(directory / "ts.npy", self.ts)
+        extras: Dict[str, Mapping[str, object]] = {str(i): dict(extra) for i, extra in self.extras.items()}
+        for i, row in enumerate(self.rows or ()):
+            extra = {key: value for key, value in row.items() if key not in _COLUMN_KEYS}
+            if extra:
+                extras[str(i)] = extra
+        payload = {"symbols": self.symbols, "extras": extras}
+        (directory / "tape.json").write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        return directory
+
+    @classmethod
+    def open(cls, directory: Path, *, mmap: bool = True) -> "QuoteTape":
+        """Load a saved tape; with ``mmap`` the columns stay read-only views of the files."""
+        mode = "r" if mmap else None
+        meta = json.loads((directory / "tape.json").read_text(encoding="utf-8"))
+        return cls(
+            meta.get("symbols", []),
+            np.load(directory / "codes.npy", mmap_mode=mode),
+            np.load(directory / "prices.npy", mmap_mode=mode),
+            np.load(directory / "ts.npy", mmap_mode=mode),
+            extras={int(i): extra for i, extra in (meta.get("extras") or {}).items()},
+        )
+
+
+@dataclass
+class BatchResult:
+    """Per-row curves plus everything ``run_step`` would have logged or returned."""
+
+    equity: np.ndarray
+    cash: np.ndarray
+    peak_equity: np.ndarray
+    mode: np.ndarray
+    orders: List[Dict[str, object]]
+    decisions: List[Tuple[int, Dict[str, object]]]
+    state: Dict[str, object]
+    risk: RiskState
+    events: List[Tuple[int, Dict[str, object]]]
+
+    @property
+    def drawdown(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dd = np.where(self.peak_equity > 0, (self.peak_equity - self.equity) / self.peak_equity, 0.0)
+        return np.maximum(dd, 0.0)
+
+    def emitted(self, tape: QuoteTape) -> List[List[Dict[str, object]]]:
+        """The per-row return values of ``SimSession.step``."""
+        out: List[List[Dict[str, object]]] = [
+            [{"event_type": "SIM_HEARTBEAT", "symbol": tape.symbols[code]}] for code in tape.codes.tolist()
+        ]
+        for row, event in self.decisions:
+            out[row] = [event]
+        return out
+
+    def logged_events(self, tape: QuoteTape) -> List[List[Dict[str, object]]]:
+        """Per row, the records ``SimSession.step`` appends to events_sim.jsonl (before ts_utc/policy_version)."""
+        out: List[List[Dict[str, object]]] = [
+            [{"event_type": "SIM_HEARTBEAT", "severity": "INFO", "symbol": tape.symbols[code], "message": _HEARTBEAT}]
+            for code in tape.codes.tolist()
+        ]
+        for row, _ in self.decisions:
+            out[row] = []
+        for row, event in self.events:
+            out[row].append(event)
+        return out
+
+
+def _status_from_snapshot(snapshot: Mapping[str, object]) -> Dict[str, object]:
+    status: Dict[str, object] = {}
+    if "data_status" in snapshot:
+        status["data_status"] = snapshot.get("data_status")
+    if "data_flags" in snapshot:
+        status["data_flags"] = snapshot.get("data_flags")
+    if "quotes_state" in snapshot:
+        status.setdefault("quotes", {})["state"] = snapshot.get("quotes_state")
+    if "quotes_health" in snapshot:
+        status.setdefault("quotes", {})["health"] = snapshot.get("quotes_health")
+    return status
+
+
+def run_batch(
+    tape: QuoteTape,
+    state: Dict[str, object] | None = None,
+    config: Dict[str, object] | None = None,
+    *,
+    order_line_offset: int = 0,
+) -> BatchResult:
+    """
+    Whole-tape equivalent of chaining ``run_step`` (or one ``SimSession``)
+    over ``tape`` with the same ``config`` and starting ``state``.
+
+    Momentum signals, previous prices and the mark-to-market equity curve are
+    computed with NumPy; only rows that produce an intent go through the
+    path-dependent part (friction draw, RiskEngine gates, fills, postmortem)
+    in Python. Nothing is written to disk: ``orders`` are the records
+    run_step would append to orders_sim.jsonl (``order_line_offset`` = lines
+    already in that file, for postmortem evidence), ``decisions`` the
+    events it would return for intent rows and ``events`` the records it
+    would log to events_sim.jsonl for them (rejects, POSTMORTEM).
+    """
+
+    cfg = config or {}
+    sim_state: Dict[str, object] = dict(state) if state else {}
+    n = len(tape)
+    threshold = float(cfg.get("momentum_threshold_pct", 0.5))
+    verify_no_lookahead = bool(cfg.get("verify_no_lookahead"))
+    friction_seed = cfg.get("friction_seed")
+    policy_version = str(cfg.get("policy_version", "baseline"))
+    friction_policy = _friction_policy_from_config(cfg)
+
+    # same RiskEngine/RiskState wiring as SimSession, minus the log files
+    yaml_cfg = _load_config_file(ROOT / "config.yaml")
+    risk_cfg = dict((yaml_cfg.get("sim_risk") or {}) if isinstance(yaml_cfg, dict) else {})
+    risk_cfg.update(cfg.get("risk_overrides") or {})
+    engine = RiskEngine(risk_cfg, yaml_cfg or {}, RiskState())
+    risk = _risk_state_from_dict(sim_state.get("risk_state"))  # type: ignore[arg-type]
+    engine.state = risk
+
+    init_prices: Dict[str, float] = dict(sim_state.get("last_prices", {}) or {})  # type: ignore[arg-type]
+    positions: Dict[str, float] = dict(sim_state.get("positions", {}) or {})  # type: ignore[arg-type]
+    cost_basis: Dict[str, float] = dict(sim_state.get("avg_cost", {}) or {})  # type: ignore[arg-type]
+    cash = float(sim_state.get("cash_usd", 10_000.0))  # type: ignore[arg-type]
+    fill_count = int(sim_state.get("friction_fill_count", 0))  # type: ignore[arg-type]
+    filled_any = False
+    sampler: Optional[FrictionSampler] = None
+    if str(cfg.get("friction_rng") or "legacy").lower() == "counter":
+        sampler = FrictionSampler.for_run(_as_seed(friction_seed), friction_policy, policy_version)
+    draws = int(sim_state.get("friction_draws", 0))  # type: ignore[arg-type]
+    drew_any = False
+
+    if verify_no_lookahead and n:
+        seen = sim_state.get("max_ts_seen")
+        prior = datetime.fromisoformat(seen) if isinstance(seen, str) else None
+        if (prior and tape.when(0) < prior) or bool(np.any(np.diff(tape.ts) < 0)):
+            raise AssertionError("ts_seen exceeds current row (lookahead detected)")
+
+    # ---------- vectorised: previous price per row, momentum signal ----------
+    codes = tape.codes
+    px = tape.prices
+    n_sym = len(tape.symbols)
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    bounds = np.searchsorted(sorted_codes, np.arange(n_sym + 1))
+    rows_by_sym = [order[bounds[s] : bounds[s + 1]] for s in range(n_sym)]
+    px_by_sym = [px[rows] for rows in rows_by_sym]
+    init_last = np.array(
+        [np.nan if init_prices.get(sym) is None else float(init_prices[sym]) for sym in tape.symbols], dtype=np.float64
+    )
+    prev_sorted = np.empty(n, dtype=np.float64)
+    if n:
+        prev_sorted[1:] = px[order][:-1]
+        first = np.ones(n, dtype=bool)
+        first[1:] = sorted_codes[1:] != sorted_codes[:-1]
+        prev_sorted[first] = init_last[sorted_codes[first]]
+    prev = np.empty(n, dtype=np.float64)
+    prev[order] = prev_sorted
+    has_prev = (prev != 0) & ~np.isnan(prev)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(has_prev, ((px - prev) / prev) * 100.0, 0.0)
+    buy = has_prev & (pct >= threshold)
+    sell = has_prev & ~buy & (pct <= -threshold)
+    candidates = np.nonzero(buy | sell)[0]
+
+    equity = np.empty(n, dtype=np.float64)
+    cash_curve = np.empty(n, dtype=np.float64)
+    peak_curve = np.empty(n, dtype=np.float64)
+    mode_curve = np.empty(n, dtype=object)
+    code_of = {sym: code for code, sym in enumerate(tape.symbols)}
+
+    def last_prices(symbol: str, rows: np.ndarray) -> np.ndarray:
+        # what run_step's prev_prices.get(symbol, price) holds after each of ``rows``
+        code = code_of.get(symbol)
+        fallback = init_prices.get(symbol)
+        base = px[rows] if fallback is None else np.full(rows.shape, float(fallback))
+        if code is None:
+            return base
+        k = np.searchsorted(rows_by_sym[code], rows, side="right") - 1
+        return np.where(k >= 0, px_by_sym[code][np.maximum(k, 0)], base)
+
+    def mark(lo: int, hi: int) -> None:
+        # rows lo..hi-1 produced no fill: positions and cash are constant across them
+        if hi <= lo:
+            return
+        rows = np.arange(lo, hi)
+        market_value: object = 0
+        for symbol, qty in positions.items():
+            market_value = market_value + qty * last_prices(symbol, rows)
+        seg_equity = cash + market_value if positions else np.full(hi - lo, cash + 0)
+        seg_peak = np.maximum(np.maximum.accumulate(seg_equity), risk.peak_equity)
+        equity[lo:hi] = seg_equity
+        cash_curve[lo:hi] = cash
+        peak_curve[lo:hi] = seg_peak
+        mode_curve[lo:hi] = risk.mode
+        risk.equity = float(seg_equity[-1])
+        risk.peak_equity = float(seg_peak[-1])
+
+    orders: List[Dict[str, object]] = []
+    decisions: List[Tuple[int, Dict[str, object]]] = []
+    events: List[Tuple[int, Dict[str, object]]] = []
+    marked_to = 0
+    # ---------- compact loop: path-dependent gates on intent rows only ----------
+    for i in candidates.tolist():
+        symbol = tape.symbols[codes[i]]
+        price = float(px[i])
+        last_price = float(prev[i])
+        if buy[i]:
+            intent: Dict[str, object] = {"symbol": symbol, "qty": 1, "price": price, "side": "BUY"}
+        else:
+            held = positions.get(symbol, 0.0)
+            if not held > 0:
+                continue
+            avg_cost = cost_basis.get(symbol, last_price)
+            intent = {"symbol": symbol, "qty": -held, "price": price, "side": "SELL", "pnl": (price - avg_cost) * held}
+        mark(marked_to, i)
+
+        snapshot = tape.snapshot(i)
+        now_ts = tape.when(i)
+        if sampler is not None:
+            fill_result = apply_friction(intent, snapshot, friction_policy, sampler=sampler, fill_index=draws)
+            draws += 1
+            drew_any = True
+        else:
+            fill_seed = None
+            if friction_seed is not None:
+                try:
+                    fill_seed = int(friction_seed) + fill_count
+                except Exception:
+                    fill_seed = int(friction_seed)
+            fill_result = apply_friction(intent, snapshot, friction_policy, rng_seed=fill_seed)
+        fill_status = str(fill_result.get("fill_status") or "FILLED").upper()
+        if fill_status != "FILLED":
+            reason = str(fill_result.get("reject_reason") or "execution_unfilled")
+            risk.record_reject(reason)
+            events.append(
+                (
+                    i,
+                    {
+                        "event_type": "SIM_DECISION",
+                        "severity": "WARN",
+                        "symbol": symbol,
+                        "decision": f"EXECUTION_{fill_status}",
+                        "reason": reason,
+                        "sim_fill": fill_result,
+                    },
+                )
+            )
+            decisions.append(
+                (
+                    i,
+                    {
+                        "event_type": "SIM_DECISION",
+                        "symbol": symbol,
+                        "decision": f"EXECUTION_{fill_status}",
+                        "reason": reason,
+                        "sim_fill": fill_result,
+                    },
+                )
+            )
+        else:
+            status = _status_from_snapshot(snapshot)
+            fill_qty = float(fill_result.get("fill_qty", 0.0))
+            fill_price = float(fill_result.get("fill_price", float(intent.get("price") or price)))
+            fee_usd = float(fill_result.get("fee_usd", 0.0))
+            if fill_qty < 0:
+                avg_cost = cost_basis.get(symbol, last_price or price)
+                intent["pnl"] = (fill_price - avg_cost) * abs(fill_qty) - fee_usd
+            else:
+                intent["pnl"] = -fee_usd
+            decision, reason = engine.evaluate(intent, status, now_ts)
+            if decision == "ALLOW":
+                record = dict(intent)
+                record.setdefault("ts_utc", now_ts.isoformat())
+                record.setdefault("policy_version", policy_version)
+                record["sim_fill"] = dict(fill_result)
+                orders.append(record)
+                risk.register_fill(float(intent.get("pnl") or 0.0))
+                risk.last_exec_ts = now_ts
+                loss_reason = engine._check_loss_limits()
+                if loss_reason and engine.cfg.get("degrade_on_loss", True) and not risk.postmortem_triggered:
+                    status_flag = status.get("data_status") if status else "status?"
+                    evidence = f"orders_sim.jsonl#L{order_line_offset + len(orders)} {loss_reason}; status={status_flag}"
+                    risk.postmortem_triggered = True
+                    risk.mode = "SAFE" if risk.mode == "NORMAL" else "OBSERVE"
+                    risk.evidence_notes.append(evidence)
+                    events.append(
+                        (
+                            i,
+                            {
+                                "event_type": "POSTMORTEM",
+                                "severity": "CRITICAL",
+                                "message": "Loss threshold breached; entering degraded mode",
+                                "metrics": {
+                                    "daily_loss": risk.daily_loss,
+                                    "drawdown": risk.drawdown,
+                                    "max_daily_loss": engine.cfg.get("max_daily_loss"),
+                                    "max_drawdown": engine.cfg.get("max_drawdown"),
+                                },
+                                "evidence": evidence,
+                                "threshold_reason": loss_reason,
+                            },
+                        )
+                    )
+                if fill_qty != 0:
+                    cash -= fill_qty * fill_price
+                    cash -= fee_usd
+                    positions[symbol] = positions.get(symbol, 0.0) + fill_qty
+                    if positions[symbol] != 0:
+                        prev_cost = cost_basis.get(symbol, last_price or price)
+                        if fill_qty > 0:
+                            total_qty = positions[symbol]
+                            cost_basis[symbol] = (prev_cost * (total_qty - fill_qty) + fill_price * fill_qty) / total_qty
+                    else:
+                        positions.pop(symbol, None)
+                        cost_basis.pop(symbol, None)
+                    fill_count += 1
+                    filled_any = True
+                decisions.append(
+                    (
+                        i,
+                        {
+                            "event_type": "SIM_INTENT",
+                            "symbol": symbol,
+                            "decision": decision,
+                            "reason": reason,
+                            "fill_qty": fill_qty,
+                            "fill_price": fill_price,
+                            "fee_usd": fee_usd,
+                            "sim_fill": fill_result,
+                        },
+                    )
+                )
+            else:
+                if decision in {"SAFE", "OBSERVE"}:
+                    events.append(
+                        (
+                            i,
+                            {
+                                "event_type": "SIM_INTENT",
+                                "severity": "INFO",
+                                "message": f"Intent only due to mode {risk.mode}",
+                                "intent": intent,
+                            },
+                        )
+                    )
+                message = f"Intent rejected: {decision} {reason or ''}".strip()
+                events.append((i, {"event_type": "SIM_DECISION", "severity": "INFO", "symbol": symbol, "message": message}))
+                decisions.append((i, {"event_type": "SIM_DECISION", "symbol": symbol, "decision": decision, "reason": reason}))
+
+        # the intent row itself, after its fill
+        row = np.array([i])
+        market_value = sum((qty * float(last_prices(sym, row)[0]) for sym, qty in positions.items()))
+        row_equity = cash + market_value
+        risk.equity = row_equity
+        risk.peak_equity = max(risk.peak_equity, row_equity)
+        equity[i] = row_equity
+        cash_curve[i] = cash
+        peak_curve[i] = risk.peak_equity
+        mode_curve[i] = risk.mode
+        marked_to = i + 1
+    mark(marked_to, n)
+
+    out = dict(sim_state)
+    if n:
+        final_prices = dict(init_prices)
+        for code, symbol in enumerate(tape.symbols):
+            final_prices[symbol] = float(px_by_sym[code][-1])
+        out.update(
+            {
+                "risk_state": _risk_state_to_dict(risk),
+                "last_prices": final_prices,
+                "positions": positions,
+                "avg_cost": cost_basis,
+                "cash_usd": cash,
+            }
+        )
+        if filled_any:
+            out["friction_fill_count"] = fill_count
+        if drew_any:
+            out["friction_draws"] = draws
+        if verify_no_lookahead:
+            out["max_ts_seen"] = tape.when(n - 1).isoformat()
+    return BatchResult(
+        equity=equity,
+        cash=cash_curve,
+        peak_equity=peak_curve,
+        mode=mode_curve,
+        orders=orders,
+        decisions=decisions,
+        state=out,
+        risk=risk,
+        events=events,
+    )
+
+
+__all__ = ["BatchResult", "QuoteTape", "run_batch"]
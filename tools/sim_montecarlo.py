@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import math
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from tools.sim_batch import BatchResult, QuoteTape, run_batch
+
+METRICS = ("final_equity_usd", "return_pct", "max_drawdown_pct", "turnover", "reject_rate")
+
+# per-process state set by _init_worker: the memory-mapped tape plus run settings
+_WORKER: Dict[str, object] = {}
+
+
+def seed_metrics(result: BatchResult, start_equity: float = 10_000.0) -> Dict[str, object]:
+    """The per-run metrics stress_harness reports, from a batch result."""
+    equity = result.equity
+    n = int(equity.size)
+    final_equity = float(equity[-1]) if n else start_equity
+    peak = np.maximum.accumulate(np.maximum(equity, start_equity)) if n else np.array([start_equity])
+    drawdown = ((peak - equity) / peak * 100.0) if n else np.zeros(1)
+    trade_count = 0
+    reject_count = 0
+    for _, event in result.decisions:
+        decision = event.get("decision")
+        if decision == "ALLOW":
+            if abs(float(event.get("fill_qty", 0.0))) > 0:  # type: ignore[arg-type]
+                trade_count += 1
+        elif decision:
+            reject_count += 1
+    return {
+        "final_equity_usd": round(final_equity, 2),
+        "return_pct": round((final_equity - start_equity) / start_equity * 100.0, 4),
+        "max_drawdown_pct": round(float(max(0.0, drawdown.max())), 4),
+        "turnover": trade_count,
+        "reject_rate": round(reject_count / max(1, trade_count), 4),
+        "steps": n,
+    }
+
+
+def summarize(values: Sequence[float], confidence: float = 0.95) -> Dict[str, float]:
+    """Mean, spread, percentiles and a normal-approximation confidence interval for the mean."""
+    arr = np.asarray(values, dtype=np.float64)
+    n = int(arr.size)
+    if n == 0:
+        return {"n": 0}
+    mean = float(arr.mean())
+    std = float(arr.std(ddof=1)) if n > 1 else 0.0
+    half = NormalDist().inv_cdf(0.5 + confidence / 2.0) * std / math.sqrt(n)
+    p05, p50, p95 = (float(v) for v in np.percentile(arr, [5, 50, 95]))
+    return {
+        "n": n,
+        "mean": round(mean, 4),
+        "std": round(std, 4),
+        "min": round(float(arr.min()), 4),
+        "p05": round(p05, 4),
+        "p50": round(p50, 4),
+        "p95": round(p95, 4),
+        "max": round(float(arr.max()), 4),
+        "ci_low": round(mean - half, 4),
+        "ci_high": round(mean + half, 4),
+    }
+
+
+def _init_worker(tape_dir: str, config: Dict[str, object], state: Optional[Dict[str, object]], start_equity: float) -> None:
+    _WORKER["tape"] = QuoteTape.open(Path(tape_dir))
+    _WORKER["config"] = config
+    _WORKER["state"] = state
+    _WORKER["start_equity"] = start_equity
+
+
+def _run_seed(seed: int) -> Dict[str, object]:
+    tape: QuoteTape = _WORKER["tape"]  # type: ignore[assignment]
+    config: Dict[str, object] = _WORKER["config"]  # type: ignore[assignment]
+    state = _WORKER["state"]
+    result = run_batch(tape, dict(state) if state else None, {**config, "friction_seed": int(seed)})  # type: ignore[arg-type]
+    return {"seed": int(seed), **seed_metrics(result, float(_WORKER["start_equity"]))}  # type: ignore[arg-type]
+
+
+def run_monte_carlo(
+    quotes: QuoteTape | Sequence[Dict[str, object]],
+    config: Dict[str, object],
+    seeds: Sequence[int],
+    *,
+    state: Optional[Dict[str, object]] = None,
+    workers: Optional[int] = None,
+    confidence: float = 0.95,
+) -> Dict[str, object]:
+    """
+    Run the same policy and quote window once per friction seed and report
+    the spread of outcomes.
+
+    The tape is saved once as .npy columns; every worker process memory-maps
+    the same read-only files instead of receiving its own copy of the quotes.
+    Each seed is one ``run_batch`` (decisions identical to a SimSession with
+    that ``friction_seed``). ``workers`` <= 1 runs in-process. Runs come back
+    in ``seeds`` order whatever the pool does, so the report is
+    deterministic.
+    """
+    tape = quotes if isinstance(quotes, QuoteTape) else QuoteTape.from_rows(quotes)
+    seed_list = [int(seed) for seed in seeds]
+    risk_state = (state or {}).get("risk_state") or {}
+    start_equity = float(risk_state.get("start_equity", 10_000.0)) if isinstance(risk_state, dict) else 10_000.0
+    with tempfile.TemporaryDirectory(prefix="sim_mc_") as tmp_dir:
+        tape.save(Path(tmp_dir))
+        init_args = (tmp_dir, config, state, start_equity)
+        if (workers is not None and workers <= 1) or len(seed_list) <= 1:
+            _init_worker(*init_args)
+            try:
+                runs = [_run_seed(seed) for seed in seed_list]
+            finally:
+                _WORKER.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+                runs = list(pool.map(_run_seed, seed_list))
+    return {
+        "seeds": seed_list,
+        "confidence": confidence,
+        "runs": runs,
+        "distribution": {name: summarize([float(run[name]) for run in runs], confidence) for name in METRICS},
+    }
+
+
+__all__ = ["METRICS", "run_monte_carlo", "seed_metrics", "summarize"]
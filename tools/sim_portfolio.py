@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+
+class PortfolioBook:
+    """
+    Position and last-price vectors for a whole watchlist with a running
+    market value.
+
+    Symbols get a slot in first-seen order. ``mark`` moves the market value
+    by the quoted symbol's delta only and ``set_position`` does the same for
+    a fill, so a step costs O(1) however many positions are open. Deltas
+    accumulate rounding, so every ``resync_every`` updates the value is
+    recomputed from the vectors with ``math.fsum``; equity therefore agrees
+    with ``run_step``'s full sum to float rounding, not bit for bit. A held
+    symbol with no known price is marked at ``fallback_prices`` (cost basis)
+    until it quotes.
+    """
+
+    def __init__(
+        self,
+        positions: Optional[Mapping[str, float]] = None,
+        prices: Optional[Mapping[str, float]] = None,
+        *,
+        fallback_prices: Optional[Mapping[str, float]] = None,
+        resync_every: int = 1024,
+    ) -> None:
+        self.symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._qty = array("d")
+        self._px = array("d")
+        self.resync_every = max(1, int(resync_every))
+        self.market_value = 0.0
+        self._updates = 0
+        prices = prices or {}
+        fallback = fallback_prices or {}
+        for symbol, price in prices.items():
+            self._px[self.symbol_index(symbol)] = float(price or 0.0)
+        for symbol, qty in (positions or {}).items():
+            code = self.symbol_index(symbol)
+            if symbol not in prices:
+                self._px[code] = float(fallback.get(symbol) or 0.0)
+            self._qty[code] = float(qty)
+        self.resync()
+
+    def symbol_index(self, symbol: str) -> int:
+        code = self._index.get(symbol)
+        if code is None:
+            code = self._index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self._qty.append(0.0)
+            self._px.append(0.0)
+        return code
+
+    def mark(self, symbol: str, price: float) -> float:
+        """Record the latest price for ``symbol``; returns the market value."""
+        code = self._index.get(symbol)
+        if code is None:
+            code = self.symbol_index(symbol)
+        qty = self._qty[code]
+        if qty:
+            self.market_value += qty * (price - self._px[code])
+        self._px[code] = price
+        return self._tick()
+
+    def set_position(self, symbol: str, qty: float) -> float:
+        """Replace the held quantity for ``symbol`` (0 when flat); returns the market value."""
+        code = self._index.get(symbol)
+        if code is None:
+            code = self.symbol_index(symbol)
+        self.market_value += (qty - self._qty[code]) * self._px[code]
+        self._qty[code] = qty
+        return self._tick()
+
+    def position(self, symbol: str) -> float:
+        code = self._index.get(symbol)
+        return 0.0 if code is None else self._qty[code]
+
+    def price(self, symbol: str) -> Optional[float]:
+        code = self._index.get(symbol)
+        return None if code is None else self._px[code]
+
+    def resync(self) -> float:
+        self.market_value = math.fsum(q * p for q, p in zip(self._qty, self._px) if q)
+        self._updates = 0
+        return self.market_value
+
+    def _tick(self) -> float:
+        self._updates += 1
+        if self._updates >= self.resync_every:
+            return self.resync()
+        return self.market_value
+
+
+def _stream_ts(row: Mapping[str, object]) -> datetime:
+    ts_raw = row.get("ts_utc") or row.get("ts")
+    if not isinstance(ts_raw, str):
+        raise ValueError(f"row without ts_utc: {row!r}")
+    return datetime.fromisoformat(ts_raw)
+
+
+def merge_streams(streams: Mapping[str, Iterable[Mapping[str, object]]]) -> Iterator[Mapping[str, object]]:
+    """
+    Interleave per-symbol quote streams (each already in time order) into one
+    time-ordered stream; equal timestamps keep the mapping's symbol order.
+    Rows without a ``symbol`` inherit their stream's key.
+    """
+
+    def tagged(symbol: str, rows: Iterable[Mapping[str, object]]) -> Iterator[Tuple[datetime, Mapping[str, object]]]:
+        for row in rows:
+            if not row.get("symbol"):
+                row = {**row, "symbol": symbol}
+            yield _stream_ts(row), row
+
+    merged = heapq.merge(*(tagged(sym, rows) for sym, rows in streams.items()), key=lambda item: item[0])
+    for _, row in merged:
+        yield row
+
+
+def run_portfolio(
+    streams: Mapping[str, Iterable[Mapping[str, object]]],
+    config: Dict[str, object] | None = None,
+    state: Dict[str, object] | None = None,
+):
+    """
+    Replay interleaved per-symbol streams through one SimSession with
+    incremental mark-to-market; returns the session (``state``, ``equity``,
+    ``portfolio()``) after the last row.
+    """
+    from tools.sim_autopilot import SimSession
+
+    session = SimSession({**(config or {}), "mark_to_market": "incremental"}, state)
+    for row in merge_streams(streams):
+        session.step(row)  # type: ignore[arg-type]
+    return session
+
+
+__all__ = ["PortfolioBook", "merge_streams", "run_portfolio"]
@@ -2,12 +2,12 @@ from __future__ import annotations
 
 import argparse
 import csv
-import json
 import sys
 import time
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
 from zoneinfo import ZoneInfo
 
 if str(Path(__file__).resolve().parent.parent) not in sys.path:
@@ -50,28 +50,14 @@ def _parse_ts(value: str | None) -> datetime | None:
             return None
 
 
-def _write_equity_curve(path: Path, payload: Dict[str, object]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    try:
-        with path.open("a", encoding="utf-8") as fh:
-            fh.write(json.dumps(payload, ensure_ascii=False) + "\n")
-    except Exception:
-        return
-
-
-def _write_portfolio(path: Path, state: Dict[str, object], step: int, ts_utc: str) -> None:
-    body = {
+def _portfolio_body(state: Dict[str, object], step: int, ts_utc: str) -> Dict[str, object]:
+    return {
         "ts_utc": ts_utc,
         "step": step,
         "cash_usd": state.get("cash_usd", 0.0),
         "positions": state.get("positions", {}),
         "avg_cost": state.get("avg_cost", {}),
     }
-    path.parent.mkdir(parents=True, exist_ok=True)
-    try:
-        path.write_text(json.dumps(body, ensure_ascii=False, indent=2), encoding="utf-8")
-    except Exception:
-        return
 
 
 def _build_snapshot(row: Dict[str, str]) -> Dict[str, object]:
@@ -83,14 +69,120 @@ def _build_snapshot(row: Dict[str, str]) -> Dict[str, object]:
     return snapshot
 
 
-def _load_dependencies() -> Tuple[object, object]:
+def _load_dependencies() -> Tuple[object, object, object]:
     try:
         from tools.policy_registry import get_policy
-        from tools.sim_autopilot import run_step
+        from tools.sim_artifacts import SimArtifactWriter
+        from tools.sim_autopilot import SimSession
     except ImportError as exc:
         raise ReplayError("Required simulation dependencies are missing") from exc
 
-    return get_policy, run_step
+    return get_policy, SimSession, SimArtifactWriter
+
+
+def _replay_rows(
+    input_path: Path,
+    start_row: int | None,
+    start_ts: datetime | None,
+    symbol_filter: List[str] | None,
+) -> Iterator[Tuple[Dict[str, object], datetime]]:
+    for row_no, row in _iter_rows(input_path):
+        if start_row and row_no < start_row:
+            continue
+        snapshot = _build_snapshot(row)
+        ts_obj = _parse_ts(str(snapshot.get("ts_utc") or snapshot.get("ts"))) or datetime.now(timezone.utc)
+        if start_ts and ts_obj < start_ts:
+            continue
+        symbol = str(snapshot.get("symbol") or "-").upper()
+        if symbol_filter and symbol not in symbol_filter:
+            continue
+        yield snapshot, ts_obj
+
+
+def _equity_row(
+    ts_obj: datetime,
+    et_tz: ZoneInfo,
+    equity: float,
+    cash: float,
+    drawdown_pct: float,
+    mode: str,
+    step: int,
+    policy_version: str,
+) -> Dict[str, object]:
+    ts_utc = ts_obj.astimezone(timezone.utc)
+    return {
+        "ts_utc": ts_utc.isoformat(),
+        "ts_et": ts_utc.astimezone(et_tz).isoformat(),
+        "equity_usd": round(equity, 2),
+        "cash_usd": round(cash, 2),
+        "drawdown_pct": round(drawdown_pct, 4),
+        "mode": mode,
+        "step": step,
+        "policy_version": policy_version,
+    }
+
+
+def _run_batch_replay(
+    selected: List[Tuple[Dict[str, object], datetime]],
+    sim_config: Dict[str, object],
+    sim_state: Dict[str, object],
+    artifacts: object,
+    logs_dir: Path,
+    et_tz: ZoneInfo,
+) -> None:
+    try:
+        from tools.sim_batch import QuoteTape, run_batch
+    except ImportError as exc:
+        raise ReplayError("Batch engine requires numpy") from exc
+
+    orders_path = logs_dir / "orders_sim.jsonl"
+    try:
+        tape = QuoteTape.from_rows([snapshot for snapshot, _ in selected])
+    except ValueError as exc:
+        raise ReplayError(f"Batch engine needs parseable timestamps: {exc}") from exc
+    result = run_batch(tape, sim_state, sim_config, order_line_offset=artifacts.line_count(orders_path))
+    for record in result.orders:
+        artifacts.append_json(orders_path, record)
+    policy_version = str(sim_config.get("policy_version", "baseline"))
+    # heartbeats, rejects and POSTMORTEM as the session logs them; ts_utc is write time there too
+    events_path = logs_dir / "events_sim.jsonl"
+    for events in result.logged_events(tape):
+        for event in events:
+            artifacts.append_json(
+                events_path,
+                {**event, "ts_utc": datetime.now(timezone.utc).isoformat(), "policy_version": policy_version},
+            )
+    drawdown_pct = result.drawdown * 100
+    for step, (_, ts_obj) in enumerate(selected, start=1):
+        k = step - 1
+        artifacts.append_json(
+            logs_dir / "equity_curve.jsonl",
+            _equity_row(
+                ts_obj,
+                et_tz,
+                float(result.equity[k]),
+                float(result.cash[k]),
+                float(drawdown_pct[k]),
+                str(result.mode[k]),
+                step,
+                policy_version,
+            ),
+        )
+    if selected:
+        risk = result.risk
+        artifacts.snapshot(
+            logs_dir / "risk_state.json",
+            {
+                "mode": risk.mode,
+                "risk_budget_used": round(risk.risk_budget_used, 4),
+                "drawdown_used": round(risk.drawdown_used, 4),
+                "rejects_recent": list(risk.rejects_recent),
+                "ts_utc": datetime.now(timezone.utc).isoformat(),
+                "policy_version": policy_version,
+            },
+        )
+        last_ts = selected[-1][1].astimezone(timezone.utc).isoformat()
+        artifacts.snapshot(logs_dir / "portfolio_sim.json", _portfolio_body(result.state, len(selected), last_ts))
 
 
 def run_replay(args: argparse.Namespace) -> int:
@@ -119,64 +211,63 @@ def run_replay(args: argparse.Namespace) -> int:
     sleep_delay = 0.0 if args.speed <= 0 else 1.0 / float(args.speed)
     et_tz = _load_et_tz()
 
-    get_policy, run_step = _load_dependencies()
+    get_policy, SimSession, SimArtifactWriter = _load_dependencies()
     policy_version, policy = get_policy()
     sim_state: Dict[str, object] = {
         "cash_usd": 10_000.0,
         "risk_state": {"mode": "NORMAL", "equity": 10_000.0, "start_equity": 10_000.0, "peak_equity": 10_000.0},
     }
-
-    steps = 0
-    for row_no, row in _iter_rows(input_path):
-        if start_row and row_no < start_row:
-            continue
-        snapshot = _build_snapshot(row)
-        ts_obj = _parse_ts(str(snapshot.get("ts_utc") or snapshot.get("ts"))) or datetime.now(timezone.utc)
-        if start_ts and ts_obj < start_ts:
-            continue
-        symbol = str(snapshot.get("symbol") or "-").upper()
-        if symbol_filter and symbol not in symbol_filter:
-            continue
-
-        sim_state, _ = run_step(
-            snapshot,
-            sim_state,
-            {
-                "logs_dir": logs_dir,
-                "momentum_threshold_pct": args.threshold,
-                "verify_no_lookahead": bool(args.verify_no_lookahead),
-                "policy_version": policy_version,
-                "risk_overrides": policy.get("risk_overrides", {}),
-            },
-        )
-        steps += 1
-
-        risk_state = sim_state.get("risk_state", {}) or {}
-        equity = float(risk_state.get("equity", sim_state.get("cash_usd", 0.0)))
-        cash = float(sim_state.get("cash_usd", 0.0))
-        drawdown_pct = float(risk_state.get("drawdown", 0.0)) * 100 if "drawdown" in risk_state else 0.0
-        ts_utc = ts_obj.astimezone(timezone.utc)
-        ts_et = ts_utc.astimezone(et_tz)
-
-        _write_equity_curve(
-            eq_path,
-            {
-                "ts_utc": ts_utc.isoformat(),
-                "ts_et": ts_et.isoformat(),
-                "equity_usd": round(equity, 2),
-                "cash_usd": round(cash, 2),
-                "drawdown_pct": round(drawdown_pct, 4),
-                "mode": risk_state.get("mode", "UNKNOWN"),
-                "step": steps,
-                "policy_version": policy_version,
-            },
+    sim_config: Dict[str, object] = {
+        "logs_dir": logs_dir,
+        "momentum_threshold_pct": args.threshold,
+        "verify_no_lookahead": bool(args.verify_no_lookahead),
+        "policy_version": policy_version,
+        "risk_overrides": policy.get("risk_overrides", {}),
+    }
+    rows = _replay_rows(input_path, start_row, start_ts, symbol_filter)
+    artifacts = SimArtifactWriter(checkpoint_every=int(args.checkpoint_every))
+    try:
+        if args.engine == "batch":
+            if sleep_delay > 0:
+                raise ReplayError("--speed paces a live replay; use --engine session")
+            selected = list(islice(rows, max(0, max_steps)))
+            _run_batch_replay(selected, sim_config, sim_state, artifacts, logs_dir, et_tz)
+            return 0
+
+        session = SimSession(
+            {**sim_config, "artifacts": artifacts, "mark_to_market": args.mark_to_market}, sim_state
         )
-        _write_portfolio(portfolio_path, sim_state, steps, ts_utc.isoformat())
-
-        if steps >= max_steps:
-            break
-        if sleep_delay > 0:
-            time.sleep(sleep_delay)
+        steps = 0
+        for snapshot, ts_obj in rows:
+            session.step(snapshot)
+            steps += 1
+
+            risk_state = session.risk_state
+            artifacts.append_json(
+                eq_path,
+                _equity_row(
+                    ts_obj,
+                    et_tz,
+                    float(risk_state.equity),
+                    float(session.cash),
+                    float(risk_state.drawdown) * 100,
+                    risk_state.mode,
+                    steps,
+                    policy_version,
+                ),
+            )
+            ts_utc = ts_obj.astimezone(timezone.utc)
+            artifacts.snapshot(portfolio_path, _portfolio_body(session.portfolio(), steps, ts_utc.isoformat()))
+            artifacts.tick()
+
+            if steps >= max_steps:
+                break
+            if sleep_delay > 0:
+                # paced replays are watched live, so keep the files current
+                artifacts.flush()
+                time.sleep(sleep_delay)
+    finally:
+        artifacts.close()
 
     return 0
 
@@ -194,6 +285,26 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
     parser.add_argument("--start-ts", dest="start_ts", help="Start from specific ts_utc (ISO)")
     parser.add_argument("--logs-dir", default=str(DEFAULT_LOGS), help="Logs directory for outputs")
     parser.add_argument("--threshold", type=float, default=0.5, help="Pct change threshold for generating intents")
+    parser.add_argument(
+        "--engine",
+        choices=("session", "batch"),
+        default="session",
+        help="batch = vectorised engine (same orders/equity/events_sim.jsonl; no --speed)",
+    )
+    parser.add_argument(
+        "--mark-to-market",
+        choices=("full", "incremental"),
+        default="full",
+        dest="mark_to_market",
+        help="incremental = O(1) equity per row for large watchlists (session engine; equal up to float rounding)",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=500,
+        dest="checkpoint_every",
+        help="Steps between risk_state/portfolio snapshot writes; 0 writes them only at end of run",
+    )
     parser.add_argument("--verify-no-lookahead", action="store_true", dest="verify_no_lookahead", help="Enable anti-lookahead assertions")
     return parser.parse_args(argv)
 
@@ -3,21 +3,31 @@ from __future__ import annotations
 import argparse
 import csv
 import json
+import math
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence, Tuple
 
 if str(Path(__file__).resolve().parent.parent) not in __import__("sys").path:
     __import__("sys").path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from tools.policy_registry import get_policy
 from tools.promotion_gate_v2 import GateConfig, evaluate_safety
-from tools.sim_autopilot import run_step
+from tools.sim_artifacts import SimArtifactWriter
+from tools.sim_autopilot import SimSession
+
+if TYPE_CHECKING:
+    from tools.quote_store import QuoteColumns
 
 ROOT = Path(__file__).resolve().parent.parent
 DEFAULT_INPUT = ROOT / "Data" / "quotes.csv"
 RUNS_DIR = ROOT / "Logs" / "tournament_runs"
 REPORTS_DIR = ROOT / "Reports"
+START_EQUITY = 10_000.0
 
 
 class TournamentError(Exception):
@@ -70,22 +80,14 @@ def _parse_windows(raw: str) -> List[Tuple[datetime, datetime]]:
     return windows
 
 
-def _write_jsonl(path: Path, payload: Dict[str, object]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as fh:
-        fh.write(json.dumps(payload, ensure_ascii=False) + "\n")
-
-
-def _write_portfolio(path: Path, state: Dict[str, object], step: int, ts_utc: str) -> None:
-    body = {
+def _portfolio_body(state: Dict[str, object], step: int, ts_utc: str) -> Dict[str, object]:
+    return {
         "ts_utc": ts_utc,
         "step": step,
         "cash_usd": state.get("cash_usd", 0.0),
         "positions": state.get("positions", {}),
         "avg_cost": state.get("avg_cost", {}),
     }
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(body, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
 def _score_run(metrics: Dict[str, float | int]) -> float:
@@ -164,12 +166,15 @@ def _signal_mean_reversion(history: Sequence[float], params: Dict[str, object])
     zscore = float(params.get("zscore") or 0.0)
     if len(history) < window:
         return 0
-    window_values = history[-window:]
+    return _zscore_signal(history[-window:], zscore)
+
+
+def _zscore_signal(window_values: Sequence[float], zscore: float) -> int:
     mean = _mean(window_values)
     std = _stdev(window_values)
     if std <= 0:
         return 0
-    current = history[-1]
+    current = window_values[-1]
     z = (current - mean) / std
     return 1 if z <= -abs(zscore) else 0
 
@@ -203,33 +208,246 @@ def _strategy_signal(history: Sequence[float], candidate: Dict[str, object]) ->
     return 0
 
 
-def _score_candidate(metrics: Dict[str, object]) -> float:
+# Rolling kernels: the same decisions as the _signal_* functions above, with
+# O(1) work per price instead of re-slicing the history. Running sums drift
+# from the sliced sums by rounding, so a decision whose margin is within
+# tolerance of the threshold is re-taken with the list formula on the window.
+_TIE_RTOL = 1e-9
+_Z_RTOL = 1e-6
+_VAR_FLOOR = 1e-8
+
+
+class _RollingWindow:
+    """Last ``size`` values with a running sum, re-summed every ``size`` pushes."""
+
+    __slots__ = ("size", "values", "total", "_pushes")
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.values: deque = deque(maxlen=size)
+        self.total = 0.0
+        self._pushes = 0
+
+    def push(self, value: float) -> None:
+        if len(self.values) == self.size:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        self._pushes += 1
+        if self._pushes >= self.size:
+            self._pushes = 0
+            self.total = sum(self.values)
+
+    def mean(self) -> float:
+        return self.total / len(self.values)
+
+
+class _HistorySignal:
+    """Fallback for parameters the kernels do not cover: the list function on the full history."""
+
+    __slots__ = ("fn", "params", "history")
+
+    def __init__(self, fn, params: Dict[str, object]) -> None:
+        self.fn = fn
+        self.params = params
+        self.history: List[float] = []
+
+    def update(self, price: float) -> int:
+        self.history.append(price)
+        return self.fn(self.history, self.params)
+
+
+class _ConstantSignal:
+    __slots__ = ("value",)
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def update(self, price: float) -> int:
+        return self.value
+
+
+class _MomentumSignal:
+    __slots__ = ("lookback", "threshold_pct", "values")
+
+    def __init__(self, lookback: int, threshold_pct: float) -> None:
+        self.lookback = lookback
+        self.threshold_pct = threshold_pct
+        self.values: deque = deque(maxlen=lookback + 1)
+
+    def update(self, price: float) -> int:
+        values = self.values
+        values.append(price)
+        if len(values) <= self.lookback:
+            return 0
+        past = values[0]
+        if past <= 0:
+            return 0
+        change_pct = (price - past) / past * 100.0
+        return 1 if change_pct >= self.threshold_pct else 0
+
+
+class _MACrossoverSignal:
+    __slots__ = ("slow", "count", "fast_window", "slow_window")
+
+    def __init__(self, fast: int, slow: int) -> None:
+        self.slow = slow
+        self.count = 0
+        self.fast_window = _RollingWindow(fast)
+        self.slow_window = _RollingWindow(slow)
+
+    def update(self, price: float) -> int:
+        self.count += 1
+        self.fast_window.push(price)
+        self.slow_window.push(price)
+        if self.count < self.slow:
+            return 0
+        fast_avg = self.fast_window.mean()
+        slow_avg = self.slow_window.mean()
+        if abs(fast_avg - slow_avg) <= _TIE_RTOL * (abs(fast_avg) + abs(slow_avg)):
+            fast_avg = _mean(self.fast_window.values)
+            slow_avg = _mean(self.slow_window.values)
+        return 1 if fast_avg > slow_avg else 0
+
+
+class _MeanReversionSignal:
+    """Sliding-window Welford mean and M2, re-derived from the window every ``window`` pushes."""
+
+    __slots__ = ("window", "zscore", "threshold", "values", "mean", "m2", "_pushes")
+
+    def __init__(self, window: int, zscore: float) -> None:
+        self.window = window
+        self.zscore = zscore
+        self.threshold = -abs(zscore)
+        self.values: deque = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._pushes = 0
+
+    def update(self, price: float) -> int:
+        values = self.values
+        n = self.window
+        if len(values) == n:
+            old = values[0]
+            values.append(price)
+            delta = price - old
+            mean = self.mean + delta / n
+            self.m2 += delta * (price - mean + old - self.mean)
+            self.mean = mean
+        else:
+            values.append(price)
+            delta = price - self.mean
+            self.mean += delta / len(values)
+            self.m2 += delta * (price - self.mean)
+        self._pushes += 1
+        if self._pushes >= n:
+            self._pushes = 0
+            self.mean = _mean(values)
+            self.m2 = sum((v - self.mean) ** 2 for v in values)
+        if len(values) < n or n < 2:
+            return 0
+        # a near-flat window is where the list formula's own rounding decides; defer to it
+        if self.m2 > _VAR_FLOOR * n * self.mean * self.mean:
+            z = (price - self.mean) / math.sqrt(self.m2 / (n - 1))
+            if abs(z - self.threshold) > _Z_RTOL * (1.0 + abs(z)):
+                return 1 if z <= self.threshold else 0
+        return _zscore_signal(values, self.zscore)
+
+
+class _BreakoutSignal:
+    """Monotonic deque of (index, price) whose head is the window high."""
+
+    __slots__ = ("window", "count", "highs")
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.count = 0
+        self.highs: deque = deque()
+
+    def update(self, price: float) -> int:
+        index = self.count
+        self.count += 1
+        highs = self.highs
+        while highs and highs[-1][1] <= price:
+            highs.pop()
+        highs.append((index, price))
+        if highs[0][0] <= index - self.window:
+            highs.popleft()
+        if self.count < self.window:
+            return 0
+        # the current price closes the window, so it is the high exactly when it heads the deque;
+        # the list function's at-the-low branch also returns 0, so no lows deque is needed
+        return 1 if highs[0][0] == index else 0
+
+
+def _signal_kernel(candidate: Dict[str, object]):
+    """Stateful equivalent of ``_strategy_signal``: ``update(price)`` appends one price and returns the signal."""
+    family = str(candidate.get("family") or "")
+    params = candidate.get("params") if isinstance(candidate.get("params"), dict) else {}
+    if family == "momentum":
+        lookback = int(params.get("lookback") or 1)
+        if lookback < 1:
+            return _HistorySignal(_signal_momentum, params)
+        return _MomentumSignal(lookback, float(params.get("threshold_pct") or 0.0))
+    if family == "ma_crossover":
+        fast = int(params.get("fast") or 1)
+        slow = int(params.get("slow") or fast + 1)
+        if fast < 1 or slow < 1:
+            return _HistorySignal(_signal_ma_crossover, params)
+        return _MACrossoverSignal(fast, slow)
+    if family == "mean_reversion":
+        window = int(params.get("window") or 1)
+        if window < 1:
+            return _HistorySignal(_signal_mean_reversion, params)
+        return _MeanReversionSignal(window, float(params.get("zscore") or 0.0))
+    if family == "breakout":
+        window = int(params.get("window") or 1)
+        if window < 1:
+            return _HistorySignal(_signal_breakout, params)
+        return _BreakoutSignal(window)
+    if candidate.get("candidate_id") == "baseline_buy_hold":
+        return _ConstantSignal(1)
+    return _ConstantSignal(0)
+
+
+def _score_candidate(metrics: Dict[str, object], capital: float = START_EQUITY) -> float:
     equity = float(metrics.get("final_equity_usd") or 0.0)
     drawdown = float(metrics.get("max_drawdown_pct") or 0.0)
     turnover = int(metrics.get("turnover") or 0)
     rejects = int(metrics.get("num_rejects") or 0)
-    return (equity - 10_000.0) / 100.0 - drawdown * 25.0 - turnover * 0.5 - rejects * 2.0
+    return (equity - capital) / 100.0 - drawdown * 25.0 - turnover * 0.5 - rejects * 2.0
 
 
 def _simulate_candidate(
     prices: Sequence[float],
     candidate: Dict[str, object],
     max_steps: int,
+    capital: float = START_EQUITY,
 ) -> Dict[str, object]:
-    equity = 10_000.0
+    return _simulate_path(prices, candidate, max_steps, capital)[0]
+
+
+def _simulate_path(
+    prices: Sequence[float],
+    candidate: Dict[str, object],
+    max_steps: int,
+    capital: float = START_EQUITY,
+) -> Tuple[Dict[str, object], List[float]]:
+    """Sleeve metrics starting from ``capital``, plus the P&L of each price step."""
+    equity = capital
     peak = equity
+    step_pnl: List[float] = []
     position = 0
     turnover = 0
     rejects = 0
-    history: List[float] = []
+    signal = _signal_kernel(candidate)
     guard = candidate.get("guard_defaults") if isinstance(candidate.get("guard_defaults"), dict) else {}
     max_drawdown = float(guard.get("max_drawdown_pct") or 0.0)
     max_turnover = int(guard.get("max_turnover") or 0)
 
     steps = min(max_steps, len(prices))
     for idx in range(1, steps):
-        history.append(prices[idx - 1])
-        desired = _strategy_signal(history, candidate)
+        desired = signal.update(prices[idx - 1])
         drawdown_pct = (peak - equity) / peak * 100.0 if peak else 0.0
         blocked = False
         if max_drawdown and drawdown_pct > max_drawdown:
@@ -243,6 +461,7 @@ def _simulate_candidate(
                 position = desired
                 turnover += 1
         pnl = position * (prices[idx] - prices[idx - 1])
+        step_pnl.append(pnl)
         equity += pnl
         peak = max(peak, equity)
 
@@ -250,13 +469,80 @@ def _simulate_candidate(
     reject_rate = rejects / max(1, steps - 1)
     metrics = {
         "final_equity_usd": round(equity, 2),
-        "pnl_proxy": round(equity - 10_000.0, 2),
+        "pnl_proxy": round(equity - capital, 2),
         "max_drawdown_pct": round(drawdown_pct, 4),
         "turnover": turnover,
         "num_rejects": rejects,
         "reject_rate": round(reject_rate, 4),
         "steps": steps,
     }
+    metrics["score"] = round(_score_candidate(metrics, capital), 4)
+    return metrics, step_pnl
+
+
+def _price_series(
+    quotes: Sequence[Dict[str, object]],
+) -> Tuple[Dict[str, List[float]], Dict[str, List[int]]]:
+    """
+    Prices per symbol in quote order, symbols in first-seen order; rows
+    without a symbol share one series. The second mapping holds the quote
+    row of each price, which orders the sleeves' steps on one book.
+    """
+    series: Dict[str, List[float]] = {}
+    rows: Dict[str, List[int]] = {}
+    for index, row in enumerate(quotes):
+        if row.get("price") is None:
+            continue
+        symbol = str(row.get("symbol") or "")
+        series.setdefault(symbol, []).append(float(row.get("price") or 0.0))
+        rows.setdefault(symbol, []).append(index)
+    return (series, rows) if series else ({"": []}, {"": []})
+
+
+def _evaluate_pool(
+    prices: Sequence[float], pool: Sequence[Dict[str, object]], max_steps: int, engine: str, capital: float
+) -> Tuple[List[Dict[str, object]], List[List[float]]]:
+    if engine == "batch":
+        from tools.tournament_batch import simulate_candidate_paths
+
+        metrics, step_pnl = simulate_candidate_paths(prices, pool, max_steps, capital)
+        return metrics, step_pnl.tolist()
+    runs = [_simulate_path(prices, candidate, max_steps, capital) for candidate in pool]
+    return [run[0] for run in runs], [run[1] for run in runs]
+
+
+def _portfolio_metrics(
+    sleeves: Sequence[Dict[str, object]], step_pnl: Sequence[Sequence[float]], rows: Sequence[Sequence[int]]
+) -> Dict[str, object]:
+    """
+    One book holding ``START_EQUITY`` split evenly across the symbols'
+    sleeves. Every sleeve step's P&L is booked at the quote row that priced
+    it, so the equity path is the sleeves' P&L summed in quote order and the
+    drawdown is taken from that path (peak to final, as for a sleeve).
+    Turnover and rejects add up. A single sleeve is the portfolio.
+    """
+    if len(sleeves) == 1:
+        return dict(sleeves[0])
+    book = sorted(
+        ((at[k + 1], pnl) for path, at in zip(step_pnl, rows) for k, pnl in enumerate(path)),
+        key=lambda step: step[0],
+    )
+    equity = START_EQUITY
+    peak = equity
+    for _, pnl in book:
+        equity += pnl
+        peak = max(peak, equity)
+    rejects = sum(int(m.get("num_rejects") or 0) for m in sleeves)
+    decisions = sum(max(0, int(m.get("steps") or 0) - 1) for m in sleeves)
+    metrics: Dict[str, object] = {
+        "final_equity_usd": round(equity, 2),
+        "pnl_proxy": round(equity - START_EQUITY, 2),
+        "max_drawdown_pct": round((peak - equity) / peak * 100.0 if peak else 0.0, 4),
+        "turnover": sum(int(m.get("turnover") or 0) for m in sleeves),
+        "num_rejects": rejects,
+        "reject_rate": round(rejects / max(1, decisions), 4),
+        "steps": sum(int(m.get("steps") or 0) for m in sleeves),
+    }
     metrics["score"] = round(_score_candidate(metrics), 4)
     return metrics
 
@@ -267,12 +553,55 @@ def run_strategy_tournament(
     max_steps: int,
     seed: int,
     gate_config: GateConfig | None = None,
+    engine: str = "loop",
+    workers: int = 1,
 ) -> Dict[str, object]:
-    prices = [float(row.get("price") or 0.0) for row in quotes if row.get("price") is not None]
+    """
+    Score the baselines plus ``candidates`` on the quote prices.
+
+    Quotes are split once into per-symbol price series and every candidate
+    trades each series separately on an even share of ``START_EQUITY``
+    (``max_steps`` applies per symbol); the entry's ``metrics`` and ``score``
+    are the portfolio of those sleeves and ``per_symbol`` keeps each sleeve.
+    ``workers`` > 1 evaluates the symbols in a process pool; the report does
+    not depend on it. ``engine="batch"`` evaluates the whole pool at once
+    with ``tools.tournament_batch`` (NumPy); entries are identical to the
+    per-candidate ``loop`` engine.
+    """
+    if engine not in ("loop", "batch"):
+        raise TournamentError(f"Unknown tournament engine: {engine}")
+    if engine == "batch":
+        try:
+            import tools.tournament_batch  # noqa: F401
+        except ImportError as exc:
+            raise TournamentError("Batch engine requires numpy") from exc
     gate_config = gate_config or GateConfig()
+    pool = list(BASELINE_CANDIDATES) + list(candidates)
+    series, rows = _price_series(quotes)
+    symbols = list(series)
+    capital = START_EQUITY / len(symbols)
+    if workers > 1 and len(symbols) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            sleeves = list(
+                executor.map(
+                    _evaluate_pool,
+                    [series[symbol] for symbol in symbols],
+                    repeat(pool),
+                    repeat(max_steps),
+                    repeat(engine),
+                    repeat(capital),
+                )
+            )
+    else:
+        sleeves = [_evaluate_pool(series[symbol], pool, max_steps, engine, capital) for symbol in symbols]
     entries: List[Dict[str, object]] = []
-    for candidate in list(BASELINE_CANDIDATES) + list(candidates):
-        metrics = _simulate_candidate(prices, candidate, max_steps)
+    for index, candidate in enumerate(pool):
+        per_symbol = {symbol: sleeves[k][0][index] for k, symbol in enumerate(symbols)}
+        metrics = _portfolio_metrics(
+            list(per_symbol.values()),
+            [sleeve[1][index] for sleeve in sleeves],
+            [rows[symbol] for symbol in symbols],
+        )
         safety_pass, safety_failures = evaluate_safety(metrics, gate_config)
         entries.append(
             {
@@ -282,6 +611,7 @@ def run_strategy_tournament(
                 "risk_profile_tags": candidate.get("risk_profile_tags", []),
                 "guard_defaults": candidate.get("guard_defaults", {}),
                 "metrics": metrics,
+                "per_symbol": per_symbol,
                 "score": metrics.get("score"),
                 "safety_pass": safety_pass,
                 "safety_failures": safety_failures,
@@ -292,6 +622,7 @@ def run_strategy_tournament(
         "schema_version": 1,
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "seed": seed,
+        "symbols": symbols,
         "entries": entries,
     }
 
@@ -312,6 +643,10 @@ def _variant_config(name: str) -> Dict[str, object]:
 
 
 def _load_quotes(input_path: Path) -> List[Dict[str, object]]:
+    if input_path.is_dir():
+        from tools.quote_store import load_quote_rows
+
+        return load_quote_rows(input_path)
     quotes: List[Dict[str, object]] = []
     for row in _iter_rows(input_path):
         record: Dict[str, object] = {k: v for k, v in row.items() if v not in {None, ""}}
@@ -323,6 +658,14 @@ def _load_quotes(input_path: Path) -> List[Dict[str, object]]:
     return quotes
 
 
+def _load_window_index(input_path: Path) -> WindowIndex:
+    if input_path.is_dir():
+        from tools.quote_store import QuoteStore
+
+        return WindowIndex.from_columns(QuoteStore(input_path).load())
+    return WindowIndex(_load_quotes(input_path))
+
+
 def _within_window(row: Dict[str, object], start: datetime, end: datetime) -> bool:
     raw_ts = row.get("ts_utc") or row.get("ts")
     if not raw_ts:
@@ -334,6 +677,112 @@ def _within_window(row: Dict[str, object], start: datetime, end: datetime) -> bo
     return start <= ts <= end
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _epoch_us(ts: datetime) -> int:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return (ts - _EPOCH) // _MICROSECOND
+
+
+class _ColumnTimes:
+    """UTC datetimes for epoch-microsecond keys, built on access."""
+
+    def __init__(self, keys: Sequence[int]) -> None:
+        self.keys = keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getitem__(self, k: int) -> datetime:
+        return _EPOCH + timedelta(microseconds=self.keys[k])
+
+
+class _ColumnRows:
+    """Quote dicts for ``positions`` into ``QuoteColumns`` arrays, built on access."""
+
+    def __init__(self, columns: QuoteColumns, positions: Sequence[int]) -> None:
+        self.columns = columns
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, k: int) -> Dict[str, object]:
+        from tools.quote_store import epoch_ns_to_iso
+
+        i = self.positions[k]
+        cols = self.columns
+        return {
+            "ts_utc": epoch_ns_to_iso(int(cols.ts_ns[i])),
+            "symbol": cols.symbols[int(cols.symbol_id[i])],
+            "price": float(cols.price[i]),
+        }
+
+
+class WindowIndex:
+    """
+    Quote timestamps parsed once and sorted, so a time window is two
+    binary searches instead of a parse of every row.
+
+    Rows without a readable ts_utc/ts are left out, as ``_within_window``
+    skips them. ``select`` returns positions into ``rows``/``times`` for
+    the rows in ``[start, end]`` in quote order: a plain range when the
+    quotes are already in time order (ties keep quote order), the window's
+    positions re-sorted by quote order otherwise.
+    """
+
+    def __init__(self, quotes: Sequence[Dict[str, object]]) -> None:
+        parsed: List[Tuple[int, int, datetime]] = []
+        for position, row in enumerate(quotes):
+            raw_ts = row.get("ts_utc") or row.get("ts")
+            if not raw_ts:
+                continue
+            try:
+                ts = datetime.fromisoformat(str(raw_ts))
+            except Exception:
+                continue
+            parsed.append((_epoch_us(ts), position, ts))
+        self.in_order = all(parsed[k][0] <= parsed[k + 1][0] for k in range(len(parsed) - 1))
+        if not self.in_order:
+            parsed.sort(key=lambda item: item[0])
+        self.keys = [key for key, _, _ in parsed]
+        self.positions = [position for _, position, _ in parsed]
+        self.times = [ts for _, _, ts in parsed]
+        self.rows = [quotes[position] for position in self.positions]
+
+    @classmethod
+    def from_columns(cls, columns: QuoteColumns) -> WindowIndex:
+        """
+        Index a ``QuoteStore`` load without building a dict per row: keys
+        come from the int64 timestamps, and ``rows``/``times`` are made on
+        access (only rows a window selects), shaped like ``to_rows()``.
+        """
+        import numpy as np
+
+        keys = np.asarray(columns.ts_ns, dtype=np.int64) // 1_000
+        index = cls.__new__(cls)
+        index.in_order = bool(np.all(keys[1:] >= keys[:-1]))
+        order = np.arange(keys.size) if index.in_order else np.argsort(keys, kind="stable")
+        index.keys = keys[order].tolist()
+        index.positions = order.tolist()
+        index.times = _ColumnTimes(index.keys)
+        index.rows = _ColumnRows(columns, index.positions)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def select(self, start: datetime, end: datetime) -> Sequence[int]:
+        lo = bisect_left(self.keys, _epoch_us(start))
+        hi = bisect_right(self.keys, _epoch_us(end))
+        if self.in_order or hi - lo < 2:
+            return range(lo, hi)
+        return sorted(range(lo, hi), key=self.positions.__getitem__)
+
+
 def _safe_read_jsonl(path: Path) -> List[Dict[str, object]]:
     if not path.exists():
         return []
@@ -395,18 +844,25 @@ def _append_guard_proposal(run_dir: Path, reason: str, policy_version: str) -> N
             fh.write(json.dumps(event, ensure_ascii=False) + "\n")
 
 
+def _run_id(window: Tuple[datetime, datetime], variant: str, policy_version: str) -> str:
+    start, end = window
+    return f"{policy_version}_{variant}_{start.date()}_{end.date()}"
+
+
 def _run_single(
-    quotes: Sequence[Dict[str, object]],
+    quotes: Sequence[Dict[str, object]] | WindowIndex,
     window: Tuple[datetime, datetime],
     variant: str,
     max_steps: int,
     policy_version: str,
     policy_overrides: Dict[str, object],
+    runs_dir: Path | None = None,
 ) -> Tuple[str, Dict[str, object]]:
     start, end = window
-    run_id = f"{policy_version}_{variant}_{start.date()}_{end.date()}"
-    run_dir = RUNS_DIR / run_id
+    run_id = _run_id(window, variant, policy_version)
+    run_dir = (runs_dir or RUNS_DIR) / run_id
     run_dir.mkdir(parents=True, exist_ok=True)
+    index = quotes if isinstance(quotes, WindowIndex) else WindowIndex(quotes)
 
     cfg = _variant_config(variant)
     merged_overrides = dict(policy_overrides)
@@ -422,40 +878,47 @@ def _run_single(
     }
     eq_path = run_dir / "equity_curve.jsonl"
     portfolio_path = run_dir / "portfolio_sim.json"
-    steps = 0
-    for row in quotes:
-        if not _within_window(row, start, end):
-            continue
-        sim_state, _ = run_step(
-            row,
-            sim_state,
-            {**cfg, "logs_dir": run_dir, "policy_version": policy_version, "risk_overrides": merged_overrides},
-        )
-        risk_state = sim_state.get("risk_state", {}) or {}
-        equity = float(risk_state.get("equity", sim_state.get("cash_usd", 0.0)))
-        cash = float(sim_state.get("cash_usd", 0.0))
-        drawdown_pct = float(risk_state.get("drawdown", 0.0)) * 100 if "drawdown" in risk_state else 0.0
-        ts_utc_raw = row.get("ts_utc") or row.get("ts")
-        try:
-            ts_utc = datetime.fromisoformat(str(ts_utc_raw)).astimezone(timezone.utc)
-        except Exception:
-            ts_utc = datetime.now(timezone.utc)
-        _write_jsonl(
-            eq_path,
+    # tournament runs are only read back once finished: snapshots are written at end of run
+    with SimArtifactWriter(checkpoint_every=0) as artifacts:
+        session = SimSession(
             {
-                "ts_utc": ts_utc.isoformat(),
-                "equity_usd": round(equity, 2),
-                "cash_usd": round(cash, 2),
-                "drawdown_pct": round(drawdown_pct, 4),
-                "mode": risk_state.get("mode", "UNKNOWN"),
-                "step": steps + 1,
+                **cfg,
+                "logs_dir": run_dir,
                 "policy_version": policy_version,
+                "risk_overrides": merged_overrides,
+                "artifacts": artifacts,
             },
+            sim_state,
         )
-        _write_portfolio(portfolio_path, sim_state, steps + 1, ts_utc.isoformat())
-        steps += 1
-        if steps >= max_steps:
-            break
+        steps = 0
+        for k in index.select(start, end):
+            row = index.rows[k]
+            session.step(row)
+            risk_state = session.risk_state
+            equity = float(risk_state.equity)
+            cash = float(session.cash)
+            drawdown_pct = float(risk_state.drawdown) * 100
+            try:
+                ts_utc = index.times[k].astimezone(timezone.utc)
+            except Exception:
+                ts_utc = datetime.now(timezone.utc)
+            artifacts.append_json(
+                eq_path,
+                {
+                    "ts_utc": ts_utc.isoformat(),
+                    "equity_usd": round(equity, 2),
+                    "cash_usd": round(cash, 2),
+                    "drawdown_pct": round(drawdown_pct, 4),
+                    "mode": risk_state.mode,
+                    "step": steps + 1,
+                    "policy_version": policy_version,
+                },
+            )
+            artifacts.snapshot(portfolio_path, _portfolio_body(session.portfolio(), steps + 1, ts_utc.isoformat()))
+            artifacts.tick()
+            steps += 1
+            if steps >= max_steps:
+                break
 
     events_src = run_dir / "events_sim.jsonl"
     if events_src.exists():
@@ -474,6 +937,71 @@ def _run_single(
     return run_id, metrics
 
 
+# (window, variant, policy_version, policy risk_overrides)
+TournamentJob = Tuple[Tuple[datetime, datetime], str, str, Dict[str, object]]
+
+# per-process state set by _init_worker: the quotes and run settings shared by every job
+_WORKER: Dict[str, object] = {}
+
+
+def _init_worker(quotes: WindowIndex, max_steps: int, runs_dir: Path) -> None:
+    _WORKER["quotes"] = quotes
+    _WORKER["max_steps"] = max_steps
+    _WORKER["runs_dir"] = runs_dir
+
+
+def _run_chain(chain: List[Tuple[int, TournamentJob]]) -> List[Tuple[int, str, Dict[str, object]]]:
+    results: List[Tuple[int, str, Dict[str, object]]] = []
+    for index, (window, variant, policy_version, policy_overrides) in chain:
+        run_id, metrics = _run_single(
+            _WORKER["quotes"],  # type: ignore[arg-type]
+            window,
+            variant,
+            int(_WORKER["max_steps"]),  # type: ignore[arg-type]
+            policy_version,
+            policy_overrides,
+            runs_dir=_WORKER["runs_dir"],  # type: ignore[arg-type]
+        )
+        results.append((index, run_id, metrics))
+    return results
+
+
+def run_tournament_jobs(
+    quotes: Sequence[Dict[str, object]] | WindowIndex,
+    jobs: Sequence[TournamentJob],
+    max_steps: int,
+    *,
+    workers: int = 1,
+    runs_dir: Path | None = None,
+) -> List[Tuple[str, Dict[str, object]]]:
+    """
+    ``_run_single`` for every (window, variant, policy) job.
+
+    Each job writes only its own run directory. Jobs that share a run_id
+    would write the same one, so they form a chain run in job order; chains
+    go to a process pool when ``workers`` > 1. Timestamps are parsed once
+    into a ``WindowIndex`` that each worker receives once. Results come back
+    in ``jobs`` order, so the summary is the same for any worker count.
+    """
+    runs_dir = runs_dir or RUNS_DIR
+    chains: Dict[str, List[Tuple[int, TournamentJob]]] = {}
+    for index, job in enumerate(jobs):
+        chains.setdefault(_run_id(job[0], job[1], job[2]), []).append((index, job))
+    index = quotes if isinstance(quotes, WindowIndex) else WindowIndex(quotes)
+    init_args = (index, max_steps, runs_dir)
+    if workers <= 1 or len(chains) <= 1:
+        _init_worker(*init_args)
+        try:
+            done = [result for chain in chains.values() for result in _run_chain(chain)]
+        finally:
+            _WORKER.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as executor:
+            done = [result for results in executor.map(_run_chain, chains.values()) for result in results]
+    done.sort(key=lambda item: item[0])
+    return [(run_id, metrics) for _, run_id, metrics in done]
+
+
 def _render_report(runs: List[Dict[str, object]], path: Path) -> None:
     lines = ["# Sim Tournament v1", "", f"Generated: {datetime.now(timezone.utc).isoformat()} UTC", ""]
     sorted_runs = sorted(runs, key=lambda r: r.get("score", 0.0), reverse=True)
@@ -515,7 +1043,10 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
     parser.add_argument("--stride", type=int, help="Stride in days for auto windows")
     parser.add_argument("--variants", default="baseline,conservative,aggressive", help="Comma separated variant names")
     parser.add_argument("--max-steps", type=int, default=250, dest="max_steps", help="Max steps per window")
-    parser.add_argument("--policy-version", dest="policy_version", help="Policy version override", default=None)
+    parser.add_argument(
+        "--policy-version", dest="policy_version", help="Policy version override (comma separated for several)", default=None
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Process pool size for (window, variant, policy) runs")
     return parser.parse_args(argv)
 
 
@@ -539,40 +1070,45 @@ def main(argv: List[str] | None = None) -> int:
     if not variants:
         variants = ["baseline"]
 
-    policy_version, policy_cfg = get_policy(args.policy_version)
-    quotes = _load_quotes(input_path)
-    runs: List[Dict[str, object]] = []
-    for window in windows:
-        for variant in variants:
-            run_id, metrics = _run_single(
-                quotes,
-                window,
-                variant,
-                int(args.max_steps),
-                policy_version,
-                policy_cfg.get("risk_overrides", {}),
-            )
+    policies: Dict[str, Dict[str, object]] = {}
+    for requested in [v.strip() for v in str(args.policy_version or "").split(",") if v.strip()] or [None]:
+        policy_version, policy_cfg = get_policy(requested)
+        policies.setdefault(policy_version, policy_cfg)
+    quotes = _load_window_index(input_path)
+    jobs: List[TournamentJob] = [
+        (window, variant, policy_version, policy_cfg.get("risk_overrides", {}))
+        for policy_version, policy_cfg in policies.items()
+        for window in windows
+        for variant in variants
+    ]
+    results = run_tournament_jobs(quotes, jobs, int(args.max_steps), workers=int(args.workers))
+
+    for policy_version in policies:
+        runs: List[Dict[str, object]] = []
+        for job, (_, metrics) in zip(jobs, results):
+            if job[2] != policy_version:
+                continue
             metrics["steps"] = int(args.max_steps)
             metrics["policy_version"] = policy_version
             runs.append(metrics)
 
-    sorted_runs = sorted(runs, key=lambda r: r.get("score", 0.0), reverse=True)
-    worst_runs = sorted_runs[-3:]
-    for run in worst_runs:
-        reason = "Elevated drawdown or rejects; propose tighter stale-data gate and lower max_notional."
-        _append_guard_proposal(RUNS_DIR / run["run_id"], reason, policy_version=policy_version)
-
-    summary = {"generated_at": datetime.now(timezone.utc).isoformat(), "runs": runs, "policy_version": policy_version}
-    summary_path = RUNS_DIR / f"tournament_summary_{policy_version}.json"
-    summary_path.parent.mkdir(parents=True, exist_ok=True)
-    summary_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    report_name = f"tournament_{policy_version}_{datetime.now().strftime('%Y%m%d')}.md"
-    report_path = REPORTS_DIR / report_name
-    _render_report(runs, report_path)
-
-    print(f"Wrote summary to {summary_path}")
-    print(f"Report: {report_path}")
+        sorted_runs = sorted(runs, key=lambda r: r.get("score", 0.0), reverse=True)
+        worst_runs = sorted_runs[-3:]
+        for run in worst_runs:
+            reason = "Elevated drawdown or rejects; propose tighter stale-data gate and lower max_notional."
+            _append_guard_proposal(RUNS_DIR / run["run_id"], reason, policy_version=policy_version)
+
+        summary = {"generated_at": datetime.now(timezone.utc).isoformat(), "runs": runs, "policy_version": policy_version}
+        summary_path = RUNS_DIR / f"tournament_summary_{policy_version}.json"
+        summary_path.parent.mkdir(parents=True, exist_ok=True)
+        summary_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+
+        report_name = f"tournament_{policy_version}_{datetime.now().strftime('%Y%m%d')}.md"
+        report_path = REPORTS_DIR / report_name
+        _render_report(runs, report_path)
+
+        print(f"Wrote summary to {summary_path}")
+        print(f"Report: {report_path}")
     return 0
 
 
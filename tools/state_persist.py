@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def atomic_write_json(path: Path, payload: Any, *, indent: Optional[int] = 2, ensure_ascii: bool = True) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=ensure_ascii, indent=indent)
+    tmp.replace(path)
+
+
+def _strip_keys(payload: Any, volatile: Iterable[str]) -> Any:
+    if not isinstance(payload, dict):
+        return payload
+    stripped: Dict[str, Any] = dict(payload)
+    for dotted in volatile:
+        head, _, rest = dotted.partition(".")
+        if head not in stripped:
+            continue
+        if rest:
+            stripped[head] = _strip_keys(stripped[head], [rest])
+        else:
+            del stripped[head]
+    return stripped
+
+
+class DebouncedJsonFile:
+    """
+    Coalesces rewrites of one JSON file.
+
+    ``set(payload)`` replaces the pending document; it only counts as a change
+    when it differs from what was last written once ``volatile_keys`` (dotted
+    paths such as ``quotes.file_age_s``) are ignored. ``mark_dirty()`` is for
+    documents mutated in place. A dirty document is written at most once per
+    ``min_interval_s``; with ``heartbeat_s`` the latest document is also
+    rewritten at least that often even if only volatile keys moved. ``flush()``
+    writes immediately and is what shutdown paths call.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        min_interval_s: float = 1.0,
+        heartbeat_s: Optional[float] = None,
+        volatile_keys: Iterable[str] = (),
+        indent: Optional[int] = 2,
+        ensure_ascii: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = path
+        self.min_interval_s = max(0.0, float(min_interval_s))
+        self.heartbeat_s = None if heartbeat_s is None else max(0.0, float(heartbeat_s))
+        self.volatile_keys = tuple(volatile_keys)
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+        self._clock = clock
+        self._payload: Any = None
+        self._has_payload = False
+        self._dirty = False
+        self._stale = False  # only volatile keys changed since the last write
+        self._written_signature: Optional[str] = None
+        self._last_write: Optional[float] = None
+        self.writes = 0
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def _signature(self, payload: Any) -> str:
+        return json.dumps(_strip_keys(payload, self.volatile_keys), sort_keys=True, ensure_ascii=False, default=str)
+
+    def set(self, payload: Any) -> bool:
+        """Stage a new document; returns True when it is a real (non-volatile) change."""
+        self._payload = payload
+        self._has_payload = True
+        changed = self._signature(payload) != self._written_signature
+        if changed:
+            self._dirty = True
+        else:
+            self._stale = True
+        return changed
+
+    def mark_dirty(self, payload: Any = None) -> None:
+        if payload is not None:
+            self._payload = payload
+            self._has_payload = True
+        self._dirty = True
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Time until ``maybe_flush`` would write; None when nothing is pending."""
+        if not self._has_payload:
+            return None
+        if self._last_write is None:
+            return 0.0 if (self._dirty or self._stale) else None
+        elapsed = self._clock() - self._last_write
+        due: Optional[float] = None
+        if self._dirty:
+            due = max(0.0, self.min_interval_s - elapsed)
+        if self._stale and self.heartbeat_s is not None:
+            beat = max(0.0, self.heartbeat_s - elapsed)
+            due = beat if due is None else min(due, beat)
+        return due
+
+    def maybe_flush(self) -> bool:
+        due = self.seconds_until_due()
+        if due is None or due > 0:
+            return False
+        return self.flush()
+
+    def flush(self) -> bool:
+        if not self._has_payload or not (self._dirty or self._stale):
+            return False
+        try:
+            atomic_write_json(self.path, self._payload, indent=self.indent, ensure_ascii=self.ensure_ascii)
+        except Exception as e:
+            try:
+                print(f"[WARN] failed to write {self.path.name}: {e}")
+            except Exception:
+                pass
+            return False
+        self._written_signature = self._signature(self._payload)
+        self._last_write = self._clock()
+        self._dirty = False
+        self._stale = False
+        self.writes += 1
+        return True
+
+
+__all__ = ["DebouncedJsonFile", "atomic_write_json"]
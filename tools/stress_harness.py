@@ -3,20 +3,32 @@ from __future__ import annotations
 import argparse
 import csv
 import json
+import math
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Mapping, Union
 
-from tools.execution_friction import load_friction_policy
+from tools.execution_friction import FrictionPolicy
 from tools.paths import repo_root, to_repo_relative
 from tools.promotion_gate_v2 import GateConfig, evaluate_safety
-from tools.sim_autopilot import run_step
+from tools.sim_autopilot import SimSession
+from tools.sim_batch import QuoteTape
+from tools.sim_montecarlo import run_monte_carlo
 
 ROOT = repo_root()
 RUNS_ROOT = ROOT / "Logs" / "train_runs"
 
 
-def _load_quotes(path: Path, limit: int | None = None) -> List[Dict[str, object]]:
+# quote rows from a CSV, or a columnar store kept as its arrays
+Quotes = Union[List[Dict[str, object]], QuoteTape]
+
+
+def _load_quotes(path: Path, limit: int | None = None) -> Quotes:
+    if path.is_dir():
+        from tools.quote_store import QuoteStore
+
+        tape = QuoteTape.from_columns(QuoteStore(path).load())
+        return tape.head(limit) if limit is not None else tape
     quotes: List[Dict[str, object]] = []
     with path.open("r", encoding="utf-8", newline="") as fh:
         reader = csv.DictReader(fh)
@@ -32,27 +44,48 @@ def _load_quotes(path: Path, limit: int | None = None) -> List[Dict[str, object]
     return quotes
 
 
-def _apply_multipliers(policy: Dict[str, float | int], multipliers: Dict[str, float]) -> Dict[str, float | int]:
-    adjusted = dict(policy)
-    adjusted["fee_per_trade"] = float(adjusted.get("fee_per_trade", 0.0)) * multipliers.get("fees", 1.0)
-    adjusted["fee_per_share"] = float(adjusted.get("fee_per_share", 0.0)) * multipliers.get("fees", 1.0)
-    adjusted["slippage_bps"] = float(adjusted.get("slippage_bps", 0.0)) * multipliers.get("slippage", 1.0)
-    adjusted["spread_bps"] = float(adjusted.get("spread_bps", 0.0)) * multipliers.get("spread", 1.0)
-    adjusted["latency_ms"] = float(adjusted.get("latency_ms", 0.0)) * multipliers.get("latency", 1.0)
-    adjusted["gap_bps"] = float(adjusted.get("gap_bps", 0.0)) * multipliers.get("slippage", 1.0)
-    adjusted["partial_fill_prob"] = min(
-        1.0, float(adjusted.get("partial_fill_prob", 0.0)) * multipliers.get("slippage", 1.0)
+def _window(quotes: Quotes, max_steps: int) -> Quotes:
+    n = min(len(quotes), max_steps) if max_steps > 0 else len(quotes)
+    return quotes.head(n) if isinstance(quotes, QuoteTape) else quotes[:n]
+
+
+def _snapshots(quotes: Quotes) -> Iterator[Mapping[str, object]]:
+    if isinstance(quotes, QuoteTape):
+        return (quotes.snapshot(i) for i in range(len(quotes)))
+    return iter(quotes)
+
+
+def _apply_multipliers(policy: FrictionPolicy, multipliers: Dict[str, float]) -> FrictionPolicy:
+    return policy.replace(
+        fee_per_trade=policy.fee_per_trade * multipliers.get("fees", 1.0),
+        fee_per_share=policy.fee_per_share * multipliers.get("fees", 1.0),
+        slippage_bps=policy.slippage_bps * multipliers.get("slippage", 1.0),
+        spread_bps=policy.spread_bps * multipliers.get("spread", 1.0),
+        latency_ms=policy.latency_ms * multipliers.get("latency", 1.0),
+        gap_bps=policy.gap_bps * multipliers.get("slippage", 1.0),
+        partial_fill_prob=min(1.0, policy.partial_fill_prob * multipliers.get("slippage", 1.0)),
+        reject_prob=min(1.0, policy.reject_prob * multipliers.get("fees", 1.0)),
+        fail_prob=min(1.0, policy.fail_prob * multipliers.get("fees", 1.0)),
     )
-    adjusted["reject_prob"] = min(1.0, float(adjusted.get("reject_prob", 0.0)) * multipliers.get("fees", 1.0))
-    adjusted["fail_prob"] = min(1.0, float(adjusted.get("fail_prob", 0.0)) * multipliers.get("fees", 1.0))
-    return adjusted
+
+
+def _scenario_config(
+    policy_version: str, policy_cfg: Dict[str, object], friction_policy: FrictionPolicy
+) -> Dict[str, object]:
+    return {
+        "momentum_threshold_pct": 0.5,
+        "verify_no_lookahead": True,
+        "policy_version": policy_version,
+        "risk_overrides": policy_cfg.get("risk_overrides", {}),
+        "friction_policy": friction_policy,
+    }
 
 
 def _simulate_scenario(
-    quotes: List[Dict[str, object]],
+    quotes: Quotes,
     policy_version: str,
     policy_cfg: Dict[str, object],
-    friction_policy: Dict[str, float | int],
+    friction_policy: FrictionPolicy,
     run_dir: Path,
     scenario: str,
     seed: int | None,
@@ -75,20 +108,16 @@ def _simulate_scenario(
     logs_dir = run_dir / "stress_runs" / scenario.lower()
     logs_dir.mkdir(parents=True, exist_ok=True)
 
-    for idx, row in enumerate(quotes[: max_steps if max_steps > 0 else len(quotes)], start=1):
-        sim_state, emitted = run_step(
-            row,
-            sim_state,
-            {
-                "logs_dir": logs_dir,
-                "momentum_threshold_pct": 0.5,
-                "verify_no_lookahead": True,
-                "policy_version": policy_version,
-                "risk_overrides": policy_cfg.get("risk_overrides", {}),
-                "friction_policy": friction_policy,
-                "friction_seed": seed,
-            },
-        )
+    session = SimSession(
+        {
+            **_scenario_config(policy_version, policy_cfg, friction_policy),
+            "logs_dir": logs_dir,
+            "friction_seed": seed,
+        },
+        sim_state,
+    )
+    for row in _snapshots(_window(quotes, max_steps)):
+        emitted = session.step(row)
         for event in emitted:
             if event.get("decision"):
                 if event.get("decision") == "ALLOW":
@@ -96,13 +125,12 @@ def _simulate_scenario(
                         trade_count += 1
                 else:
                     reject_count += 1
-        risk_state = sim_state.get("risk_state", {}) or {}
-        equity = float(risk_state.get("equity", sim_state.get("cash_usd", 0.0)))
+        equity = session.equity
         peak = max(peak, equity)
         drawdown_pct = ((peak - equity) / peak * 100.0) if peak else 0.0
         max_drawdown_pct = max(max_drawdown_pct, drawdown_pct)
 
-    final_equity = float(sim_state.get("risk_state", {}).get("equity", sim_state.get("cash_usd", 0.0)))
+    final_equity = session.equity
     return_pct = ((final_equity - 10_000.0) / 10_000.0) * 100.0
     turnover = trade_count
     reject_rate = reject_count / max(1, trade_count)
@@ -116,15 +144,48 @@ def _simulate_scenario(
     }
 
 
+def _monte_carlo_scenario(
+    quotes: Quotes,
+    policy_version: str,
+    policy_cfg: Dict[str, object],
+    friction_policy: FrictionPolicy,
+    base_seed: int,
+    mc_seeds: int,
+    max_steps: int,
+    workers: int | None,
+    gate_config: GateConfig,
+) -> Dict[str, object]:
+    """N friction seeds of one scenario; the gate judges the pessimistic (p95) tail, not one path."""
+    window = _window(quotes, max_steps)
+    seeds = [base_seed + k for k in range(mc_seeds)]
+    try:
+        report = run_monte_carlo(
+            window, _scenario_config(policy_version, policy_cfg, friction_policy), seeds, workers=workers
+        )
+    except (ValueError, AssertionError) as exc:
+        # fail closed: a requested distribution that cannot be built must not pass the gate
+        return {"seeds": seeds, "pass": False, "failures": ["mc_unavailable"], "error": str(exc)}
+    dist = report["distribution"]
+    tail = {
+        "max_drawdown_pct": dist["max_drawdown_pct"]["p95"],  # type: ignore[index]
+        "turnover": math.ceil(dist["turnover"]["p95"]),  # type: ignore[index]
+        "reject_rate": dist["reject_rate"]["p95"],  # type: ignore[index]
+    }
+    tail_pass, tail_failures = evaluate_safety(tail, gate_config)
+    return {**report, "tail_metrics": tail, "pass": tail_pass, "failures": [f"mc_p95:{f}" for f in tail_failures]}
+
+
 def evaluate_stress(
-    quotes: List[Dict[str, object]],
+    quotes: Quotes,
     policy_version: str,
     policy_cfg: Dict[str, object],
     run_dir: Path,
     seed: int,
     max_steps: int = 200,
+    mc_seeds: int = 0,
+    mc_workers: int | None = None,
 ) -> Dict[str, object]:
-    base_policy = load_friction_policy()
+    base_policy = FrictionPolicy.load()
     scenarios = [
         ("BASELINE", {"fees": 1.0, "slippage": 1.0, "spread": 1.0, "latency": 1.0}, None),
         ("STRESS_A", {"fees": 2.0, "slippage": 1.0, "spread": 1.0, "latency": 1.0}, None),
@@ -139,8 +200,10 @@ def evaluate_stress(
     for name, multipliers, scenario_seed in scenarios:
         adjusted_policy = _apply_multipliers(base_policy, multipliers)
         if name == "STRESS_C":
-            adjusted_policy["partial_fill_prob"] = max(float(adjusted_policy.get("partial_fill_prob", 0.0)), 0.35)
-            adjusted_policy["max_fill_fraction"] = min(float(adjusted_policy.get("max_fill_fraction", 1.0)), 0.6)
+            adjusted_policy = adjusted_policy.replace(
+                partial_fill_prob=max(adjusted_policy.partial_fill_prob, 0.35),
+                max_fill_fraction=min(adjusted_policy.max_fill_fraction, 0.6),
+            )
         metrics = _simulate_scenario(
             quotes,
             policy_version,
@@ -152,18 +215,34 @@ def evaluate_stress(
             max_steps,
         )
         safety_pass, failures = evaluate_safety(metrics, gate_config)
+        monte_carlo = None
+        if mc_seeds > 0:
+            monte_carlo = _monte_carlo_scenario(
+                quotes,
+                policy_version,
+                policy_cfg,
+                adjusted_policy,
+                scenario_seed if scenario_seed is not None else seed,
+                mc_seeds,
+                max_steps,
+                mc_workers,
+                gate_config,
+            )
+            safety_pass = safety_pass and bool(monte_carlo["pass"])
+            failures = failures + list(monte_carlo["failures"])  # type: ignore[arg-type]
         if not safety_pass:
             overall_failures.append(f"{name}:" + ",".join(failures))
-        scenario_rows.append(
-            {
-                "scenario": name,
-                "multipliers": multipliers,
-                "metrics": metrics,
-                "pass": safety_pass,
-                "failures": failures,
-                "seed": scenario_seed,
-            }
-        )
+        row = {
+            "scenario": name,
+            "multipliers": multipliers,
+            "metrics": metrics,
+            "pass": safety_pass,
+            "failures": failures,
+            "seed": scenario_seed,
+        }
+        if monte_carlo is not None:
+            row["monte_carlo"] = monte_carlo
+        scenario_rows.append(row)
 
     baseline_pass = next((row.get("pass") for row in scenario_rows if row.get("scenario") == "BASELINE"), False)
     stress_pass = all(row.get("pass") for row in scenario_rows if row.get("scenario") != "BASELINE")
@@ -188,6 +267,7 @@ def evaluate_stress(
             "scenarios_path": to_repo_relative(scenarios_path),
             "friction_policy_path": to_repo_relative(ROOT / "Data" / "friction_policy.json"),
             "stress_seed": seed,
+            "mc_seeds": mc_seeds,
         },
     }
 
@@ -219,6 +299,14 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
     parser.add_argument("--policy-version", default="baseline", dest="policy_version")
     parser.add_argument("--seed", type=int, default=101)
     parser.add_argument("--max-steps", type=int, default=200)
+    parser.add_argument(
+        "--mc-seeds",
+        type=int,
+        default=0,
+        dest="mc_seeds",
+        help="Friction seeds per scenario for Monte Carlo distributions; 0 = single-seed only",
+    )
+    parser.add_argument("--mc-workers", type=int, default=None, dest="mc_workers", help="Process pool size (default: CPU count)")
     return parser.parse_args(argv)
 
 
@@ -244,6 +332,8 @@ def main(argv: List[str] | None = None) -> int:
         run_dir,
         seed=args.seed,
         max_steps=args.max_steps,
+        mc_seeds=args.mc_seeds,
+        mc_workers=args.mc_workers,
     )
     print(json.dumps(report, ensure_ascii=False, indent=2))
     return 0 if report.get("overall_pass") else 1
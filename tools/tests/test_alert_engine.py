@@ -0,0 +1,112 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from tools.alert_engine import AlertEngine, replay_alerts
+from tools.quotes_tail import QuotesTailReader
+
+T0 = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+
+
+def _engine(**overrides: float) -> AlertEngine:
+    params = {"minute_move_pct": 1.0, "flat_repeats": 3, "stale_seconds": 600, "cooldown_seconds": 300}
+    params.update(overrides)
+    return AlertEngine(**params)  # type: ignore[arg-type]
+
+
+def _rows(prices: list, symbol: str = "AAPL", step_s: int = 60) -> list:
+    return [
+        {"ts_utc": (T0 + timedelta(seconds=i * step_s)).isoformat(), "symbol": symbol, "price": px}
+        for i, px in enumerate(prices)
+    ]
+
+
+class AlertEngineTests(unittest.TestCase):
+    def test_move_fires_once_per_cooldown(self) -> None:
+        engine = _engine()
+        first = engine.on_pair("AAPL", 100.0, 102.0, T0, now_epoch=1000.0)
+        self.assertEqual([s.alert_type for s in first.signals], ["MOVE"])
+        self.assertAlmostEqual(first.move_pct or 0.0, 2.0)
+        self.assertIn("MOVE|AAPL", engine.cooldowns)
+
+        again = engine.on_pair("AAPL", 102.0, 100.0, T0 + timedelta(minutes=1), now_epoch=1100.0)
+        self.assertEqual(again.signals, [])
+        later = engine.on_pair("AAPL", 100.0, 103.0, T0 + timedelta(minutes=2), now_epoch=1400.0)
+        self.assertEqual([s.alert_type for s in later.signals], ["MOVE"])
+
+    def test_same_timestamp_is_skipped(self) -> None:
+        engine = _engine()
+        engine.on_pair("AAPL", 100.0, 100.5, T0, now_epoch=0.0)
+        self.assertTrue(engine.on_pair("AAPL", 100.0, 100.5, T0, now_epoch=1.0).skipped)
+
+    def test_flat_fires_at_exact_run_length(self) -> None:
+        engine = _engine(flat_repeats=3, cooldown_seconds=0)
+        fired = []
+        for i in range(5):
+            ev = engine.on_quote("SPY", 50.0, T0 + timedelta(minutes=i), now_epoch=float(i))
+            if ev is not None:
+                fired.append((ev.run_len, [s.alert_type for s in ev.signals]))
+        # first quote only primes; run_len counts distinct timestamps at the same price
+        self.assertEqual(fired, [(1, []), (2, []), (3, ["DATA_FLAT"]), (4, [])])
+
+    def test_stream_matches_pairs(self) -> None:
+        prices = [100.0, 100.0, 101.5, 101.5, 101.5, 99.0, 99.0]
+        streamed = _engine()
+        paired = _engine()
+        stream_signals = []
+        pair_signals = []
+        for i, px in enumerate(prices):
+            ts = T0 + timedelta(minutes=i)
+            ev = streamed.on_quote("AAPL", px, ts, now_epoch=float(i * 60))
+            if ev is not None:
+                stream_signals.extend((s.alert_type, s.metrics) for s in ev.signals)
+            if i:
+                ev = paired.on_pair("AAPL", prices[i - 1], px, ts, now_epoch=float(i * 60))
+                pair_signals.extend((s.alert_type, s.metrics) for s in ev.signals)
+        self.assertEqual(stream_signals, pair_signals)
+        self.assertEqual(streamed.cooldowns, paired.cooldowns)
+
+    def test_polling_from_multi_row_file_feeds_every_row(self) -> None:
+        engine = _engine(minute_move_pct=50.0, window_moves={5: 2.0}, day_move_pct=3.0)
+
+        def poll(reader: QuotesTailReader, now_epoch: float) -> list:
+            snap = reader.poll()
+            for sym, px, ts in snap.ticks:
+                engine.on_tick(sym, px, ts)
+            for sym, prev, now, now_ts in snap.pairs:
+                engine.on_pair(sym, prev, now, now_ts, now_epoch=now_epoch)
+            return [(sig.alert_type, sig.metrics) for sig in engine.evaluate_windows(now_epoch=now_epoch)]
+
+        def lines(rows: list) -> str:
+            return "".join(f"{(T0 + timedelta(minutes=m)).isoformat()},AAPL,{px},t\n" for m, px in rows)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "quotes.csv"
+            # alerts starts mid-day: the day's first row is four rows back
+            path.write_text("ts_utc,symbol,price,source\n" + lines([(0, 100), (3, 101), (6, 102), (9, 103)]))
+            reader = QuotesTailReader(path)
+            first = poll(reader, 1.0)
+            self.assertEqual([t for t, _ in first], ["DAY_MOVE"])
+            self.assertEqual(first[0][1]["day_open"], 100.0)
+
+            # several rows land between polls; the 5-minute reference is one of the middle ones
+            with path.open("a", encoding="utf-8") as fh:
+                fh.write(lines([(12, 104), (13, 104), (14, 104), (17, 107)]))
+            second = poll(reader, 2.0)
+        self.assertEqual([t for t, _ in second], ["MOVE_5M"])
+        self.assertEqual(second[0][1]["ref_ts_epoch"], (T0 + timedelta(minutes=12)).timestamp())
+
+    def test_replay_is_deterministic_and_reports_gaps(self) -> None:
+        rows = _rows([100.0, 102.0, 102.0]) + [
+            {"ts_utc": (T0 + timedelta(hours=2)).isoformat(), "symbol": "AAPL", "price": 90.0},
+            {"ts_utc": "bad", "symbol": "AAPL", "price": 1.0},
+        ]
+        first = [(s.key, s.now_epoch) for s in replay_alerts(rows, _engine())]
+        second = [(s.key, s.now_epoch) for s in replay_alerts(rows, _engine())]
+        self.assertEqual(first, second)
+        self.assertEqual([k for k, _ in first], ["MOVE|AAPL", "DATA_STALE|__GLOBAL__", "MOVE|AAPL"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.event_sink import EventSink
+
+
+class EventSinkTests(unittest.TestCase):
+    def test_background_batch_preserves_order_and_groups_fsync(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            events = Path(tmp_dir) / "Logs" / "events.jsonl"
+            text_log = Path(tmp_dir) / "Logs" / "alerts.log"
+            sink = EventSink(durability="batch", fsync_every=50, fsync_ms=10_000)
+            for i in range(200):
+                sink.write_json(events, {"i": i, "msg": "涨"})
+                sink.write_line(text_log, f"line {i}")
+            self.assertTrue(sink.flush(timeout=5))
+            rows = [json.loads(line) for line in events.read_text(encoding="utf-8").splitlines()]
+            self.assertEqual([r["i"] for r in rows], list(range(200)))
+            self.assertEqual(len(text_log.read_text(encoding="utf-8").splitlines()), 200)
+            # 400 lines over two files never needs more than one fsync per 50 lines (+ final flush)
+            self.assertLessEqual(sink.fsync_calls, 400 // 50 + 2)
+            sink.close()
+            with self.assertRaises(RuntimeError):
+                sink.write_line(text_log, "late")
+
+    def test_strict_fsyncs_every_line_inline(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "events.jsonl"
+            with EventSink(durability="strict") as sink:
+                self.assertFalse(sink.background)
+                for i in range(3):
+                    sink.write_json(path, {"i": i})
+                    self.assertEqual(len(path.read_text(encoding="utf-8").splitlines()), i + 1)
+                self.assertEqual(sink.fsync_calls, 3)
+
+    def test_sync_none_never_fsyncs_and_bounds_open_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with EventSink(durability="none", background=False, max_open_files=2) as sink:
+                for i in range(5):
+                    sink.write_text(Path(tmp_dir) / f"f{i % 3}.md", "\n---\nblock\n")
+                self.assertLessEqual(len(sink._files), 2)
+            self.assertEqual(sink.fsync_calls, 0)
+            self.assertEqual((Path(tmp_dir) / "f0.md").read_text(encoding="utf-8"), "\n---\nblock\n" * 2)
+
+    def test_rejects_unknown_durability(self) -> None:
+        with self.assertRaises(ValueError):
+            EventSink(durability="eventual")
+
+
+if __name__ == "__main__":
+    unittest.main()
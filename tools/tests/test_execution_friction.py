@@ -1,6 +1,10 @@
+import dataclasses
+import json
+import tempfile
 import unittest
+from pathlib import Path
 
-from tools.execution_friction import apply_friction
+from tools.execution_friction import FILL_STATUSES, FrictionPolicy, FrictionSampler, apply_friction
 
 
 class ExecutionFrictionTests(unittest.TestCase):
@@ -81,6 +85,74 @@ class ExecutionFrictionTests(unittest.TestCase):
         self.assertEqual(result["fill_fraction"], 0.5)
         self.assertTrue(result["partial_fill"])
 
+    def test_counter_sampler_is_random_access(self) -> None:
+        policy = {"partial_fill_prob": 0.3, "max_fill_fraction": 0.5, "reject_prob": 0.1, "fail_prob": 0.05}
+        bulk = FrictionSampler(9, policy, block_size=64)
+        status, fraction, partial = bulk.sample(100, 500)
+        # another block size, drawn one fill at a time in reverse order
+        single = FrictionSampler(9, policy, block_size=1000)
+        for k in reversed(range(100, 600)):
+            self.assertEqual(single.draw(k), (FILL_STATUSES[status[k - 100]], fraction[k - 100], bool(partial[k - 100])))
+        self.assertEqual(set(status.tolist()), {0, 1, 2})
+        self.assertTrue(partial.any())
+        other = FrictionSampler(10, policy).sample(100, 500)[0]
+        self.assertNotEqual(status.tolist(), other.tolist())
+
+        result = apply_friction({"qty": 10, "price": 100, "side": "BUY"}, {"price": 100}, policy, sampler=bulk, fill_index=100)
+        self.assertEqual(result["fill_status"], FILL_STATUSES[status[0]])
+        self.assertEqual(result["fill_fraction"], fraction[0])
+        self.assertEqual((result["rng_seed"], result["rng_index"]), (9, 100))
+        unseeded = FrictionSampler.for_run(None, policy, "baseline")
+        self.assertEqual(unseeded.seed, FrictionSampler.for_run(None, dict(policy), "baseline").seed)
+
+    def test_policy_object_matches_dict_policy(self) -> None:
+        raw = {"spread_bps": 1.0, "slippage_bps": 2.0, "gap_bps": 10.0, "gap_threshold_pct": 0.5, "fee_per_trade": 0.5,
+               "partial_fill_prob": 0.5, "max_fill_fraction": 1.5, "reject_prob": 2.0, "fail_prob": "n/a"}
+        policy = FrictionPolicy.from_mapping(raw)
+        self.assertEqual((policy.fill_fraction_cap, policy.reject_p, policy.fail_p), (1.0, 1.0, 0.0))
+        self.assertFalse(policy.partial_active)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            policy.spread_bps = 3.0  # type: ignore[misc]
+        for order, snapshot in (
+            ({"qty": 2, "price": 110, "side": "BUY"}, {"price": 110, "prev_price": 100}),
+            ({"qty": -3, "price": 99}, {"price": 99}),
+        ):
+            # unseeded fills hash the source mapping, so both forms draw the same outcome
+            self.assertEqual(apply_friction(order, snapshot, policy), apply_friction(order, snapshot, raw))
+        scaled = policy.replace(spread_bps=4.0)
+        self.assertEqual(scaled.buy_mult, 1.0 + (4.0 + 2.0 + 0.0) / 10_000.0)
+        self.assertEqual(scaled.to_dict()["spread_bps"], 4.0)
+
+    def test_load_reads_file_once_until_it_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "friction_policy.json"
+            path.write_text(json.dumps({"spread_bps": 7.0}), encoding="utf-8")
+            first = FrictionPolicy.load(path)
+            self.assertIs(FrictionPolicy.load(path), first)
+            self.assertEqual(first.spread_bps, 7.0)
+            self.assertEqual(first.fee_per_trade, 0.5)  # DEFAULT_POLICY fills the gaps
+            path.write_text(json.dumps({"spread_bps": 9.25}), encoding="utf-8")
+            self.assertEqual(FrictionPolicy.load(path).spread_bps, 9.25)
+
+    def test_apply_many_matches_single_fills(self) -> None:
+        policy = FrictionPolicy.from_mapping(
+            {"spread_bps": 1.0, "slippage_bps": 3.0, "gap_bps": 12.0, "gap_threshold_pct": 0.5, "fee_per_trade": 0.5,
+             "fee_per_share": 0.001, "partial_fill_prob": 0.3, "max_fill_fraction": 0.6, "reject_prob": 0.1, "fail_prob": 0.05}
+        )
+        orders, snapshots = [], []
+        for i in range(300):
+            price = 100.0 + (i % 17) * 0.37
+            orders.append({"qty": (i % 5) - 2 or 1, "price": price, "side": "SELL" if i % 3 == 0 else "BUY"})
+            snapshots.append({"price": price, "prev_price": price * (1.0 + ((i % 7) - 3) / 300.0)} if i % 2 else {"price": price})
+        sampler = FrictionSampler(21, policy, block_size=64)
+        expected = [apply_friction(o, s, policy, sampler=sampler, fill_index=40 + i) for i, (o, s) in enumerate(zip(orders, snapshots))]
+        self.assertEqual(policy.apply_many(orders, snapshots, sampler=sampler, start_index=40), expected)
+        seeds = list(range(300))
+        self.assertEqual(
+            policy.apply_many(orders, snapshots, rng_seeds=seeds),
+            [apply_friction(o, s, policy, rng_seed=seed) for o, s, seed in zip(orders, snapshots, seeds)],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,57 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from tools.file_watch import FileWatcher, StatPollWatcher, build_file_watcher
+
+
+def _append_later(path: Path, delay_s: float, text: str = "x\n") -> threading.Timer:
+    def _write() -> None:
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write(text)
+
+    timer = threading.Timer(delay_s, _write)
+    timer.start()
+    return timer
+
+
+class FileWatcherTests(unittest.TestCase):
+    def test_base_watcher_is_abstract(self) -> None:
+        with self.assertRaises(TypeError):
+            FileWatcher(Path("quotes.csv"))  # type: ignore[abstract]
+
+    def _check_wakes_on_append(self, mode: str) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "quotes.csv"
+            path.write_text("header\n", encoding="utf-8")
+            with build_file_watcher(path, mode=mode, debounce_s=0.02) as watcher:
+                self.assertFalse(watcher.wait(0.05))
+                timer = _append_later(path, 0.05)
+                start = time.monotonic()
+                self.assertTrue(watcher.wait(5.0))
+                self.assertLess(time.monotonic() - start, 2.0)
+                timer.join()
+                # events absorbed by the debounce do not cause a second wake-up
+                self.assertFalse(watcher.wait(0.1))
+
+    def test_stat_poll_wakes_on_append(self) -> None:
+        self._check_wakes_on_append("stat_poll")
+
+    def test_auto_wakes_on_append(self) -> None:
+        self._check_wakes_on_append("auto")
+
+    def test_stat_poll_sees_late_creation_and_backs_off(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "quotes.csv"
+            watcher = StatPollWatcher(path, debounce_s=0.0, min_interval_s=0.01, max_interval_s=0.08)
+            self.assertFalse(watcher.wait(0.3))
+            self.assertEqual(watcher._interval, 0.08)
+            path.write_text("header\n", encoding="utf-8")
+            self.assertTrue(watcher.wait(1.0))
+            self.assertEqual(watcher._interval, 0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
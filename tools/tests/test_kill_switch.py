@@ -0,0 +1,67 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from tools.kill_switch import KillSwitchMonitor, monitor_from_config
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class KillSwitchMonitorTests(unittest.TestCase):
+    def test_polls_at_bounded_cadence(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "KILL_SWITCH"
+            clock = FakeClock()
+            monitor = KillSwitchMonitor(path, interval_s=0.1, clock=clock)
+            self.assertFalse(monitor.engaged())
+            checks = monitor.checks
+            for _ in range(1000):
+                monitor.engaged()
+            self.assertEqual(monitor.checks, checks)
+            path.write_text("1", encoding="utf-8")
+            clock.now = 0.1
+            self.assertTrue(monitor.engaged())
+            path.unlink()
+            clock.now = 0.15
+            self.assertTrue(monitor.engaged())  # engaged is never dropped from cache early
+            clock.now = 0.2
+            self.assertFalse(monitor.engaged())
+
+    def test_unexpected_stat_error_fails_closed(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            monitor = KillSwitchMonitor(Path(tmp_dir) / ("x" * 400))  # ENAMETOOLONG
+            self.assertTrue(monitor.engaged())
+
+    def test_disabled_config_never_engages(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "KILL_SWITCH"
+            path.write_text("1", encoding="utf-8")
+            cfg = {"risk_guards": {"kill_switch_path": str(path), "kill_switch_enabled": False}}
+            self.assertFalse(monitor_from_config(cfg).engaged())
+            self.assertTrue(monitor_from_config(cfg, always_on=True).engaged())
+
+    def test_watch_mode_sees_switch_without_polling(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "KILL_SWITCH"
+            monitor = KillSwitchMonitor(path, watch="auto", heartbeat_s=5.0)
+            try:
+                self.assertTrue(monitor.kind.startswith("watch:"))
+                self.assertFalse(monitor.engaged())
+                path.write_text("1", encoding="utf-8")
+                deadline = time.monotonic() + 2.0
+                while not monitor.engaged() and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                self.assertTrue(monitor.engaged())
+            finally:
+                monitor.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
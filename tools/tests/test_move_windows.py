@@ -0,0 +1,82 @@
+import math
+import random
+import unittest
+from datetime import datetime, timezone
+
+from tools.alert_engine import AlertEngine
+from tools.move_windows import MoveWindowDetector
+
+DAY0 = 1_704_067_200.0  # 2024-01-01T00:00:00Z
+
+
+def _naive_move(history: list, window_s: float) -> float:
+    last_ts, last_px = history[-1]
+    refs = [px for ts, px in history if ts <= last_ts - window_s]
+    if not refs:
+        return math.nan
+    return (last_px - refs[-1]) / refs[-1] * 100.0
+
+
+class MoveWindowDetectorTests(unittest.TestCase):
+    def test_matches_naive_scan(self) -> None:
+        rng = random.Random(3)
+        symbols = ["AAPL", "MSFT", "SPY"]
+        # capacity large enough that no slot is merged, so results are exact
+        detector = MoveWindowDetector([60.0, 300.0], symbols=symbols, capacity=512)
+        history = {s: [] for s in symbols}
+        ts = DAY0 + 3600
+        for _ in range(300):
+            ts += rng.choice([2.0, 5.0, 20.0])
+            sym = rng.choice(symbols)
+            px = 100.0 + rng.uniform(-5, 5)
+            detector.push(sym, px, ts)
+            history[sym].append((ts, px))
+        window_moves, _, day_moves = detector.moves()
+        for s_idx, sym in enumerate(symbols):
+            for w_idx, window_s in enumerate((60.0, 300.0)):
+                expected = _naive_move(history[sym], window_s)
+                got = float(window_moves[w_idx, s_idx])
+                if math.isnan(expected):
+                    self.assertTrue(math.isnan(got))
+                else:
+                    self.assertAlmostEqual(got, expected, places=9)
+            first_px = history[sym][0][1]
+            self.assertAlmostEqual(float(day_moves[s_idx]), (history[sym][-1][1] - first_px) / first_px * 100.0)
+
+    def test_bounded_buffer_still_spans_longest_window(self) -> None:
+        detector = MoveWindowDetector([900.0], capacity=16)
+        for i in range(2000):
+            detector.push("AAPL", 100.0 + i * 0.01, DAY0 + i)
+        window_moves, ref_ts, _ = detector.moves()
+        self.assertFalse(math.isnan(float(window_moves[0, 0])))
+        lag = (DAY0 + 1999) - float(ref_ts[0, 0])
+        self.assertGreaterEqual(lag, 900.0)
+        self.assertLess(lag, 900.0 + 2 * detector.resolution_s)
+
+    def test_day_open_resets_on_new_utc_day(self) -> None:
+        detector = MoveWindowDetector([], symbols=["SPY"])
+        detector.push("SPY", 100.0, DAY0 + 100)
+        detector.push("SPY", 110.0, DAY0 + 86_500)
+        detector.push("SPY", 111.0, DAY0 + 86_700)
+        _, _, day_moves = detector.moves()
+        self.assertAlmostEqual(float(day_moves[0]), 1.0 / 110.0 * 100.0)
+
+    def test_engine_window_alerts_respect_cooldown(self) -> None:
+        engine = AlertEngine(
+            minute_move_pct=50.0,
+            flat_repeats=100,
+            stale_seconds=10_000,
+            cooldown_seconds=600,
+            window_moves={5: 2.0},
+            day_move_pct=3.0,
+        )
+        fired = []
+        for i, px in enumerate([100.0, 100.5, 101.0, 101.5, 102.0, 102.5, 103.0, 103.5, 104.0]):
+            ts = DAY0 + 3600 + i * 60
+            engine.on_quote("AAPL", px, datetime.fromtimestamp(ts, tz=timezone.utc), now_epoch=ts)
+            fired.extend((sig.key, round(sig.now_epoch - DAY0)) for sig in engine.evaluate_windows(now_epoch=ts))
+        self.assertEqual(fired, [("MOVE_5M|AAPL", 3600 + 300), ("DAY_MOVE|AAPL", 3600 + 360)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from tools.quote_source import QuoteSource, RandomWalkSource, ReplaySource, YFinanceSource, build_quote_source
+
+
+class ReplaySourceTests(unittest.TestCase):
+    def test_replays_fixture_in_order_then_exhausts(self) -> None:
+        source = ReplaySource(batch_size=25)
+        seen = []
+        while not source.exhausted:
+            seen.extend(source.fetch([], "").quotes)
+        self.assertEqual(len(seen), 60)
+        self.assertEqual(seen[0].ts_utc, "2024-01-02T14:30:00+00:00")
+        self.assertEqual(seen[0].price, 99.85)
+        self.assertEqual([q.ts_utc for q in seen], sorted(q.ts_utc for q in seen))
+
+    def test_loop_keeps_timestamps_increasing(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "quotes.csv"
+            path.write_text(
+                "ts_utc,symbol,price\n2024-01-02T14:30:00+00:00,X,1\n2024-01-02T14:31:00+00:00,X,2\n",
+                encoding="utf-8",
+            )
+            source = ReplaySource(path, batch_size=5, loop=True)
+            stamps = [q.ts_utc for q in source.fetch([], "").quotes]
+        self.assertEqual(len(stamps), 5)
+        self.assertEqual(stamps[2], "2024-01-02T14:32:00+00:00")
+        self.assertEqual(stamps, sorted(stamps))
+
+    def test_skips_blank_prices_and_filters_watchlist(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "quotes.csv"
+            path.write_text(
+                "ts_utc,symbol,price\n"
+                "2024-01-02T14:30:00+00:00,X,1\n"
+                "2024-01-02T14:30:00+00:00,Y,\n"
+                "2024-01-02T14:31:00+00:00,Y,3\n"
+                "2024-01-02T14:31:00+00:00,Z,4\n"
+                "2024-01-02T14:32:00+00:00,X\n",
+                encoding="utf-8",
+            )
+            quotes = ReplaySource(path, batch_size=10).fetch([], "").quotes
+            self.assertEqual([(q.symbol, q.price) for q in quotes], [("X", 1.0), ("Y", 3.0), ("Z", 4.0)])
+            watched = ReplaySource(path, batch_size=10).fetch(["x", "Y"], "").quotes
+            self.assertEqual([q.symbol for q in watched], ["X", "Y"])
+            looping = ReplaySource(path, batch_size=10, loop=True)
+            self.assertEqual(looping.fetch(["NONE"], "").quotes, [])
+            self.assertTrue(looping.exhausted)
+
+
+class RandomWalkSourceTests(unittest.TestCase):
+    def test_same_seed_same_stream(self) -> None:
+        a = RandomWalkSource(seed=3, ticks_per_fetch=10).fetch(["A", "B"], "").quotes
+        b = RandomWalkSource(seed=3, ticks_per_fetch=10).fetch(["A", "B"], "").quotes
+        self.assertEqual(len(a), 20)
+        self.assertEqual([(q.ts_utc, q.symbol, q.price) for q in a], [(q.ts_utc, q.symbol, q.price) for q in b])
+
+    def test_base_source_is_abstract(self) -> None:
+        with self.assertRaises(TypeError):
+            QuoteSource()
+
+    def test_build_from_config(self) -> None:
+        source = build_quote_source({"quotes": {"source": "random_walk", "seed": 1}})
+        self.assertEqual(source.name, "random_walk")
+        with self.assertRaises(ValueError):
+            build_quote_source({"quotes": {"source": "nope"}})
+
+
+class YFinanceSourceTests(unittest.TestCase):
+    def test_hung_fetch_does_not_starve_later_cycles(self) -> None:
+        release = threading.Event()
+        calls = []
+
+        def fetcher(sym: str) -> float:
+            calls.append(sym)
+            if sym == "HANG":
+                release.wait(10)
+            return 1.0
+
+        source = YFinanceSource(max_workers=1, timeout_s=0.2, fetcher=fetcher)
+        try:
+            first = source.fetch(["HANG", "A"], "t1")
+            self.assertEqual(first.timed_out, ["HANG", "A"])
+            self.assertEqual(source.stuck_symbols, ["HANG"])
+            # the only worker of the old pool is still blocked; the new pool serves the next cycle
+            second = source.fetch(["HANG", "A", "B"], "t2")
+            self.assertEqual([q.symbol for q in second.quotes], ["A", "B"])
+            self.assertEqual(second.timed_out, ["HANG"])
+            self.assertEqual(calls.count("HANG"), 1)
+            release.set()
+            for _ in range(50):
+                if not source.stuck_symbols:
+                    break
+                threading.Event().wait(0.02)
+            third = source.fetch(["HANG"], "t3")
+            self.assertEqual([q.symbol for q in third.quotes], ["HANG"])
+        finally:
+            release.set()
+            source.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
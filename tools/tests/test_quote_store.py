@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.quote_source import Quote
+from tools.quote_store import QuoteStore, QuoteStoreWriter, epoch_ns_to_iso, iso_to_epoch_ns
+
+
+class QuoteStoreTests(unittest.TestCase):
+    def test_roundtrip_per_day_segments(self) -> None:
+        quotes = [
+            Quote("2024-01-02T23:59:00+00:00", "AAPL", 100.5, "test"),
+            Quote("2024-01-03T00:00:00+00:00", "MSFT", 200.25, "test"),
+            Quote("2024-01-03T00:01:00+00:00", "aapl", 101.0, "test"),
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store_dir = Path(tmp_dir)
+            with QuoteStoreWriter(store_dir) as writer:
+                self.assertEqual(writer.append(quotes), 3)
+            store = QuoteStore(store_dir)
+            self.assertEqual(store.days(), ["2024-01-02", "2024-01-03"])
+            self.assertEqual(store.symbols, ["AAPL", "MSFT"])
+            day = store.load_day("2024-01-03")
+            self.assertEqual(day.symbol_id.tolist(), [1, 0])
+            self.assertEqual(day.price.tolist(), [200.25, 101.0])
+            cols = store.load()
+            self.assertEqual(len(cols), 3)
+            self.assertEqual(int(cols.symbol_mask("AAPL").sum()), 2)
+            rows = cols.to_rows()
+        self.assertEqual(rows[0], {"ts_utc": "2024-01-02T23:59:00+00:00", "symbol": "AAPL", "price": 100.5})
+
+    def test_uneven_columns_keep_common_prefix(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store_dir = Path(tmp_dir)
+            with QuoteStoreWriter(store_dir) as writer:
+                writer.append([Quote("2024-01-02T14:30:00+00:00", "X", 1.0, "t")])
+            with (store_dir / "2024-01-02.px.f64").open("ab") as fh:
+                fh.write(b"\x00" * 8)
+            self.assertEqual(len(QuoteStore(store_dir).load_day("2024-01-02")), 1)
+
+    def test_epoch_ns_conversion(self) -> None:
+        ns = iso_to_epoch_ns("2024-01-02T14:30:00+00:00")
+        self.assertEqual(ns, 1704205800 * 1_000_000_000)
+        self.assertEqual(epoch_ns_to_iso(ns), "2024-01-02T14:30:00+00:00")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.quote_source import Quote
+from tools.quote_writer import QuotesCsvWriter, current_quotes_path
+
+
+def _q(ts: str, price: float = 1.0) -> Quote:
+    return Quote(ts_utc=ts, symbol="AAPL", price=price, source="test")
+
+
+class QuotesCsvWriterTests(unittest.TestCase):
+    def test_header_written_once_across_reopen(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_dir = Path(tmp_dir)
+            with QuotesCsvWriter(data_dir) as writer:
+                writer.append([_q("2024-01-02T14:30:00+00:00")])
+            with QuotesCsvWriter(data_dir) as writer:
+                writer.append([_q("2024-01-02T14:31:00+00:00", 2.0)])
+            lines = (data_dir / "quotes.csv").read_text(encoding="utf-8").splitlines()
+        self.assertEqual(lines[0], "ts_utc,symbol,price,source")
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[2], "2024-01-02T14:31:00+00:00,AAPL,2.0,test")
+
+    def test_row_threshold_buffers_until_reached(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_dir = Path(tmp_dir)
+            writer = QuotesCsvWriter(data_dir, flush_rows=3)
+            writer.append([_q("2024-01-02T14:30:00+00:00"), _q("2024-01-02T14:31:00+00:00")])
+            self.assertEqual(writer.pending_rows, 2)
+            self.assertEqual(len((data_dir / "quotes.csv").read_text(encoding="utf-8").splitlines()), 1)
+            writer.append([_q("2024-01-02T14:32:00+00:00")])
+            self.assertEqual(writer.pending_rows, 0)
+            self.assertEqual(len((data_dir / "quotes.csv").read_text(encoding="utf-8").splitlines()), 4)
+            writer.close()
+
+    def test_row_and_byte_thresholds_survive_sleep(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_dir = Path(tmp_dir)
+            for kwargs in ({"flush_rows": 3}, {"flush_bytes": 1 << 16}, {"flush_rows": 3, "flush_ms": 60_000}):
+                with self.subTest(**kwargs):
+                    writer = QuotesCsvWriter(data_dir, **kwargs)
+                    writer.append([_q("2024-01-02T14:30:00+00:00")])
+                    writer.flush_before_sleep(5.0)
+                    self.assertEqual(writer.pending_rows, 1)
+                    writer.close()
+
+    def test_ms_deadline_flushes_before_sleep(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            writer = QuotesCsvWriter(Path(tmp_dir), flush_ms=1_000)
+            writer.append([_q("2024-01-02T14:30:00+00:00")])
+            writer.flush_before_sleep(0.1)
+            self.assertEqual(writer.pending_rows, 1)
+            writer.flush_before_sleep(5.0)
+            self.assertEqual(writer.pending_rows, 0)
+            writer.close()
+
+    def test_current_path_follows_newest_day(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_dir = Path(tmp_dir)
+            self.assertEqual(current_quotes_path(data_dir), data_dir / "quotes.csv")
+            self.assertRegex(current_quotes_path(data_dir, rotate_daily=True).name, r"^quotes_\d{4}-\d{2}-\d{2}\.csv$")
+            with QuotesCsvWriter(data_dir, rotate_daily=True) as writer:
+                writer.append([_q("2024-01-02T23:59:00+00:00"), _q("2024-01-03T00:00:00+00:00")])
+            (data_dir / "quotes_backup.csv").write_text("", encoding="utf-8")
+            self.assertEqual(current_quotes_path(data_dir, rotate_daily=True), data_dir / "quotes_2024-01-03.csv")
+
+    def test_daily_rotation(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_dir = Path(tmp_dir)
+            with QuotesCsvWriter(data_dir, rotate_daily=True) as writer:
+                writer.append([_q("2024-01-02T23:59:00+00:00"), _q("2024-01-03T00:00:00+00:00")])
+                self.assertEqual(writer.path.name, "quotes_2024-01-03.csv")
+            self.assertTrue((data_dir / "quotes_2024-01-02.csv").exists())
+            day2 = (data_dir / "quotes_2024-01-03.csv").read_text(encoding="utf-8").splitlines()
+        self.assertEqual(day2[0], "ts_utc,symbol,price,source")
+        self.assertEqual(len(day2), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
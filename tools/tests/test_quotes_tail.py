@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from alerts import read_full_snapshot
+from tools.quotes_tail import QuotesTailReader
+
+HEADER = "ts_utc,symbol,price,source\n"
+
+
+def _append(path: Path, text: str) -> None:
+    with path.open("a", encoding="utf-8", newline="") as fh:
+        fh.write(text)
+
+
+class QuotesTailReaderTests(unittest.TestCase):
+    def test_only_new_rows_are_parsed(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "quotes.csv"
+            _append(path, HEADER + "2024-01-02T14:30:00+00:00,aapl,100,t\n")
+            reader = QuotesTailReader(path)
+            first = reader.poll()
+            self.assertEqual(first.last_rows, 1)
+            self.assertEqual(first.pairs, [])
+
+            _append(path, "2024-01-02T14:31:00+00:00,AAPL,101,t\n2024-01-02T14:31:00+00:00,MSFT,5")
+            second = reader.poll()
+            self.assertEqual(second.last_rows, 2)
+            self.assertEqual([(p[0], p[1], p[2]) for p in second.pairs], [("AAPL", 100.0, 101.0)])
+            self.assertEqual([(t[0], t[1]) for t in second.ticks], [("AAPL", 101.0)])
+
+            # the partial MSFT line is completed later; nothing is re-emitted for AAPL
+            _append(path, "0,t\n")
+            third = reader.poll()
+            self.assertEqual(third.last_rows, 3)
+            self.assertEqual(third.last_prices, {"AAPL": 101.0, "MSFT": 50.0})
+            self.assertEqual(third.pairs, [])
+            self.assertEqual(reader.poll().pairs, [])
+
+    def test_truncation_restarts_from_scratch(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "quotes.csv"
+            _append(path, HEADER + "2024-01-02T14:30:00+00:00,AAPL,100,t\n2024-01-02T14:31:00+00:00,AAPL,101,t\n")
+            reader = QuotesTailReader(path)
+            self.assertEqual(reader.poll().last_rows, 2)
+            replacement = Path(tmp_dir) / "quotes.new"
+            replacement.write_text(HEADER + "2024-01-03T14:30:00+00:00,SPY,1,t\n", encoding="utf-8")
+            os.replace(replacement, path)
+            snap = reader.poll()
+            self.assertEqual(snap.last_rows, 1)
+            self.assertEqual(snap.last_prices, {"SPY": 1.0})
+
+    def test_follow_keeps_last_prices_across_days(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            day1 = Path(tmp_dir) / "quotes_2024-01-02.csv"
+            day2 = Path(tmp_dir) / "quotes_2024-01-03.csv"
+            _append(day1, HEADER + "2024-01-02T23:59:00+00:00,AAPL,100,t\n")
+            reader = QuotesTailReader(day1)
+            self.assertEqual(reader.poll().last_prices, {"AAPL": 100.0})
+            _append(day2, HEADER + "2024-01-03T00:00:00+00:00,AAPL,102,t\n")
+            reader.follow(day2)
+            snap = reader.poll()
+            self.assertEqual([(p[0], p[1], p[2]) for p in snap.pairs], [("AAPL", 100.0, 102.0)])
+            self.assertEqual(snap.last_rows, 2)
+
+    def test_matches_full_read(self) -> None:
+        rows = [
+            "2024-01-02T14:30:00+00:00,AAPL,100,t",
+            "2024-01-02T14:30:00+00:00,MSFT,200,t",
+            "2024-01-02T14:31:00+00:00,AAPL,101.5,t",
+            "bad-ts,AAPL,1,t",
+            "2024-01-02T14:32:00+00:00,MSFT,nan,t",
+            "2024-01-02T14:33:00+00:00,MSFT,198,t",
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "quotes.csv"
+            _append(path, HEADER + "\n".join(rows) + "\n")
+            full = read_full_snapshot(path, None)
+            tail = QuotesTailReader(path).poll()
+        self.assertEqual(tail.last_rows, full.last_rows)
+        self.assertEqual(tail.last_prices, full.last_prices)
+        self.assertEqual(
+            [(s, p, n, t.isoformat()) for s, p, n, t in tail.pairs],
+            [(s, p, n, t.isoformat()) for s, p, n, t in full.pairs],
+        )
+        self.assertEqual(
+            sorted((s, t.isoformat(), p) for s, p, t in tail.ticks),
+            sorted((s, t.isoformat(), p) for s, p, t in full.ticks),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import random
+import unittest
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from tools.sim_autopilot import RiskState, _risk_state_from_dict, _risk_state_to_dict
+
+
+def _legacy_register(times: list, ts: datetime) -> list:
+    times = times + [ts]
+    cutoff = ts - timedelta(minutes=1)
+    return [t for t in times if t >= cutoff]
+
+
+class RiskStateTests(unittest.TestCase):
+    def test_rolling_window_matches_list_filter(self) -> None:
+        rng = random.Random(4)
+        for jitter in (0, 30):
+            with self.subTest(jitter=jitter):
+                state = RiskState()
+                legacy: list = []
+                ts = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+                for _ in range(2_000):
+                    ts += timedelta(seconds=rng.choice([1, 2, 5, 20]))
+                    # jitter > 0 sends some intents backwards in time
+                    when = ts - timedelta(seconds=rng.randint(0, jitter)) if rng.random() < 0.1 else ts
+                    state.register_intent(when)
+                    legacy = _legacy_register(legacy, when)
+                    self.assertEqual(list(state.intent_times), legacy)
+
+    def test_rejects_keep_last_ten(self) -> None:
+        state = RiskState()
+        for i in range(25):
+            state.record_reject(f"r{i}")
+        self.assertEqual(list(state.rejects_recent), [f"r{i}" for i in range(15, 25)])
+        restored = _risk_state_from_dict(_risk_state_to_dict(state))
+        restored.record_reject("r25")
+        self.assertEqual(list(restored.rejects_recent), [f"r{i}" for i in range(16, 26)])
+
+    def test_binary_snapshot_round_trip(self) -> None:
+        est = timezone(timedelta(hours=-5))
+        state = RiskState(mode="SAFE", daily_loss=12.5, equity=9_987.5, peak_equity=10_020.0)
+        state.max_daily_loss = 50.0
+        state.max_drawdown = 0.05
+        state.postmortem_triggered = True
+        state.last_exec_ts = datetime(2024, 1, 2, 9, 30, 0, 123456, tzinfo=est)
+        for ts in (datetime(2024, 1, 2, 14, 29, 30, tzinfo=timezone.utc), datetime(2024, 1, 2, 14, 30, 1)):
+            state.intent_times.append(ts)
+        state.record_reject("rate limit 4/3 intents in 60s")
+        state.evidence_notes.append("orders_sim.jsonl#L12 — 回撤")
+
+        restored = RiskState.from_bytes(state.to_bytes())
+        self.assertEqual(restored, state)
+        self.assertEqual(_risk_state_to_dict(restored), _risk_state_to_dict(state))
+        self.assertIsNone(list(restored.intent_times)[1].tzinfo)
+        self.assertIsInstance(restored.intent_times, deque)
+        self.assertEqual(restored.rejects_recent.maxlen, 10)
+
+        empty = RiskState.from_bytes(RiskState().to_bytes())
+        self.assertEqual(empty, RiskState())
+        with self.assertRaises(ValueError):
+            RiskState.from_bytes(b"{}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.sim_artifacts import SimArtifactWriter
+
+
+class SimArtifactWriterTests(unittest.TestCase):
+    def test_line_numbers_continue_existing_file_while_buffered(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            orders = Path(tmp_dir) / "orders_sim.jsonl"
+            orders.write_text('{"old": 1}\n{"old": 2}\n', encoding="utf-8")
+            with SimArtifactWriter(flush_lines=100) as artifacts:
+                numbers = [artifacts.append_json(orders, {"i": i}) for i in range(3)]
+                # nothing reached the disk yet, numbering still follows the final file
+                self.assertEqual(len(orders.read_text(encoding="utf-8").splitlines()), 2)
+            self.assertEqual(numbers, [3, 4, 5])
+            lines = orders.read_text(encoding="utf-8").splitlines()
+            self.assertEqual([json.loads(line) for line in lines[2:]], [{"i": 0}, {"i": 1}, {"i": 2}])
+
+    def test_snapshots_written_only_at_checkpoints_and_close(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "portfolio_sim.json"
+            artifacts = SimArtifactWriter(checkpoint_every=3)
+            for step in range(1, 5):
+                artifacts.snapshot(path, {"step": step})
+                artifacts.tick()
+                if step < 3:
+                    self.assertFalse(path.exists())
+            self.assertEqual(json.loads(path.read_text(encoding="utf-8")), {"step": 3})
+            artifacts.close()
+            self.assertEqual(json.loads(path.read_text(encoding="utf-8")), {"step": 4})
+            with self.assertRaises(RuntimeError):
+                artifacts.append_line(path, "late")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import csv
+import json
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from tools import policy_registry
+from tools.sim_autopilot import SimSession, run_step
+from tools.sim_batch import QuoteTape, run_batch
+from tools.sim_replay import parse_args, run_replay
+
+ROOT = Path(__file__).resolve().parents[2]
+FIXTURE = ROOT / "fixtures" / "quotes_sample.csv"
+FRICTION = {
+    "slippage_bps": 2.0,
+    "spread_bps": 1.0,
+    "fee_per_trade": 0.5,
+    "fee_per_share": 0.001,
+    "latency_ms": 0,
+    "partial_fill_prob": 0.2,
+    "max_fill_fraction": 0.5,
+    "reject_prob": 0.05,
+    "fail_prob": 0.02,
+}
+INITIAL = {
+    "cash_usd": 10_000.0,
+    "risk_state": {"mode": "NORMAL", "equity": 10_000.0, "start_equity": 10_000.0, "peak_equity": 10_000.0},
+}
+
+
+def _fixture_rows() -> list:
+    with FIXTURE.open("r", newline="", encoding="utf-8") as fh:
+        return [{**row, "price": float(row["price"])} for row in csv.DictReader(fh)]
+
+
+def _synthetic_rows(n: int = 600, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    prices = {"AAPL": 100.0, "MSFT": 250.0, "SPY": 470.0}
+    ts = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+    rows = []
+    for i in range(n):
+        ts += timedelta(seconds=rng.choice([0, 5, 20, 45]))
+        sym = rng.choice(sorted(prices))
+        prices[sym] *= 1.0 + rng.uniform(-0.02, 0.02)
+        row = {"ts_utc": ts.isoformat(), "symbol": sym, "price": round(prices[sym], 4)}
+        if i % 97 == 0:
+            row["data_status"] = "DATA_STALE"
+        rows.append(row)
+    return rows
+
+
+class SimBatchTests(unittest.TestCase):
+    def _check(self, rows: list, cfg: dict, *, use_run_step: bool, initial: dict = INITIAL) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            logs_dir = Path(tmp_dir)
+            step_cfg = {**cfg, "logs_dir": logs_dir}
+            emitted, equity, cash, peak = [], [], [], []
+            if use_run_step:
+                state = dict(initial)
+                for row in rows:
+                    state, events = run_step(row, state, step_cfg)
+                    emitted.append(events)
+                    equity.append(state["risk_state"]["equity"])
+                    peak.append(state["risk_state"]["peak_equity"])
+                    cash.append(state["cash_usd"])
+            else:
+                session = SimSession(step_cfg, dict(initial))
+                for row in rows:
+                    emitted.append(session.step(row))
+                    equity.append(session.equity)
+                    peak.append(session.risk_state.peak_equity)
+                    cash.append(session.cash)
+                state = session.state
+            orders_path = logs_dir / "orders_sim.jsonl"
+            orders = [json.loads(line) for line in orders_path.read_text(encoding="utf-8").splitlines()] if orders_path.exists() else []
+            logged = [json.loads(line) for line in (logs_dir / "events_sim.jsonl").read_text(encoding="utf-8").splitlines()]
+            for event in logged:
+                # wall clock, and added at write time
+                del event["ts_utc"], event["policy_version"]
+
+        tape = QuoteTape.from_rows(rows)
+        result = run_batch(tape, dict(initial), cfg)
+        self.assertEqual(result.emitted(tape), emitted)
+        self.assertEqual(result.orders, orders)
+        self.assertEqual([event for events in result.logged_events(tape) for event in events], logged)
+        self.assertEqual(result.state, state)
+        # bit-for-bit, not approximately
+        self.assertTrue(np.array_equal(result.equity, np.array(equity)))
+        self.assertTrue(np.array_equal(result.peak_equity, np.array(peak)))
+        self.assertTrue(np.array_equal(result.cash, np.array(cash)))
+
+    def test_matches_run_step_on_fixture(self) -> None:
+        cfg = {"momentum_threshold_pct": 0.2, "verify_no_lookahead": True, "friction_policy": FRICTION, "friction_seed": 3}
+        self._check(_fixture_rows(), cfg, use_run_step=True)
+
+    def test_matches_run_step_with_hashed_friction_seed(self) -> None:
+        cfg = {"momentum_threshold_pct": 0.5, "friction_policy": FRICTION, "risk_overrides": {"min_interval_seconds": 0}}
+        self._check(_synthetic_rows(200, seed=2), cfg, use_run_step=True)
+
+    def test_matches_run_step_with_counter_friction_rng(self) -> None:
+        for seed in (4, None):
+            with self.subTest(seed=seed):
+                cfg = {
+                    "momentum_threshold_pct": 0.5,
+                    "friction_policy": FRICTION,
+                    "friction_seed": seed,
+                    "friction_rng": "counter",
+                    "risk_overrides": {"min_interval_seconds": 0},
+                }
+                self._check(_synthetic_rows(300, seed=5), cfg, use_run_step=True)
+
+    def test_matches_session_through_risk_gates_and_postmortem(self) -> None:
+        for overrides in (
+            {"min_interval_seconds": 0, "max_daily_loss": 5.0},
+            {"min_interval_seconds": 30, "max_orders_per_minute": 2, "max_notional_per_order": 400.0},
+        ):
+            with self.subTest(overrides=overrides):
+                cfg = {
+                    "momentum_threshold_pct": 0.5,
+                    "verify_no_lookahead": True,
+                    "policy_version": "t",
+                    "friction_policy": FRICTION,
+                    "friction_seed": 1,
+                    "risk_overrides": overrides,
+                }
+                self._check(_synthetic_rows(), cfg, use_run_step=False)
+
+    def test_matches_session_in_safe_mode(self) -> None:
+        # intents in SAFE mode are logged as intent-only SIM_INTENT events before the reject
+        initial = {**INITIAL, "risk_state": {**INITIAL["risk_state"], "mode": "SAFE"}}
+        cfg = {"momentum_threshold_pct": 0.5, "friction_policy": FRICTION, "friction_seed": 2, "risk_overrides": {"min_interval_seconds": 0}}
+        self._check(_synthetic_rows(200, seed=6), cfg, use_run_step=False, initial=initial)
+
+    def test_symbol_arrays_and_lookahead(self) -> None:
+        tape = QuoteTape.from_symbol_arrays({"b": ([1.0, 3.0], [10.0, 11.0]), "a": ([1.0, 2.0], [5.0, 6.0])})
+        self.assertEqual(tape.symbols, ["B", "A"])
+        self.assertEqual([tape.symbols[c] for c in tape.codes], ["B", "A", "A", "B"])
+        rows = [
+            {"ts_utc": "2024-01-02T14:31:00+00:00", "symbol": "AAPL", "price": 100.0},
+            {"ts_utc": "2024-01-02T14:30:00+00:00", "symbol": "AAPL", "price": 101.0},
+        ]
+        with self.assertRaises(AssertionError):
+            run_batch(QuoteTape.from_rows(rows), None, {"verify_no_lookahead": True, "friction_policy": FRICTION})
+
+    def test_replay_engines_write_identical_artifacts(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # run_replay resolves the current policy; keep the registry it may seed out of the repo
+            registry = Path(tmp_dir) / "policy_registry.json"
+            with mock.patch.object(policy_registry, "REGISTRY_PATH", registry), mock.patch.object(
+                policy_registry, "SEED_PATH", Path(tmp_dir) / "missing_seed.json"
+            ):
+                outputs = {}
+                for engine in ("session", "batch"):
+                    logs_dir = Path(tmp_dir) / engine
+                    args = parse_args(
+                        ["--input", str(FIXTURE), "--logs-dir", str(logs_dir), "--threshold", "0.2", "--engine", engine]
+                    )
+                    self.assertEqual(run_replay(args), 0)
+                    outputs[engine] = {
+                        name: (logs_dir / name).read_text(encoding="utf-8")
+                        for name in ("equity_curve.jsonl", "orders_sim.jsonl", "portfolio_sim.json")
+                    }
+                    events = [json.loads(line) for line in (logs_dir / "events_sim.jsonl").read_text(encoding="utf-8").splitlines()]
+                    outputs[engine]["events_sim.jsonl"] = [{k: v for k, v in e.items() if k != "ts_utc"} for e in events]
+            self.assertTrue(registry.exists())
+            self.assertEqual(outputs["batch"], outputs["session"])
+
+
+if __name__ == "__main__":
+    unittest.main()
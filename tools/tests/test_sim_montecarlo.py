@@ -0,0 +1,84 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.execution_friction import FrictionPolicy
+from tools.promotion_gate_v2 import GateConfig
+from tools.quote_source import Quote
+from tools.quote_store import QuoteStoreWriter, load_quote_rows
+from tools.sim_batch import QuoteTape
+from tools.sim_montecarlo import run_monte_carlo, summarize
+from tools.stress_harness import _load_quotes, _monte_carlo_scenario, _scenario_config, _simulate_scenario
+from tools.tests.test_sim_batch import FRICTION, _synthetic_rows
+
+
+class SimMonteCarloTests(unittest.TestCase):
+    def test_seed_runs_match_single_seed_stress_scenario(self) -> None:
+        rows = _synthetic_rows(300, seed=3)
+        policy = FrictionPolicy.from_mapping(FRICTION)
+        report = run_monte_carlo(rows, _scenario_config("t", {}, policy), [5, 6, 7], workers=1)
+        self.assertEqual(report["seeds"], [5, 6, 7])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for run in report["runs"]:
+                expected = _simulate_scenario(rows, "t", {}, policy, Path(tmp_dir), f"s{run['seed']}", run["seed"], 0)
+                self.assertEqual({k: v for k, v in run.items() if k != "seed"}, expected)
+        self.assertGreater(len({run["final_equity_usd"] for run in report["runs"]}), 1)
+
+    def test_process_pool_matches_in_process_runs(self) -> None:
+        tape = QuoteTape.from_rows(_synthetic_rows(400, seed=8))
+        cfg = {"momentum_threshold_pct": 0.5, "friction_policy": FRICTION, "risk_overrides": {"min_interval_seconds": 0}}
+        seeds = list(range(100, 112))
+        pooled = run_monte_carlo(tape, cfg, seeds, workers=3)
+        serial = run_monte_carlo(tape, cfg, seeds, workers=1)
+        self.assertEqual(pooled, serial)
+        dist = pooled["distribution"]["final_equity_usd"]
+        self.assertEqual(dist["n"], 12)
+        self.assertLessEqual(dist["ci_low"], dist["mean"])
+        self.assertLessEqual(dist["mean"], dist["ci_high"])
+
+    def test_store_tape_matches_store_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store_dir = Path(tmp_dir) / "store"
+            store_dir.mkdir()
+            # store ids in a different order than the rows' first appearance
+            (store_dir / "symbols.json").write_text('{"symbols": ["QQQ", "SPY", "MSFT", "AAPL"]}', encoding="utf-8")
+            with QuoteStoreWriter(store_dir) as writer:
+                writer.append([Quote(r["ts_utc"], r["symbol"], r["price"], "t") for r in _synthetic_rows(250, seed=5)])
+            rows = load_quote_rows(store_dir)[:200]
+            tape = _load_quotes(store_dir, limit=200)
+            self.assertIsInstance(tape, QuoteTape)
+            reference = QuoteTape.from_rows(rows)
+            self.assertEqual(tape.symbols, reference.symbols)
+            self.assertEqual(tape.codes.tolist(), reference.codes.tolist())
+            self.assertEqual(tape.ts.tolist(), reference.ts.tolist())
+            self.assertEqual([tape.snapshot(i) for i in range(len(tape))], rows)
+
+            policy = FrictionPolicy.from_mapping(FRICTION)
+            run_dir = Path(tmp_dir) / "runs"
+            self.assertEqual(
+                _simulate_scenario(tape, "t", {}, policy, run_dir, "tape", 9, 150),
+                _simulate_scenario(rows, "t", {}, policy, run_dir, "rows", 9, 150),
+            )
+            self.assertEqual(
+                _monte_carlo_scenario(tape, "t", {}, policy, 1, 3, 150, 1, GateConfig()),
+                _monte_carlo_scenario(rows, "t", {}, policy, 1, 3, 150, 1, GateConfig()),
+            )
+
+    def test_summarize_and_tail_gate(self) -> None:
+        stats = summarize([1.0, 2.0, 3.0, 4.0])
+        self.assertEqual((stats["mean"], stats["min"], stats["max"], stats["p50"]), (2.5, 1.0, 4.0, 2.5))
+        self.assertAlmostEqual(stats["ci_high"] - stats["mean"], 1.959964 * stats["std"] / 2.0, places=3)
+        self.assertEqual(summarize([]), {"n": 0})
+
+        rows = _synthetic_rows(200, seed=4)
+        policy = FrictionPolicy.from_mapping(FRICTION)
+        strict = GateConfig(max_drawdown_pct=0.0, max_turnover=0)
+        result = _monte_carlo_scenario(rows, "t", {}, policy, 1, 4, 0, 1, strict)
+        self.assertFalse(result["pass"])
+        self.assertTrue(all(f.startswith("mc_p95:") for f in result["failures"]))
+        broken = _monte_carlo_scenario([{**rows[0], "ts_utc": "bad"}], "t", {}, policy, 1, 2, 0, 1, GateConfig())
+        self.assertEqual(broken["failures"], ["mc_unavailable"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import math
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from tools.sim_autopilot import SimSession
+from tools.sim_portfolio import PortfolioBook, merge_streams, run_portfolio
+
+FRICTION = {
+    "slippage_bps": 2.0,
+    "spread_bps": 1.0,
+    "fee_per_trade": 0.5,
+    "latency_ms": 0,
+    "partial_fill_prob": 0.2,
+    "max_fill_fraction": 1.0,
+    "reject_prob": 0.05,
+    "fail_prob": 0.02,
+}
+CONFIG = {
+    "momentum_threshold_pct": 0.4,
+    "policy_version": "t",
+    "friction_policy": FRICTION,
+    "friction_seed": 7,
+    "risk_overrides": {"min_interval_seconds": 0, "max_orders_per_minute": 1000, "max_daily_loss": 1e9, "max_drawdown": 1.0},
+}
+
+
+def _streams(n_symbols: int = 40, n_rows: int = 60, seed: int = 2) -> dict:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+    streams = {}
+    for k in range(n_symbols):
+        ts, price, rows = start, 50.0 + k, []
+        for _ in range(n_rows):
+            ts += timedelta(seconds=rng.choice([5, 15, 30]))
+            price *= 1.0 + rng.uniform(-0.015, 0.015)
+            rows.append({"ts_utc": ts.isoformat(), "price": round(price, 4)})
+        streams[f"S{k:03d}"] = rows
+    return streams
+
+
+class PortfolioBookTests(unittest.TestCase):
+    def test_incremental_value_tracks_full_sum(self) -> None:
+        rng = random.Random(5)
+        book = PortfolioBook(resync_every=10_000)
+        positions, prices = {}, {}
+        for _ in range(20_000):
+            sym = f"S{rng.randrange(200)}"
+            if rng.random() < 0.1:
+                qty = float(rng.randint(0, 5))
+                positions[sym] = qty
+                prices.setdefault(sym, 0.0)
+                value = book.set_position(sym, qty)
+            else:
+                prices[sym] = rng.uniform(10.0, 500.0)
+                value = book.mark(sym, prices[sym])
+            expected = sum(positions.get(s, 0.0) * prices.get(s, 0.0) for s in positions)
+            self.assertAlmostEqual(value, expected, delta=1e-7 * max(1.0, abs(expected)))
+        self.assertEqual(book.resync(), math.fsum(positions[s] * prices[s] for s in positions))
+
+    def test_positions_without_price_use_cost_basis(self) -> None:
+        book = PortfolioBook({"AAPL": 2.0, "MSFT": 1.0}, {"AAPL": 100.0}, fallback_prices={"MSFT": 250.0})
+        self.assertEqual(book.market_value, 450.0)
+        self.assertEqual(book.mark("MSFT", 260.0), 460.0)
+
+
+class PortfolioSessionTests(unittest.TestCase):
+    def test_incremental_session_matches_full_mark_to_market(self) -> None:
+        rows = list(merge_streams(_streams()))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            full = SimSession({**CONFIG, "logs_dir": Path(tmp_dir) / "full"})
+            full_equity = []
+            for row in rows:
+                full.step(row)
+                full_equity.append(full.equity)
+
+            fast = SimSession({**CONFIG, "logs_dir": Path(tmp_dir) / "fast", "mark_to_market": "incremental"})
+            for row, expected in zip(rows, full_equity):
+                fast.step(row)
+                self.assertAlmostEqual(fast.equity, expected, places=6)
+            self.assertGreater(len(full.positions), 3)
+            self.assertEqual(fast.positions, full.positions)
+            self.assertEqual(fast.cash, full.cash)
+            orders = [
+                [json.loads(line)["sim_fill"] for line in (Path(tmp_dir) / name / "orders_sim.jsonl").read_text().splitlines()]
+                for name in ("full", "fast")
+            ]
+            self.assertEqual(orders[0], orders[1])
+
+    def test_merge_streams_interleaves_by_time(self) -> None:
+        streams = _streams(n_symbols=5, n_rows=30)
+        merged = list(merge_streams(streams))
+        self.assertEqual(len(merged), 150)
+        stamps = [row["ts_utc"] for row in merged]
+        self.assertEqual(stamps, sorted(stamps))
+        self.assertEqual({row["symbol"] for row in merged}, set(streams))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            session = run_portfolio(streams, {**CONFIG, "logs_dir": tmp_dir})
+            self.assertEqual(session.steps, 150)
+            self.assertIsNotNone(session.book)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import json
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from tools.sim_artifacts import SimArtifactWriter
+from tools.sim_autopilot import SimAutopilot, SimSession, run_step
+
+# run_step output for _rows(120) captured before SimSession existed (baseline per-row run_step)
+GOLDEN = Path(__file__).resolve().parents[2] / "fixtures" / "sim_session" / "run_step_golden.json"
+FRICTION = {
+    "slippage_bps": 2.0,
+    "spread_bps": 1.0,
+    "fee_per_trade": 0.5,
+    "latency_ms": 0,
+    "partial_fill_prob": 0.2,
+    "max_fill_fraction": 1.0,
+    "reject_prob": 0.05,
+    "fail_prob": 0.02,
+}
+
+
+def _rows(n: int = 400, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    prices = {"AAPL": 100.0, "MSFT": 250.0}
+    ts = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+    rows = []
+    for _ in range(n):
+        ts += timedelta(seconds=rng.choice([5, 20, 45]))
+        sym = rng.choice(sorted(prices))
+        prices[sym] *= 1.0 + rng.uniform(-0.02, 0.02)
+        rows.append({"ts_utc": ts.isoformat(), "symbol": sym, "price": round(prices[sym], 4)})
+    return rows
+
+
+def _strip_wall_clock(path: Path) -> list:
+    if not path.exists():
+        return []
+    out = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        payload = json.loads(line)
+        payload.pop("ts_utc", None)
+        out.append(payload)
+    return out
+
+
+class SimSessionTests(unittest.TestCase):
+    def test_session_matches_golden_run_step(self) -> None:
+        # low friction exercises fills + risk rejects (POSTMORTEM, SAFE mode), high friction the execution-reject path
+        golden = json.loads(GOLDEN.read_text(encoding="utf-8"))
+        for reject_prob in (0.05, 0.3):
+            with self.subTest(reject_prob=reject_prob):
+                self._check_golden({**FRICTION, "reject_prob": reject_prob}, golden[str(reject_prob)])
+
+    def _check_golden(self, friction: dict, expected: dict) -> None:
+        rows = _rows(120)
+        initial = {
+            "cash_usd": 10_000.0,
+            "risk_state": {"mode": "NORMAL", "equity": 10_000.0, "start_equity": 10_000.0, "peak_equity": 10_000.0},
+        }
+        base_cfg = {
+            "momentum_threshold_pct": 0.5,
+            "verify_no_lookahead": True,
+            "policy_version": "t",
+            "friction_policy": friction,
+            "friction_seed": 5,
+            "risk_overrides": {"min_interval_seconds": 0, "max_daily_loss": 5.0},
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            chained_dir = Path(tmp_dir) / "chained"
+            state = dict(initial)
+            chained_emitted = []
+            for row in rows:
+                state, emitted = run_step(row, state, {**base_cfg, "logs_dir": chained_dir})
+                chained_emitted.append(emitted)
+
+            session_dir = Path(tmp_dir) / "session"
+            session = SimSession({**base_cfg, "logs_dir": session_dir}, dict(initial))
+            session_emitted = [session.step(row) for row in rows]
+            self.assertEqual(session.steps, len(rows))
+
+            for logs_dir, emitted, final_state in (
+                (chained_dir, chained_emitted, state),
+                (session_dir, session_emitted, session.state),
+            ):
+                self.assertEqual(emitted, expected["emitted"])
+                self.assertEqual(final_state, expected["state"])
+                for name in ("events_sim.jsonl", "orders_sim.jsonl"):
+                    self.assertEqual(_strip_wall_clock(logs_dir / name), expected[name], name)
+
+    def test_lookahead_guard_survives_across_steps(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            session = SimSession({"logs_dir": tmp_dir, "verify_no_lookahead": True, "friction_policy": FRICTION})
+            session.step({"ts_utc": "2024-01-02T14:31:00+00:00", "symbol": "AAPL", "price": 100.0})
+            with self.assertRaises(AssertionError):
+                session.step({"ts_utc": "2024-01-02T14:30:00+00:00", "symbol": "AAPL", "price": 100.0})
+
+    def test_order_line_numbers_track_file_without_rescanning(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            logs_dir = Path(tmp_dir)
+            now = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+            intent = {"symbol": "AAPL", "side": "buy", "qty": 1, "price": 100.0}
+            first = SimAutopilot(logs_dir=logs_dir)
+            numbers = [first._write_order(intent, now) for _ in range(3)]
+            # an outside writer (or a second autopilot) appends; numbering must follow the file
+            with (logs_dir / "orders_sim.jsonl").open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps({"external": True}) + "\n")
+            second = SimAutopilot(logs_dir=logs_dir)
+            numbers += [second._write_order(intent, now), first._write_order(intent, now)]
+            self.assertEqual(numbers, [1, 2, 3, 5, 6])
+            lines = (logs_dir / "orders_sim.jsonl").read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 6)
+
+    def test_buffered_artifacts_match_direct_writes(self) -> None:
+        rows = _rows(300, seed=3)
+        base_cfg = {
+            "momentum_threshold_pct": 0.5,
+            "policy_version": "t",
+            "friction_policy": FRICTION,
+            "friction_seed": 9,
+            "risk_overrides": {"min_interval_seconds": 0, "max_daily_loss": 5.0},
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            direct_dir = Path(tmp_dir) / "direct"
+            direct = SimSession({**base_cfg, "logs_dir": direct_dir})
+            direct_emitted = [direct.step(row) for row in rows]
+
+            buffered_dir = Path(tmp_dir) / "buffered"
+            with SimArtifactWriter(checkpoint_every=64, flush_lines=50) as artifacts:
+                buffered = SimSession({**base_cfg, "logs_dir": buffered_dir, "artifacts": artifacts})
+                buffered_emitted = []
+                for row in rows:
+                    buffered_emitted.append(buffered.step(row))
+                    artifacts.tick()
+
+            self.assertEqual(buffered_emitted, direct_emitted)
+            for name in ("events_sim.jsonl", "orders_sim.jsonl"):
+                self.assertEqual(_strip_wall_clock(buffered_dir / name), _strip_wall_clock(direct_dir / name), name)
+            orders = (buffered_dir / "orders_sim.jsonl").read_text(encoding="utf-8").splitlines()
+            postmortems = [e for e in _strip_wall_clock(buffered_dir / "events_sim.jsonl") if e["event_type"] == "POSTMORTEM"]
+            for event in postmortems:
+                line_no = int(event["evidence"].split("#L")[1].split()[0])
+                self.assertLessEqual(line_no, len(orders))
+            risk = [json.loads((d / "risk_state.json").read_text(encoding="utf-8")) for d in (direct_dir, buffered_dir)]
+            for payload in risk:
+                payload.pop("ts_utc")
+            self.assertEqual(risk[0], risk[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
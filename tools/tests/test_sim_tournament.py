@@ -0,0 +1,247 @@
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from tools import sim_tournament
+from tools.quote_source import Quote
+from tools.quote_store import QuoteStore, QuoteStoreWriter
+from tools.sim_tournament import (
+    BASELINE_CANDIDATES,
+    START_EQUITY,
+    WindowIndex,
+    _signal_kernel,
+    _simulate_candidate,
+    _simulate_path,
+    _strategy_signal,
+    _within_window,
+    run_strategy_tournament,
+    run_tournament_jobs,
+)
+from tools.strategy_pool import _expand_families
+
+
+def _walk(n: int, seed: int) -> list:
+    rng = random.Random(seed)
+    price, prices = 100.0, []
+    for _ in range(n):
+        price *= 1.0 + rng.uniform(-0.01, 0.01)
+        prices.append(round(price, 2))
+    return prices
+
+
+def _near_ties(n: int, seed: int) -> list:
+    # flat stretches and repeated non-representable values are where running sums disagree with sliced sums
+    rng = random.Random(seed)
+    prices = []
+    while len(prices) < n:
+        prices.extend([rng.choice([0.1, 0.3, 100.0, 100.01, 7.7])] * rng.randint(1, 30))
+    return prices[:n]
+
+
+def _legacy_simulate(prices: list, candidate: dict, max_steps: int) -> dict:
+    # _simulate_candidate as it was, re-deciding from the growing history list every step
+    real = _signal_kernel
+    try:
+        sim_tournament._signal_kernel = lambda c: _ListReplay(c)
+        return _simulate_candidate(prices, candidate, max_steps)
+    finally:
+        sim_tournament._signal_kernel = real
+
+
+class _ListReplay:
+    def __init__(self, candidate: dict) -> None:
+        self.candidate = candidate
+        self.history: list = []
+
+    def update(self, price: float) -> int:
+        self.history.append(price)
+        return _strategy_signal(self.history, self.candidate)
+
+
+CANDIDATES = [
+    {"family": "momentum", "params": {"lookback": 3, "threshold_pct": 0.1}},
+    {"family": "ma_crossover", "params": {"fast": 3, "slow": 7}},
+    {"family": "ma_crossover", "params": {"fast": 9, "slow": 4}},
+    {"family": "mean_reversion", "params": {"window": 5, "zscore": 0.5}},
+    {"family": "mean_reversion", "params": {"window": 12, "zscore": 1.1547005383792517}},
+    {"family": "mean_reversion", "params": {"window": 1, "zscore": 0.0}},
+    {"family": "breakout", "params": {"window": 1}},
+    {"family": "breakout", "params": {"window": 6}},
+    {"family": "momentum", "params": {"lookback": -1, "threshold_pct": 0.0}},
+    {"candidate_id": "baseline_buy_hold", "family": "baseline", "params": {}},
+]
+
+
+class SignalKernelTests(unittest.TestCase):
+    def test_kernels_match_list_signals(self) -> None:
+        series = [_walk(600, 1), _walk(600, 2), _near_ties(800, 3), _near_ties(800, 4), [0.0] * 20 + _walk(50, 5)]
+        for candidate in CANDIDATES:
+            for prices in series:
+                with self.subTest(candidate=candidate["params"], family=candidate["family"]):
+                    kernel = _signal_kernel(candidate)
+                    history: list = []
+                    for price in prices:
+                        history.append(price)
+                        self.assertEqual(kernel.update(price), _strategy_signal(history, candidate))
+
+    def test_pool_metrics_match_history_replay(self) -> None:
+        prices = _walk(400, 9) + _near_ties(200, 9)
+        candidates = list(BASELINE_CANDIDATES) + [c.as_dict() for c in _expand_families()]
+        for candidate in candidates:
+            with self.subTest(candidate=candidate["candidate_id"]):
+                self.assertEqual(
+                    _simulate_candidate(prices, candidate, 10_000), _legacy_simulate(prices, candidate, 10_000)
+                )
+
+
+class PerSymbolTournamentTests(unittest.TestCase):
+    def test_symbols_trade_their_own_series(self) -> None:
+        streams = {"AAA": _walk(120, 11), "BBB": [p * 3 for p in _walk(90, 12)], "CCC": _near_ties(60, 13)}
+        quotes = [
+            {"symbol": symbol, "price": prices[k]}
+            for k in range(120)
+            for symbol, prices in streams.items()
+            if k < len(prices)
+        ]
+        pool = [c.as_dict() for c in _expand_families()][:12]
+        report = run_strategy_tournament(quotes, pool, 100, seed=1)
+        self.assertEqual(report["symbols"], ["AAA", "BBB", "CCC"])
+        capital = START_EQUITY / 3
+        for entry in report["entries"]:
+            candidate = next(c for c in BASELINE_CANDIDATES + pool if c["candidate_id"] == entry["candidate_id"])
+            step_pnl = {}
+            for symbol, prices in streams.items():
+                sleeve, step_pnl[symbol] = _simulate_path(prices, candidate, 100, capital)
+                self.assertEqual(entry["per_symbol"][symbol], sleeve)
+            # replay the book quote by quote: each row books its symbol's step
+            equity, peak, seen = START_EQUITY, START_EQUITY, dict.fromkeys(streams, 0)
+            for row in quotes:
+                seen[row["symbol"]] += 1
+                if 1 < seen[row["symbol"]] <= 100:
+                    equity += step_pnl[row["symbol"]][seen[row["symbol"]] - 2]
+                    peak = max(peak, equity)
+            sleeves = entry["per_symbol"].values()
+            self.assertEqual(entry["metrics"]["turnover"], sum(m["turnover"] for m in sleeves))
+            self.assertEqual(entry["metrics"]["final_equity_usd"], round(equity, 2))
+            self.assertAlmostEqual(entry["metrics"]["pnl_proxy"], sum(m["pnl_proxy"] for m in sleeves), delta=0.02)
+            self.assertEqual(entry["metrics"]["max_drawdown_pct"], round((peak - equity) / peak * 100.0, 4))
+            self.assertEqual(entry["score"], entry["metrics"]["score"])
+
+        pooled = run_strategy_tournament(quotes, pool, 100, seed=1, workers=3)
+        self.assertEqual(pooled["entries"], report["entries"])
+
+    def test_offsetting_sleeves_share_one_drawdown(self) -> None:
+        # AAA gives back its gain while BBB recovers its loss at the same quotes
+        streams = {"AAA": [100.0, 110.0, 120.0, 110.0, 100.0], "BBB": [100.0, 90.0, 80.0, 90.0, 100.0]}
+        quotes = [{"symbol": symbol, "price": prices[k]} for k in range(5) for symbol, prices in streams.items()]
+        report = run_strategy_tournament(quotes, [], 100, seed=1)
+        hold = next(e for e in report["entries"] if e["candidate_id"] == "baseline_buy_hold")
+        self.assertEqual(hold["per_symbol"]["AAA"]["max_drawdown_pct"], round(20 / 5020 * 100.0, 4))
+        self.assertEqual(hold["metrics"]["final_equity_usd"], START_EQUITY)
+        self.assertEqual(hold["metrics"]["max_drawdown_pct"], round(10 / 10_010 * 100.0, 4))
+
+    def test_single_series_entries_are_the_sleeve(self) -> None:
+        prices = _walk(150, 21)
+        pool = [c.as_dict() for c in _expand_families()][:8]
+        report = run_strategy_tournament([{"price": p} for p in prices], pool, 100, seed=1)
+        for entry, candidate in zip(report["entries"], BASELINE_CANDIDATES + pool):
+            self.assertEqual(entry["metrics"], _simulate_candidate(prices, candidate, 100))
+
+
+def _dated_quotes(days: int, seed: int) -> list:
+    start = datetime(2025, 1, 1, 14, 30, tzinfo=timezone.utc)
+    quotes = []
+    for symbol, prices in (("AAA", _walk(days * 8, seed)), ("BBB", _walk(days * 8, seed + 1))):
+        for k, price in enumerate(prices):
+            quotes.append({"ts_utc": (start + timedelta(hours=3 * k)).isoformat(), "symbol": symbol, "price": price})
+    quotes.sort(key=lambda row: row["ts_utc"])
+    return quotes
+
+
+def _run_files(runs_dir: Path) -> dict:
+    # events carry wall-clock stamps, so compare the deterministic artifacts
+    return {
+        str(path.relative_to(runs_dir)): path.read_text(encoding="utf-8")
+        for path in sorted(runs_dir.rglob("*"))
+        if path.name in {"equity_curve.jsonl", "orders_sim.jsonl"}
+    }
+
+
+class TournamentJobTests(unittest.TestCase):
+    def test_report_does_not_depend_on_worker_count(self) -> None:
+        quotes = _dated_quotes(6, 31)
+        windows = [
+            (datetime(2025, 1, 1, tzinfo=timezone.utc), datetime(2025, 1, 3, 23, tzinfo=timezone.utc)),
+            (datetime(2025, 1, 4, tzinfo=timezone.utc), datetime(2025, 1, 6, 23, tzinfo=timezone.utc)),
+        ]
+        jobs = [
+            (window, variant, policy, {"max_orders_per_minute": 5} if policy == "p2" else {})
+            for policy in ("p1", "p2")
+            for window in windows
+            for variant in ("baseline", "aggressive")
+        ]
+        # a repeated job shares its run directory with the first one and must run after it
+        jobs.append(jobs[0])
+        outcomes = []
+        for workers in (1, 3):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                runs_dir = Path(tmp_dir)
+                results = run_tournament_jobs(quotes, jobs, 40, workers=workers, runs_dir=runs_dir)
+                outcomes.append((results, _run_files(runs_dir)))
+        self.assertEqual(outcomes[0], outcomes[1])
+        results = outcomes[0][0]
+        self.assertEqual(
+            [run_id for run_id, _ in results][:2],
+            ["p1_baseline_2025-01-01_2025-01-03", "p1_aggressive_2025-01-01_2025-01-03"],
+        )
+        self.assertEqual(results[-1][0], results[0][0])
+        curves = [name for name in outcomes[0][1] if name.endswith("equity_curve.jsonl")]
+        self.assertEqual(len(curves), 8)
+
+
+class WindowIndexTests(unittest.TestCase):
+    def test_select_matches_row_scan(self) -> None:
+        rng = random.Random(41)
+        ordered = _dated_quotes(5, 41)
+        ordered[7] = {**ordered[7], "ts_utc": "not-a-time"}
+        ordered[9] = {k: v for k, v in ordered[9].items() if k != "ts_utc"}
+        ordered[12] = {**ordered[12], "ts_utc": ordered[11]["ts_utc"]}
+        shuffled = list(ordered)
+        rng.shuffle(shuffled)
+        offset = {k: {**row, "ts_utc": row["ts_utc"].replace("+00:00", "+05:00")} for k, row in enumerate(ordered[:5])}
+        mixed_zones = [offset.get(k, row) for k, row in enumerate(ordered)]
+        day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        windows = [(day + timedelta(hours=h), day + timedelta(hours=h + span)) for h in range(0, 130, 7) for span in (0, 3, 40)]
+        for quotes in (ordered, shuffled, mixed_zones):
+            index = WindowIndex(quotes)
+            for start, end in windows:
+                expected = [row for row in quotes if _within_window(row, start, end)]
+                self.assertEqual([index.rows[k] for k in index.select(start, end)], expected)
+
+    def test_from_columns_matches_store_rows(self) -> None:
+        quotes = _dated_quotes(5, 43)
+        # a late row lands out of time order in the store
+        late = {**quotes[20], "ts_utc": quotes[3]["ts_utc"]}
+        day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        windows = [(day + timedelta(hours=h), day + timedelta(hours=h + span)) for h in range(0, 130, 11) for span in (0, 5, 50)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store_dir = Path(tmp_dir)
+            with QuoteStoreWriter(store_dir) as writer:
+                writer.append([Quote(row["ts_utc"], row["symbol"], row["price"], "t") for row in quotes + [late]])
+            columns = QuoteStore(store_dir).load()
+            rows = columns.to_rows()
+            index = WindowIndex.from_columns(columns)
+            reference = WindowIndex(rows)
+            self.assertFalse(index.in_order)
+            self.assertEqual(index.keys, reference.keys)
+            for start, end in windows:
+                selected = index.select(start, end)
+                self.assertEqual(list(selected), list(reference.select(start, end)))
+                self.assertEqual([index.rows[k] for k in selected], [reference.rows[k] for k in selected])
+                self.assertEqual([index.times[k] for k in selected], [reference.times[k] for k in selected])
+
+
+if __name__ == "__main__":
+    unittest.main()
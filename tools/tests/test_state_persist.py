@@ -0,0 +1,61 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.state_persist import DebouncedJsonFile
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class DebouncedJsonFileTests(unittest.TestCase):
+    def test_dirty_writes_are_coalesced(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            clock = _Clock()
+            path = Path(tmp_dir) / "alert_state.json"
+            state: dict = {}
+            persist = DebouncedJsonFile(path, min_interval_s=2.0, clock=clock)
+            persist.set(state)
+            self.assertTrue(persist.maybe_flush())
+            for i in range(100):
+                state[f"MOVE|S{i}"] = {"last_emit_epoch": float(i)}
+                persist.mark_dirty()
+                persist.maybe_flush()
+            self.assertEqual(persist.writes, 1)
+            self.assertAlmostEqual(persist.seconds_until_due() or 0.0, 2.0)
+            clock.now += 2.0
+            self.assertTrue(persist.maybe_flush())
+            self.assertEqual(len(json.loads(path.read_text(encoding="utf-8"))), 100)
+            self.assertIsNone(persist.seconds_until_due())
+
+    def test_volatile_keys_only_rewrite_on_heartbeat(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            clock = _Clock()
+            path = Path(tmp_dir) / "status.json"
+            persist = DebouncedJsonFile(
+                path, min_interval_s=1.0, heartbeat_s=30.0, volatile_keys=("ts_utc", "quotes.file_age_s"), clock=clock
+            )
+            self.assertTrue(persist.set({"ts_utc": "t0", "quotes": {"file_age_s": 1.0, "last_rows": 5}}))
+            persist.flush()
+            clock.now += 5.0
+            self.assertFalse(persist.set({"ts_utc": "t1", "quotes": {"file_age_s": 6.0, "last_rows": 5}}))
+            self.assertFalse(persist.maybe_flush())
+            self.assertTrue(persist.set({"ts_utc": "t2", "quotes": {"file_age_s": 0.0, "last_rows": 6}}))
+            self.assertTrue(persist.maybe_flush())
+            clock.now += 10.0
+            persist.set({"ts_utc": "t3", "quotes": {"file_age_s": 10.0, "last_rows": 6}})
+            self.assertFalse(persist.maybe_flush())
+            clock.now += 20.0
+            self.assertTrue(persist.maybe_flush())
+            self.assertEqual(json.loads(path.read_text(encoding="utf-8"))["ts_utc"], "t3")
+            self.assertEqual(persist.writes, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
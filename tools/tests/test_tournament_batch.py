@@ -0,0 +1,58 @@
+import unittest
+
+from tools.sim_tournament import (
+    BASELINE_CANDIDATES,
+    _simulate_candidate,
+    _simulate_path,
+    _strategy_signal,
+    run_strategy_tournament,
+)
+from tools.strategy_pool import _expand_families
+from tools.tests.test_sim_tournament import CANDIDATES, _near_ties, _walk
+from tools.tournament_batch import signal_matrix, simulate_candidate_paths, simulate_candidates
+
+
+def _pool() -> list:
+    pool = list(BASELINE_CANDIDATES) + [c.as_dict() for c in _expand_families()]
+    # tight guards so both the drawdown and the turnover gates block some switches
+    pool.append({"candidate_id": "g1", "family": "breakout", "params": {"window": 3}, "guard_defaults": {"max_turnover": 4}})
+    pool.append(
+        {"candidate_id": "g2", "family": "momentum", "params": {"lookback": 1}, "guard_defaults": {"max_drawdown_pct": 0.05}}
+    )
+    return pool + [{"candidate_id": f"c{k}", **c} for k, c in enumerate(CANDIDATES)]
+
+
+class TournamentBatchTests(unittest.TestCase):
+    def test_signal_matrix_matches_list_signals(self) -> None:
+        pool = _pool()
+        for prices in (_walk(300, 1), _near_ties(300, 2)):
+            matrix = signal_matrix(prices, pool)
+            for row, candidate in enumerate(pool):
+                with self.subTest(candidate=candidate["candidate_id"]):
+                    expected = [_strategy_signal(prices[: k + 1], candidate) for k in range(len(prices))]
+                    self.assertEqual(matrix[row].tolist(), expected)
+
+    def test_metrics_match_per_candidate_loop(self) -> None:
+        pool = _pool()
+        prices = _walk(500, 7) + _near_ties(250, 7)
+        for max_steps in (0, 1, 2, 200, 10_000):
+            batch = simulate_candidates(prices, pool, max_steps)
+            loop = [_simulate_candidate(prices, candidate, max_steps) for candidate in pool]
+            self.assertEqual(batch, loop)
+        batch, step_pnl = simulate_candidate_paths(prices, pool, 300, 2_500.0)
+        runs = [_simulate_path(prices, candidate, 300, 2_500.0) for candidate in pool]
+        self.assertEqual(batch, [run[0] for run in runs])
+        self.assertEqual(step_pnl.tolist(), [run[1] for run in runs])
+        self.assertTrue(any(m["num_rejects"] for m in loop))
+
+    def test_tournament_engines_agree(self) -> None:
+        pairs = zip(_walk(300, 3), _walk(300, 4))
+        quotes = [{"symbol": symbol, "price": p} for pair in pairs for symbol, p in zip("AB", pair)]
+        pool = [c.as_dict() for c in _expand_families()]
+        loop = run_strategy_tournament(quotes, pool, 250, seed=1)
+        batch = run_strategy_tournament(quotes, pool, 250, seed=1, engine="batch")
+        self.assertEqual(batch["entries"], loop["entries"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from tools.sim_tournament import (
+    START_EQUITY,
+    _TIE_RTOL,
+    _VAR_FLOOR,
+    _Z_RTOL,
+    _mean,
+    _score_candidate,
+    _signal_kernel,
+    _zscore_signal,
+)
+
+
+def _rolling_means(history: np.ndarray, window: int) -> np.ndarray:
+    """means[k] ~ mean of history[max(0, k - window + 1) : k + 1]; the short prefix is exact."""
+    n = history.size
+    means = np.empty(n, dtype=np.float64)
+    head = min(n, window - 1)
+    for k in range(head):
+        means[k] = _mean(history[: k + 1].tolist())
+    if n >= window:
+        means[window - 1 :] = sliding_window_view(history, window).sum(axis=1) / window
+    return means
+
+
+def _ma_crossover_signals(history: np.ndarray, fast: int, slow: int, means: Dict[int, np.ndarray]) -> np.ndarray:
+    for window in (fast, slow):
+        if window not in means:
+            means[window] = _rolling_means(history, window)
+    fast_avg = means[fast]
+    slow_avg = means[slow]
+    signal = fast_avg > slow_avg
+    valid = np.arange(history.size) >= slow - 1
+    close = valid & (np.abs(fast_avg - slow_avg) <= _TIE_RTOL * (np.abs(fast_avg) + np.abs(slow_avg)))
+    span = max(fast, slow)
+    for k in np.nonzero(close)[0].tolist():
+        window_values = history[max(0, k - span + 1) : k + 1].tolist()
+        signal[k] = _mean(window_values[-fast:]) > _mean(window_values[-slow:])
+    return valid & signal
+
+
+def _zscore_stats(history: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per full window ending at k >= window - 1: (z of the last value, trusted?, index k)."""
+    windows = sliding_window_view(history, window)
+    mean = windows.sum(axis=1) / window
+    m2 = ((windows - mean[:, None]) ** 2).sum(axis=1)
+    trusted = m2 > _VAR_FLOOR * window * mean * mean
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(trusted, (windows[:, -1] - mean) / np.sqrt(m2 / (window - 1)), 0.0)
+    return z, trusted, np.arange(window - 1, history.size)
+
+
+def _mean_reversion_signals(
+    history: np.ndarray, window: int, zscore: float, stats: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]
+) -> np.ndarray:
+    signal = np.zeros(history.size, dtype=bool)
+    if window < 2 or history.size < window:
+        return signal
+    if window not in stats:
+        stats[window] = _zscore_stats(history, window)
+    z, trusted, index = stats[window]
+    threshold = -abs(zscore)
+    signal[index] = z <= threshold
+    close = ~trusted | (np.abs(z - threshold) <= _Z_RTOL * (1.0 + np.abs(z)))
+    for k in index[close].tolist():
+        signal[k] = bool(_zscore_signal(history[k - window + 1 : k + 1].tolist(), zscore))
+    return signal
+
+
+def _breakout_signals(history: np.ndarray, window: int) -> np.ndarray:
+    signal = np.zeros(history.size, dtype=bool)
+    if history.size >= window:
+        signal[window - 1 :] = history[window - 1 :] >= sliding_window_view(history, window).max(axis=1)
+    return signal
+
+
+def _momentum_signals(history: np.ndarray, lookback: int, threshold_pct: float) -> np.ndarray:
+    signal = np.zeros(history.size, dtype=bool)
+    if history.size > lookback:
+        past = history[:-lookback]
+        latest = history[lookback:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change_pct = (latest - past) / past * 100.0
+        signal[lookback:] = (past > 0) & (change_pct >= threshold_pct)
+    return signal
+
+
+def signal_matrix(history: Sequence[float], candidates: Sequence[Dict[str, object]]) -> np.ndarray:
+    """
+    Desired position (0/1) per candidate (rows) after each history prefix
+    (columns): column k is ``_strategy_signal(history[: k + 1], candidate)``.
+
+    Rolling means, window z-scores and highs are computed once per distinct
+    window and shared across the parameter grid; decisions within tolerance
+    of their threshold are re-taken with the list formula, so every entry
+    equals the per-candidate loop exactly. Parameters the vectorised kernels
+    do not model run through ``_signal_kernel``.
+    """
+    hist = np.asarray(history, dtype=np.float64)
+    out = np.zeros((len(candidates), hist.size), dtype=np.int8)
+    means: Dict[int, np.ndarray] = {}
+    stats: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+    highs: Dict[int, np.ndarray] = {}
+    for row, candidate in enumerate(candidates):
+        family = str(candidate.get("family") or "")
+        params = candidate.get("params") if isinstance(candidate.get("params"), dict) else {}
+        signal = None
+        if family == "momentum":
+            lookback = int(params.get("lookback") or 1)
+            if lookback >= 1:
+                signal = _momentum_signals(hist, lookback, float(params.get("threshold_pct") or 0.0))
+        elif family == "ma_crossover":
+            fast = int(params.get("fast") or 1)
+            slow = int(params.get("slow") or fast + 1)
+            if fast >= 1 and slow >= 1:
+                signal = _ma_crossover_signals(hist, fast, slow, means)
+        elif family == "mean_reversion":
+            window = int(params.get("window") or 1)
+            if window >= 1:
+                signal = _mean_reversion_signals(hist, window, float(params.get("zscore") or 0.0), stats)
+        elif family == "breakout":
+            window = int(params.get("window") or 1)
+            if window >= 1:
+                if window not in highs:
+                    highs[window] = _breakout_signals(hist, window)
+                signal = highs[window]
+        elif candidate.get("candidate_id") == "baseline_buy_hold":
+            out[row] = 1
+            continue
+        else:
+            continue
+        if signal is None:
+            kernel = _signal_kernel(candidate)
+            out[row] = [kernel.update(price) for price in hist.tolist()]
+        else:
+            out[row] = signal
+    return out
+
+
+def _guard_limits(candidates: Sequence[Dict[str, object]]) -> Tuple[np.ndarray, np.ndarray]:
+    max_drawdown = np.zeros(len(candidates), dtype=np.float64)
+    max_turnover = np.zeros(len(candidates), dtype=np.int64)
+    for row, candidate in enumerate(candidates):
+        guard = candidate.get("guard_defaults") if isinstance(candidate.get("guard_defaults"), dict) else {}
+        max_drawdown[row] = float(guard.get("max_drawdown_pct") or 0.0)
+        max_turnover[row] = int(guard.get("max_turnover") or 0)
+    return max_drawdown, max_turnover
+
+
+def simulate_candidates(
+    prices: Sequence[float],
+    candidates: Sequence[Dict[str, object]],
+    max_steps: int,
+    capital: float = START_EQUITY,
+) -> List[Dict[str, object]]:
+    """
+    ``_simulate_candidate`` for every candidate at once, metrics equal to the
+    per-candidate loop.
+
+    Signals come from ``signal_matrix``; the path-dependent guards
+    (``max_drawdown_pct``, ``max_turnover``) then advance all candidates
+    together, one vectorised update per price step.
+    """
+    return simulate_candidate_paths(prices, candidates, max_steps, capital)[0]
+
+
+def simulate_candidate_paths(
+    prices: Sequence[float],
+    candidates: Sequence[Dict[str, object]],
+    max_steps: int,
+    capital: float = START_EQUITY,
+) -> Tuple[List[Dict[str, object]], np.ndarray]:
+    """``simulate_candidates`` plus each candidate's P&L per price step (rows), as ``_simulate_path``."""
+    n_candidates = len(candidates)
+    steps = min(max_steps, len(prices))
+    px = np.asarray(prices[:steps], dtype=np.float64)
+    desired = signal_matrix(px[:-1], candidates) if steps > 1 else np.zeros((n_candidates, 0), dtype=np.int8)
+    moves = np.diff(px)
+    max_drawdown, max_turnover = _guard_limits(candidates)
+    drawdown_guarded = max_drawdown != 0
+    turnover_guarded = max_turnover != 0
+
+    equity = np.full(n_candidates, capital)
+    peak = equity.copy()
+    position = np.zeros(n_candidates, dtype=np.int8)
+    turnover = np.zeros(n_candidates, dtype=np.int64)
+    rejects = np.zeros(n_candidates, dtype=np.int64)
+    step_pnl = np.zeros((n_candidates, max(0, steps - 1)), dtype=np.float64)
+    for k in range(steps - 1):
+        want = desired[:, k]
+        drawdown_pct = (peak - equity) / peak * 100.0
+        blocked = (drawdown_guarded & (drawdown_pct > max_drawdown)) | (turnover_guarded & (turnover >= max_turnover))
+        change = want != position
+        rejects += change & blocked
+        accept = change & ~blocked
+        position = np.where(accept, want, position)
+        turnover += accept
+        step_pnl[:, k] = position * moves[k]
+        equity += step_pnl[:, k]
+        np.maximum(peak, equity, out=peak)
+
+    drawdown_pct = (peak - equity) / peak * 100.0
+    results: List[Dict[str, object]] = []
+    for row in range(n_candidates):
+        final_equity = float(equity[row])
+        metrics: Dict[str, object] = {
+            "final_equity_usd": round(final_equity, 2),
+            "pnl_proxy": round(final_equity - capital, 2),
+            "max_drawdown_pct": round(float(drawdown_pct[row]), 4),
+            "turnover": int(turnover[row]),
+            "num_rejects": int(rejects[row]),
+            "reject_rate": round(int(rejects[row]) / max(1, steps - 1), 4),
+            "steps": steps,
+        }
+        metrics["score"] = round(_score_candidate(metrics, capital), 4)
+        results.append(metrics)
+    return results, step_pnl
+
+
+__all__ = ["signal_matrix", "simulate_candidate_paths", "simulate_candidates"]
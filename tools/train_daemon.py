@@ -23,21 +23,23 @@ if str(Path(__file__).resolve().parent.parent) not in sys.path:
 
 from tools.policy_registry import get_policy, load_registry, record_history
 from tools.policy_registry import promote_policy as _promote_policy
-from tools.execution_friction import load_friction_policy
+from tools.event_sink import EventSink, sink_from_config
+from tools.execution_friction import FrictionPolicy
 from tools.promotion_gate_v2 import GateConfig, evaluate_promotion_gate
 from tools.experiment_ledger import DEFAULT_BASELINES, append_entry, build_entry
 from tools.multiple_testing_control import TrialBudgetError, enforce_budget, write_enforcement_artifact
 from tools.trade_activity_audit import build_report as build_trade_activity_report
 from tools.trade_activity_audit import write_trade_activity_report
-from tools.sim_autopilot import _kill_switch_enabled, _kill_switch_path, run_step
+from tools.kill_switch import monitor_from_config
+from tools.sim_autopilot import SimSession, _kill_switch_path
 from tools.sim_tournament import (
     BASELINE_CANDIDATES,
     RUNS_DIR as TOURNAMENT_RUNS,
     _load_quotes,
     _render_report,
-    _run_single,
     _score_run,
     run_strategy_tournament,
+    run_tournament_jobs,
 )
 from tools.strategy_pool import select_candidates, write_strategy_pool_manifest
 from tools.progress_index import build_progress_index, write_progress_index
@@ -52,6 +54,8 @@ TRAIN_SERVICE_ROOT = ROOT / "Logs" / "train_service"
 STATE_PATH = TRAIN_SERVICE_ROOT / "state.json"
 LEGACY_STATE_PATH = ROOT / "Logs" / "train_daemon_state.json"
 EVENTS_PATH = ROOT / "Logs" / "events_train.jsonl"
+# set by main() for the lifetime of one daemon run; None means plain open/append
+_EVENT_SINK: EventSink | None = None
 ARCHIVES_ROOT = ROOT / "Archives"
 LATEST_DIR = RUNS_ROOT / "_latest"
 LATEST_PROGRESS_JUDGE = LATEST_DIR / "progress_judge_latest.json"
@@ -439,6 +443,9 @@ def _write_event(event_type: str, message: str, severity: str = "INFO", **extra:
         "message": message,
     }
     payload.update({k: v for k, v in extra.items() if v is not None})
+    if _EVENT_SINK is not None:
+        _EVENT_SINK.write_json(EVENTS_PATH, payload)
+        return payload
     EVENTS_PATH.parent.mkdir(parents=True, exist_ok=True)
     with EVENTS_PATH.open("a", encoding="utf-8") as fh:
         fh.write(json.dumps(payload, ensure_ascii=False) + "\n")
@@ -476,6 +483,7 @@ def _tournament_report(
     quotes: List[Dict[str, object]],
     policy_version: str,
     max_steps: int,
+    workers: int = 1,
 ) -> Tuple[List[Dict[str, object]], Path]:
     windows = []
     timestamps: List[datetime] = []
@@ -495,15 +503,8 @@ def _tournament_report(
         windows.append((now - timedelta(days=1), now))
 
     runs: List[Dict[str, object]] = []
-    for window in windows:
-        run_id, metrics = _run_single(
-            quotes,
-            window,
-            "baseline",
-            max_steps,
-            policy_version,
-            {},
-        )
+    jobs = [(window, "baseline", policy_version, {}) for window in windows]
+    for window, (run_id, metrics) in zip(windows, run_tournament_jobs(quotes, jobs, max_steps, workers=workers)):
         metrics["run_id"] = run_id
         metrics["window_start"] = window[0].isoformat()
         metrics["window_end"] = window[1].isoformat()
@@ -704,6 +705,28 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
     parser.add_argument("--momentum-threshold", type=float, default=0.5, dest="momentum_threshold")
     parser.add_argument("--nightly", action="store_true", help="Preset for overnight runs (8h budget)")
     parser.add_argument("--seed", type=int, default=None, help="Seed for deterministic sampling")
+    parser.add_argument(
+        "--mc-seeds",
+        type=int,
+        default=0,
+        dest="mc_seeds",
+        help="Monte Carlo friction seeds per stress scenario (0 = single seed)",
+    )
+    parser.add_argument("--mc-workers", type=int, default=None, dest="mc_workers", help="Monte Carlo process pool size")
+    parser.add_argument(
+        "--tournament-engine",
+        choices=["loop", "batch"],
+        default="loop",
+        dest="tournament_engine",
+        help="batch = evaluate the candidate pool with the vectorised engine (same entries)",
+    )
+    parser.add_argument(
+        "--tournament-workers",
+        type=int,
+        default=1,
+        dest="tournament_workers",
+        help="Process pool size for per-symbol tournament evaluation and tournament window runs",
+    )
     parser.add_argument("--max-iterations-per-day", type=int, default=1, dest="max_iterations_per_day")
     parser.add_argument("--max-events-per-hour", type=int, default=200, dest="max_events_per_hour")
     parser.add_argument("--max-disk-mb", type=float, default=10_000.0, dest="max_disk_mb")
@@ -824,7 +847,7 @@ def _run_simulation(
     args: argparse.Namespace,
     run_dir: Path,
     kill_cfg: Dict[str, object],
-    friction_policy: Dict[str, float | int],
+    friction_policy: FrictionPolicy,
     friction_seed: int | None,
 ) -> Tuple[str, Dict[str, object], List[Dict[str, object]], Counter, int, Dict[str, object]]:
     sim_state: Dict[str, object] = {
@@ -849,70 +872,78 @@ def _run_simulation(
     max_runtime = float(args.max_runtime_seconds)
     log_limit = float(args.max_log_mb)
 
+    # one open handle for the run's events_sim.jsonl instead of open/close per event
+    sink = EventSink(durability="none", background=False)
+    session = SimSession(
+        {
+            "logs_dir": run_dir,
+            "momentum_threshold_pct": args.momentum_threshold,
+            "verify_no_lookahead": True,
+            "policy_version": policy_version,
+            "risk_overrides": policy_cfg.get("risk_overrides", {}),
+            "friction_policy": friction_policy,
+            "friction_seed": friction_seed,
+            "event_sink": sink,
+        },
+        sim_state,
+    )
+    kill_switch = monitor_from_config(kill_cfg)
     start_monotonic = time.monotonic()
-    for step_no, row in enumerate(_iter_rows(quotes), start=1):
-        now = _now()
-        elapsed = time.monotonic() - start_monotonic
-        if elapsed >= max_runtime:
-            stop_reason = "max_runtime_seconds"
-            break
-        if step_no > step_limit:
-            stop_reason = "max_steps"
-            break
-        if trade_count >= trade_limit:
-            stop_reason = "max_trades"
-            break
-        if _kill_switch_enabled(kill_cfg) and _kill_switch_path(kill_cfg).expanduser().resolve().exists():
-            stop_reason = "kill_switch"
-            break
-        if _log_size_mb(run_dir) > log_limit:
-            stop_reason = "max_log_mb"
-            break
-
-        sim_state, emitted = run_step(
-            row,
-            sim_state,
-            {
-                "logs_dir": run_dir,
-                "momentum_threshold_pct": args.momentum_threshold,
-                "verify_no_lookahead": True,
-                "policy_version": policy_version,
-                "risk_overrides": policy_cfg.get("risk_overrides", {}),
-                "friction_policy": friction_policy,
-                "friction_seed": friction_seed,
-            },
-        )
-
-        decision_events = [e for e in emitted if e.get("decision")]
-        for event in decision_events:
-            decision = str(event.get("decision"))
-            reason = str(event.get("reason") or "")
-            if decision == "ALLOW":
-                trade_count += 1
-            elif reason:
-                rejects[reason] += 1
-
-        risk_state = sim_state.get("risk_state", {}) or {}
-        equity = float(risk_state.get("equity", sim_state.get("cash_usd", 0.0)))
-        cash = float(sim_state.get("cash_usd", 0.0))
-        peak = float(risk_state.get("peak_equity", equity)) or equity
-        drawdown_pct = ((peak - equity) / peak * 100.0) if peak else 0.0
-        ts_raw = row.get("ts_utc") or row.get("ts")
-        ts = str(ts_raw) if ts_raw else now.isoformat()
-        if first_ts is None:
-            first_ts = ts
-        last_ts = ts
-        equity_rows.append(
-            {
-                "ts_utc": ts,
-                "equity_usd": round(equity, 2),
-                "cash_usd": round(cash, 2),
-                "drawdown_pct": round(drawdown_pct, 4),
-                "step": step_no,
-                "policy_version": policy_version,
-                "mode": risk_state.get("mode", "UNKNOWN"),
-            }
-        )
+    try:
+        for step_no, row in enumerate(_iter_rows(quotes), start=1):
+            now = _now()
+            elapsed = time.monotonic() - start_monotonic
+            if elapsed >= max_runtime:
+                stop_reason = "max_runtime_seconds"
+                break
+            if step_no > step_limit:
+                stop_reason = "max_steps"
+                break
+            if trade_count >= trade_limit:
+                stop_reason = "max_trades"
+                break
+            if kill_switch.engaged():
+                stop_reason = "kill_switch"
+                break
+            if _log_size_mb(run_dir) > log_limit:
+                stop_reason = "max_log_mb"
+                break
+
+            emitted = session.step(row)
+
+            decision_events = [e for e in emitted if e.get("decision")]
+            for event in decision_events:
+                decision = str(event.get("decision"))
+                reason = str(event.get("reason") or "")
+                if decision == "ALLOW":
+                    trade_count += 1
+                elif reason:
+                    rejects[reason] += 1
+
+            risk_state = session.risk_state
+            equity = float(risk_state.equity)
+            cash = float(session.cash)
+            peak = float(risk_state.peak_equity) or equity
+            drawdown_pct = ((peak - equity) / peak * 100.0) if peak else 0.0
+            ts_raw = row.get("ts_utc") or row.get("ts")
+            ts = str(ts_raw) if ts_raw else now.isoformat()
+            if first_ts is None:
+                first_ts = ts
+            last_ts = ts
+            equity_rows.append(
+                {
+                    "ts_utc": ts,
+                    "equity_usd": round(equity, 2),
+                    "cash_usd": round(cash, 2),
+                    "drawdown_pct": round(drawdown_pct, 4),
+                    "step": step_no,
+                    "policy_version": policy_version,
+                    "mode": risk_state.mode,
+                }
+            )
+    finally:
+        sink.close()
+    sim_state = session.state
 
     if stop_reason == "budget_exhausted":
         stop_reason = "input_exhausted"
@@ -948,6 +979,16 @@ def _run_simulation(
 
 
 def main(argv: List[str] | None = None) -> int:
+    global _EVENT_SINK
+    _EVENT_SINK = sink_from_config(_load_config())
+    try:
+        return _main(argv)
+    finally:
+        _EVENT_SINK.close()
+        _EVENT_SINK = None
+
+
+def _main(argv: List[str] | None = None) -> int:
     args = parse_args(argv or sys.argv[1:])
     _apply_nightly_defaults(args)
 
@@ -990,7 +1031,7 @@ def main(argv: List[str] | None = None) -> int:
 
     policy_version, policy_cfg = get_policy(args.policy_version)
     kill_cfg = _load_config()
-    friction_policy = load_friction_policy()
+    friction_policy = FrictionPolicy.load()
     quotes = _load_quotes(input_path)
     healthy, reason, metrics = _quotes_health(quotes)
     degraded_flags: List[str] = []
@@ -1028,7 +1069,7 @@ def main(argv: List[str] | None = None) -> int:
         _write_event("TRAIN_BUDGET_EXHAUSTED", "Budget exhausted", stop_reason=stop)
         return 1
 
-    _atomic_write_json(run_dir / "friction_policy.json", friction_policy)
+    _atomic_write_json(run_dir / "friction_policy.json", friction_policy.to_dict())
     _atomic_copy_json(run_dir / "friction_policy.json", LATEST_FRICTION_POLICY)
     stop_reason, meta, equity_rows, rejects, trade_count, sim_state = _run_simulation(
         quotes,
@@ -1193,6 +1234,8 @@ def main(argv: List[str] | None = None) -> int:
         run_dir,
         seed=seed,
         max_steps=min(200, args.max_steps),
+        mc_seeds=int(args.mc_seeds),
+        mc_workers=args.mc_workers,
     )
     _atomic_copy_json(run_dir / "stress_report.json", LATEST_STRESS_REPORT)
     tournament_payload = run_strategy_tournament(
@@ -1201,6 +1244,8 @@ def main(argv: List[str] | None = None) -> int:
         max_steps=min(200, args.max_steps),
         seed=seed,
         gate_config=gate_config,
+        engine=args.tournament_engine,
+        workers=int(args.tournament_workers),
     )
     tournament_payload["created_utc"] = _now().isoformat()
     tournament_payload["run_id"] = run_id
@@ -1305,7 +1350,9 @@ def main(argv: List[str] | None = None) -> int:
     _atomic_write_json(run_dir / "promotion_decision.json", decision_payload)
     _atomic_copy_json(run_dir / "promotion_decision.json", LATEST_PROMOTION_DECISION)
 
-    runs, report_md = _tournament_report(quotes, policy_version, max_steps=min(200, args.max_steps))
+    runs, report_md = _tournament_report(
+        quotes, policy_version, max_steps=min(200, args.max_steps), workers=int(args.tournament_workers)
+    )
     worst_run = min(runs, key=lambda r: r.get("score", 0)) if runs else {}
     _write_event(
         "TOURNAMENT_DONE",